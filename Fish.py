@@ -1,8 +1,7 @@
-import pygame
 import random
 import math
 from neural_class import NeuralNetwork
-import copy
+from spatial import FOV_SLACK
 from functools import lru_cache
 
 
@@ -30,7 +29,9 @@ class GridSquare:
 GRID_COLS, GRID_ROWS = 20, 15  # Grid dimensions
 MAX_SPEED = 1
 TURN_ANGLE = math.pi / 8  # 22.5 degrees in radians
-SCREEN_WIDTH = 800
+WORLD_WIDTH = 800  # Default world size; a World can be any size (see world.py)
+WORLD_HEIGHT = 600
+SCREEN_WIDTH = 800  # Window size - the camera decides which part of the world it shows
 SCREEN_HEIGHT = 600
 PREY_ENERGY_GAIN = 200
 PREDATOR_ENERGY_GAIN = 100
@@ -42,8 +43,8 @@ MAX_ENERGY = 1200
 
 ## Defining sight range for prey at half a grid square
 # Calculate the dimensions of a grid square
-grid_square_width = SCREEN_WIDTH / GRID_COLS
-grid_square_height = SCREEN_HEIGHT / GRID_ROWS
+grid_square_width = WORLD_WIDTH / GRID_COLS
+grid_square_height = WORLD_HEIGHT / GRID_ROWS
 
 # Calculate the diagonal of a grid square (using Pythagoras' theorem)
 grid_square_diagonal = math.sqrt(grid_square_width**2 + grid_square_height**2)
@@ -57,7 +58,7 @@ MAX_DISTANCE = grid_square_diagonal
 # SECTION 2: UTILITY FUNCTIONS
 # ----------------------------
 def get_grid_cell(position):
-    col_width, row_height = SCREEN_WIDTH / GRID_COLS, SCREEN_HEIGHT / GRID_ROWS
+    col_width, row_height = WORLD_WIDTH / GRID_COLS, WORLD_HEIGHT / GRID_ROWS
     col = int(position[0] / col_width)
     row = int(position[1] / row_height)
     # Ensure that col and row are within the grid's range
@@ -86,11 +87,15 @@ def update_agent_grid_cells(agent_list, grid_cols, grid_rows, screen_width, scre
 
     return grid
 
+NEIGHBOUR_OFFSETS = tuple((dx, dy) for dx in range(-1, 2) for dy in range(-1, 2))
+
+# Only grid_cols * grid_rows distinct answers, so work each one out once
+@lru_cache(maxsize=None)
 def get_nearby_cells(cell, grid_cols, grid_rows):
     x, y = cell
-    neighbors = [(x + dx, y + dy) for dx in range(-1, 2) for dy in range(-1, 2)]
+    neighbors = [(x + dx, y + dy) for dx, dy in NEIGHBOUR_OFFSETS]
     # Filter out cells that are outside the grid
-    return [(nx, ny) for nx, ny in neighbors if 0 <= nx < grid_cols and 0 <= ny < grid_rows]
+    return tuple((nx, ny) for nx, ny in neighbors if 0 <= nx < grid_cols and 0 <= ny < grid_rows)
 
 def handle_collision_efficiently(agent, grid, grid_cols, grid_rows, collision_distance=5):
     nearby_cells = get_nearby_cells(agent.grid_cell, grid_cols, grid_rows)
@@ -102,17 +107,25 @@ def handle_collision_efficiently(agent, grid, grid_cols, grid_rows, collision_di
                 agent.move()
 
 
-def random_position():
-    return random.randrange(0, SCREEN_WIDTH), random.randrange(0, SCREEN_HEIGHT)
+def random_position(rng=random):
+    return rng.randrange(0, WORLD_WIDTH), rng.randrange(0, WORLD_HEIGHT)
 
 # SECTION 3: BASE AGENT CLASS
 # ---------------------------
 class Agent:
-    def __init__(self):
-        self.position = random_position()
+    # rng is the random module by default; pass a random.Random(seed) for a reproducible run.
+    # Offspring inherit their parent's rng
+    # Slotted so a big population doesn't pay for a __dict__ per fish; anything the same
+    # for a whole species lives on the class instead of being copied into every instance.
+    # position is a [x, y] list that move() updates in place
+    __slots__ = ("rng", "position", "energy", "velocity", "direction", "grid_cell")
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.position = list(random_position(rng))
         self.energy = 50
-        self.velocity = random.uniform(0, MAX_SPEED)
-        self.direction = random.uniform(0, 2 * math.pi)
+        self.velocity = rng.uniform(0, MAX_SPEED)
+        self.direction = rng.uniform(0, 2 * math.pi)
         self.grid_cell = get_grid_cell(self.position)
 
 
@@ -129,14 +142,15 @@ class Agent:
         new_y = self.position[1] + dy
 
         # Check for border collision
-        if new_x <= 0 or new_x >= SCREEN_WIDTH:
+        if new_x <= 0 or new_x >= WORLD_WIDTH:
             self.direction = math.pi - self.direction  # Reverse horizontal direction
-        if new_y <= 0 or new_y >= SCREEN_HEIGHT:
+        if new_y <= 0 or new_y >= WORLD_HEIGHT:
             self.direction = -self.direction  # Reverse vertical direction
 
         # Update position with border constraints
-        self.position = (max(0, min(SCREEN_WIDTH, new_x)), 
-                         max(0, min(SCREEN_HEIGHT, new_y)))
+        position = self.position
+        position[0] = max(0, min(WORLD_WIDTH, new_x))
+        position[1] = max(0, min(WORLD_HEIGHT, new_y))
         self.grid_cell = get_grid_cell(self.position)
 
 
@@ -148,9 +162,9 @@ class Agent:
     def reproduce(self, agent_list):
         if self.energy >= ENERGY_TO_REPRODUCE:
             self.energy /= 2
-            offspring = type(self)()
-            offspring.position = (self.position[0] + random.randint(-50, 50), 
-                                  self.position[1] + random.randint(-50, 50))
+            offspring = type(self)(rng=self.rng)
+            offspring.position = [self.position[0] + self.rng.randint(-50, 50),
+                                  self.position[1] + self.rng.randint(-50, 50)]
             offspring.grid_cell = get_grid_cell(offspring.position)
             agent_list.append(offspring)
 
@@ -160,13 +174,14 @@ class Agent:
         return min(diff, 2 * math.pi - diff)
      
     @staticmethod
-    @lru_cache(maxsize=1000)  # Adjust maxsize as needed
     def calculate_distance(x1, y1, x2, y2):
-        return math.sqrt((x2 - x1) ** 2 + (y2 - y1) ** 2)
+        # No cache: positions are floats that change every tick, so it would never hit.
+        # The World gets its distances in bulk from a NeighbourContext (spatial.py)
+        return math.hypot(x2 - x1, y2 - y1)
 
     def _distance_to(self, other_agent):
-        return Agent.calculate_distance(self.position[0], self.position[1], 
-                                        other_agent.position[0], other_agent.position[1])
+        position, other = self.position, other_agent.position
+        return math.hypot(other[0] - position[0], other[1] - position[1])
     
     def handle_collision(self, same_type_agents, collision_distance=5):
         for other in same_type_agents:
@@ -190,22 +205,28 @@ class Agent:
 # SECTION 4: PREY CLASS
 # ---------------------
 class Prey(Agent):
-    def __init__(self, color=(0, 255, 0), fov_angle=120, fov_distance=400):
-        super().__init__()
-        self.nn = NeuralNetwork(input_size=3, hidden_size=5, output_size=2)
+    __slots__ = ("nn", "reproduction_cooldown", "color", "fov_angle", "fov_distance", "boost_cooldown",
+                 "is_boosting", "predator_nearby")
+
+    # The same for every prey
+    fleeing_energy_cost = 0.5
+    safe_energy_gain = 0.5
+    speed_boost_multiplier = 1.2
+    boost_energy_cost = 100
+    after_boost_slowdown = 0.5  # Slowdown multiplier after boosting
+    boost_cooldown_timer = 180  # Cooldown period after boosting
+    boost_energy_threshold = 0.75 * MAX_ENERGY  # Adjust MAX_ENERGY as needed
+
+    def __init__(self, color=(0, 255, 0), fov_angle=120, fov_distance=400, rng=random):
+        super().__init__(rng)
+        self.nn = NeuralNetwork(input_size=3, hidden_size=5, output_size=2, rng=rng)
         self.reproduction_cooldown = 100
-        self.fleeing_energy_cost = 0.5
-        self.safe_energy_gain = 0.5
         self.color = color
         self.fov_angle = fov_angle
         self.fov_distance = fov_distance
-        self.speed_boost_multiplier = 1.2
-        self.boost_energy_cost = 100
         self.boost_cooldown = 0  # Cooldown timer for boosting
         self.is_boosting = False  # Indicates if currently boosting
-        self.after_boost_slowdown = 0.5  # Slowdown multiplier after boosting
-        self.boost_cooldown_timer = 180  # Cooldown period after boosting
-        self.boost_energy_threshold = 0.75 * MAX_ENERGY  # Adjust MAX_ENERGY as needed
+        self.predator_nearby = False
 
     def detect_predators(self, predator_list):
         for predator in predator_list:
@@ -304,40 +325,41 @@ class Prey(Agent):
     def reproduce(self, agent_list):
         if self.energy >= PREY_ENERGY_TO_REPRODUCE:
             self.energy /= 2
-            offspring = Prey(color=self.color, fov_angle=self.fov_angle, fov_distance=self.fov_distance)
+            offspring = Prey(color=self.color, fov_angle=self.fov_angle, fov_distance=self.fov_distance,
+                             rng=self.rng)
 
             MUTATION_CHANCE = 0.5
-            if random.random() < MUTATION_CHANCE:
-                offspring.nn = copy.deepcopy(self.nn)
-                offspring.nn.mutate(rate=0.1)
+            if self.rng.random() < MUTATION_CHANCE:
+                offspring.nn = self.nn.copy()
+                offspring.nn.mutate(rate=0.1, rng=self.rng)
                 offspring.color = self.mutate_color()
                 offspring.fov_angle = self.mutate_fov_angle()
                 offspring.fov_distance = self.mutate_fov_distance()
                 #print(f"[Mutate Color] Color after mutation: {self.color}")
 
-            offset = random.randint(-20, 20)
-            offspring.position = (self.position[0] + offset, self.position[1] + offset)
+            offset = self.rng.randint(-20, 20)
+            offspring.position = [self.position[0] + offset, self.position[1] + offset]
             offspring.grid_cell = get_grid_cell(offspring.position)
             agent_list.append(offspring)
             self.reproduction_cooldown = 100
 
     def mutate_fov_angle(self):
         # Adjust the mutation range as needed
-        return max(60, min(180, self.fov_angle + random.randint(-15, 15)))
+        return max(60, min(180, self.fov_angle + self.rng.randint(-15, 15)))
 
     def mutate_fov_distance(self):
         # Adjust the mutation range as needed
-        return max(50, self.fov_distance + random.randint(-10, 10))
+        return max(50, self.fov_distance + self.rng.randint(-10, 10))
 
     def mutate_color(self):
-        shift = lambda x: max(0, min(255, x + random.randint(-50, 50)))
+        shift = lambda x: max(0, min(255, x + self.rng.randint(-50, 50)))
         return tuple(shift(c) for c in self.color)
     
 
     @staticmethod
-    def random_color():
+    def random_color(rng=random):
         # Generates a random color within a reasonable range
-        return (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
+        return (rng.randint(0, 255), rng.randint(0, 255), rng.randint(0, 255))
 
 
 
@@ -393,23 +415,28 @@ class Prey(Agent):
 # SECTION 5: PREDATOR CLASS
 # -------------------------
 class Predator(Agent):
-    def __init__(self, color=(255, 0, 0), fov_angle=45, fov_distance=1000):
-        super().__init__()
-        self.nn = NeuralNetwork(input_size=3, hidden_size=5, output_size=2)
+    __slots__ = ("nn", "reproduction_cooldown", "eating_cooldown", "color", "fov_angle", "fov_distance")
+
+    # The same for every predator
+    max_velocity = 2  # Adjusted maximum speed to 2 times the minimum speed
+    energy_consumption_rate = .7  # Base energy consumption rate for minimum speed
+
+    def __init__(self, color=(255, 0, 0), fov_angle=45, fov_distance=1000, rng=random):
+        super().__init__(rng)
+        self.nn = NeuralNetwork(input_size=3, hidden_size=5, output_size=2, rng=rng)
         self.energy = 100
         self.reproduction_cooldown = 0
         self.eating_cooldown = 0
         self.color = color
         self.fov_angle = fov_angle
         self.fov_distance = fov_distance
-        self.max_velocity = 2  # Adjusted maximum speed to 2 times the minimum speed
-        self.energy_consumption_rate = .7  # Base energy consumption rate for minimum speed
 
     def move(self):
         dx = math.cos(self.direction) * self.velocity
         dy = math.sin(self.direction) * self.velocity
-        self.position = (max(0, min(SCREEN_WIDTH, self.position[0] + dx)),
-                         max(0, min(SCREEN_HEIGHT, self.position[1] + dy)))
+        position = self.position
+        position[0] = max(0, min(WORLD_WIDTH, position[0] + dx))
+        position[1] = max(0, min(WORLD_HEIGHT, position[1] + dy))
 
         # Ensure minimum velocity of 1
         self.velocity = max(1, min(self.velocity, self.max_velocity))
@@ -425,7 +452,8 @@ class Predator(Agent):
 
     # Other methods remain unchanged
     def get_nearest_prey_info(self, prey_list):
-        detectable_prey = [prey for prey in prey_list if self.is_within_fov(prey)]
+        cone = self.fov_cone()
+        detectable_prey = [prey for prey in prey_list if self.is_within_fov(prey, cone)]
         if not detectable_prey:
             return (1, 0)  # No detectable prey in sight
 
@@ -438,18 +466,28 @@ class Predator(Agent):
 
         return (distance, angle)
 
-    def is_within_fov(self, prey):
-        distance = self._distance_to(prey)
-        if distance > self.fov_distance:
-            return False
-
-        angle_to_prey = math.atan2(prey.position[1] - self.position[1],
-                                   prey.position[0] - self.position[0])
-        relative_angle = abs(self.angle_diff(self.direction, angle_to_prey))
-        if relative_angle > math.radians(self.fov_angle / 2):
+    def fov_cone(self):
+        # (heading x, heading y, cos of half the view angle): the only trig a FOV test needs,
+        # worked out once per predator rather than once per prey. See spatial.in_fov
+        half = math.radians(self.fov_angle) / 2
+        cos_half = math.inf if half < 0 else math.cos(min(half, math.pi))
+        return math.cos(self.direction), math.sin(self.direction), cos_half
+
+    def is_within_fov(self, prey, cone=None):
+        hx, hy, cos_half = cone or self.fov_cone()
+        dx = prey.position[0] - self.position[0]
+        dy = prey.position[1] - self.position[1]
+        dist_sq = dx * dx + dy * dy
+        if dist_sq * (1 - FOV_SLACK) > self.fov_distance * abs(self.fov_distance):
             return False
 
-        return True
+        # dot >= |d| * cos_half, compared as signed squares so there's no square root
+        # (with the same edge slack as spatial.in_fov). Prey right on top of us count as
+        # due east, where atan2(0, 0) = 0 puts them
+        if dist_sq == 0:
+            dx, dist_sq = 1, 1
+        dot = dx * hx + dy * hy
+        return dot * abs(dot) >= dist_sq * (cos_half * abs(cos_half) - FOV_SLACK)
 
     def update(self, agent_list, prey_list, grid, grid_cols, grid_rows):
         # Optimized retrieval of nearby prey
@@ -476,11 +514,12 @@ class Predator(Agent):
 
 
         if nearby_prey:
-            closest_prey = min(nearby_prey, key=lambda p: self._distance_to(p))
+            closest_distance, closest_prey = min(((self._distance_to(p), p) for p in nearby_prey),
+                                                 key=lambda pair: pair[0])
             self.direction = math.atan2(closest_prey.position[1] - self.position[1],
                                         closest_prey.position[0] - self.position[0])
 
-            if self._distance_to(closest_prey) < 20:
+            if closest_distance < 20:
                 energy_before_eating = self.energy
                 self.energy += PREDATOR_ENERGY_GAIN
 
@@ -517,7 +556,7 @@ class Predator(Agent):
         return self.energy >= glow_threshold
 
     def mutate_color(self):
-        shift = lambda x: max(0, min(255, x + random.randint(-100, 100)))  # Shift within [-10, 10] range
+        shift = lambda x: max(0, min(255, x + self.rng.randint(-100, 100)))  # Shift within [-10, 10] range
         self.color = tuple(shift(c) for c in self.color)  # Apply the shift to each RGB component
      #   print(f"[Mutate Color] Color after mutation: {self.color}")
 
@@ -526,33 +565,34 @@ class Predator(Agent):
     def reproduce(self, agent_list):
         if self.energy >= ENERGY_TO_REPRODUCE:
             self.energy /= 2
-            offspring = Predator(color=self.color, fov_angle=self.fov_angle, fov_distance=self.fov_distance)
-            offspring.nn = copy.deepcopy(self.nn)
+            offspring = Predator(color=self.color, fov_angle=self.fov_angle, fov_distance=self.fov_distance,
+                                 rng=self.rng)
+            offspring.nn = self.nn.copy()
 
             # Neural network mutation flag
-            nn_mutated = random.random() < 0.5
+            nn_mutated = self.rng.random() < 0.5
             if nn_mutated:
                 #print(f"Before Mutation: Color: {offspring.color}, FOV Angle: {offspring.fov_angle}, FOV Distance: {offspring.fov_distance}")
-                offspring.nn.mutate(rate=0.2)
+                offspring.nn.mutate(rate=0.2, rng=self.rng)
                 offspring.color = self.mutate_color()
                 # Directly call mutate_fov() on the offspring to adjust both FOV angle and distance
                 offspring.mutate_fov()
                 #print(f"After Mutation: Color: {offspring.color}, FOV Angle: {offspring.fov_angle}, FOV Distance: {offspring.fov_distance}")
 
             # Positioning the offspring
-            offset = random.randint(-10, 10)
-            offspring.position = (self.position[0] + offset, self.position[1] + offset)
+            offset = self.rng.randint(-10, 10)
+            offspring.position = [self.position[0] + offset, self.position[1] + offset]
             offspring.grid_cell = get_grid_cell(offspring.position)
             agent_list.append(offspring)
             self.reproduction_cooldown = 100
 
     def mutate_fov(self):
         # Determine the change magnitude (positive or negative)
-        change = random.randint(-30, 30)  # Adjust the range as needed for your simulation
+        change = self.rng.randint(-30, 30)  # Adjust the range as needed for your simulation
         self.fov_distance += change
         self.fov_angle -= change
 
     def mutate_color(self):
-        new_color = tuple(max(0, min(255, c + random.randint(-50, 50))) for c in self.color)
+        new_color = tuple(max(0, min(255, c + self.rng.randint(-50, 50))) for c in self.color)
         #print(f"Old Color: {self.color}, New Color: {new_color}")  # Debug print
         return new_color
@@ -0,0 +1,236 @@
+import math
+
+import numpy as np
+
+from neural_class import forward_batch, sigmoid
+from spatial import half_angle_cosines, in_fov, nearest_per_query
+
+
+# SECTION 1: BACKEND INTERFACE
+# ----------------------------
+class Backend:
+    """
+    The hot kernels of a tick, one method each. World does the bookkeeping around them
+    (cooldowns, reproduction, births and deaths, all the random draws) and hands the
+    number crunching to its backend, so a faster backend can be checked against a slow,
+    obviously-correct one tick by tick (see parity.py).
+
+    Kernels read the World's columns and either write results back into them or return
+    arrays; none of them may draw random numbers. Rows are World rows.
+    """
+
+    name = None
+
+    def move(self, world, rows, speed, reflect):
+        """Agent.move for rows: step `speed` along the heading, bounce off the borders if reflect, clamp."""
+        raise NotImplementedError
+
+    def perceive_prey(self, world, prey, context):
+        """Nearest predator row (or -1) and its distance for each prey row, within the prey's fov_distance."""
+        raise NotImplementedError
+
+    def perceive_predators(self, world, predators, query, candidate, delta, distance, radius):
+        """
+        For each predator, out of the prey closer than radius: the nearest prey inside its
+        view cone (or -1), and the nearest prey at all (or -1) with its distance (inf if
+        none). (query, candidate) are those pairs already found, with their offsets and
+        distances, for backends that don't want to search for themselves.
+        """
+        raise NotImplementedError
+
+    def decide(self, world, rows, inputs):
+        """NeuralNetwork.forward for rows: (N, 3) inputs -> (N, 2) decisions."""
+        raise NotImplementedError
+
+    def feed(self, field, positions, amount):
+        """EnergyField.consume: graze `amount` at each position, returning what each grazer got."""
+        raise NotImplementedError
+
+    def collide(self, world, context, radius):
+        """Sorted rows of the context's active predators that are within radius of any other agent."""
+        raise NotImplementedError
+
+    def regenerate(self, field):
+        """EnergyField.regenerate: every cell regrows regen_rate, up to max_energy."""
+        raise NotImplementedError
+
+
+# SECTION 2: NUMPY BACKEND
+# ------------------------
+class NumpyBackend(Backend):
+    """The vectorized kernels: one pass over all the agents (or pairs) at a time."""
+
+    name = "numpy"
+
+    def move(self, world, rows, speed, reflect):
+        direction = world.direction[rows]
+        new_x = world.position[rows, 0] + np.cos(direction) * speed
+        new_y = world.position[rows, 1] + np.sin(direction) * speed
+
+        if reflect:
+            hit_x = (new_x <= 0) | (new_x >= world.width)
+            hit_y = (new_y <= 0) | (new_y >= world.height)
+            direction = np.where(hit_x, math.pi - direction, direction)
+            direction = np.where(hit_y, -direction, direction)
+            world.direction[rows] = direction
+
+        world.position[rows, 0] = np.clip(new_x, 0, world.width)
+        world.position[rows, 1] = np.clip(new_y, 0, world.height)
+
+    def perceive_prey(self, world, prey, context):
+        # Grid ring search over the context's predator-only index
+        return context.nearest(world.position, world.position[prey], world.fov_distance[prey])
+
+    def perceive_predators(self, world, predators, query, candidate, delta, distance, radius):
+        # View cones tested without trig (see spatial.in_fov)
+        heading = np.column_stack((np.cos(world.direction[predators]), np.sin(world.direction[predators])))
+        cos_half = half_angle_cosines(world.fov_angle[predators])
+        seen = in_fov(delta, heading[query], cos_half[query], world.fov_distance[predators][query])
+        visible, _ = nearest_per_query(query[seen], candidate[seen], distance[seen], len(predators))
+        closest, closest_distance = nearest_per_query(query, candidate, distance, len(predators))
+        return visible, closest, closest_distance
+
+    def decide(self, world, rows, inputs):
+        return forward_batch(*world.arena.weights(world.genome_slot[rows]), inputs)
+
+    def feed(self, field, positions, amount):
+        return field.consume(positions, amount)
+
+    def collide(self, world, context, radius):
+        context.measure(world.position)
+        query, _ = context.within(radius)
+        bumped = context.rows[np.unique(query)]
+        return bumped[world.active[bumped]]
+
+    def regenerate(self, field):
+        field.regenerate()
+
+
+# SECTION 3: REFERENCE BACKEND
+# ----------------------------
+def _angle_diff(angle1, angle2):
+    # Agent.angle_diff
+    diff = abs(angle1 - angle2) % (2 * math.pi)
+    return min(diff, 2 * math.pi - diff)
+
+
+class ReferenceBackend(Backend):
+    """
+    The Fish.py semantics written out plainly: a Python loop per agent, math instead of
+    numpy, brute-force searches instead of the spatial index, and atan2 bearings for
+    view cones. Far too slow for big worlds; it's the yardstick NumpyBackend is held to.
+    """
+
+    name = "reference"
+
+    def move(self, world, rows, speed, reflect):
+        width, height = world.width, world.height
+        for row, step in zip(np.asarray(rows).tolist(), np.broadcast_to(speed, (len(rows),)).tolist()):
+            direction = float(world.direction[row])
+            x, y = world.position[row].tolist()
+            new_x = x + math.cos(direction) * step
+            new_y = y + math.sin(direction) * step
+            if reflect:
+                if new_x <= 0 or new_x >= width:
+                    direction = math.pi - direction
+                if new_y <= 0 or new_y >= height:
+                    direction = -direction
+                world.direction[row] = direction
+            world.position[row] = (max(0, min(width, new_x)), max(0, min(height, new_y)))
+
+    def perceive_prey(self, world, prey, context):
+        predators = [(row, x, y) for row, (x, y) in zip(context.rows.tolist(), world.position[context.rows].tolist())]
+        nearest, best = [], []
+        for row in prey.tolist():
+            x, y = world.position[row].tolist()
+            found, found_distance = -1, math.inf
+            for other, ox, oy in predators:
+                distance = math.hypot(ox - x, oy - y)
+                # On ties the lowest row wins, as in nearest_per_query
+                if (distance, other) < (found_distance, found):
+                    found, found_distance = other, distance
+            if found_distance > world.fov_distance[row]:
+                found, found_distance = -1, math.inf
+            nearest.append(found)
+            best.append(found_distance)
+        return np.array(nearest, dtype=np.int64), np.array(best)
+
+    def perceive_predators(self, world, predators, query, candidate, delta, distance, radius):
+        # Ignores the pairs it's given: every predator against every prey, the way
+        # Predator.is_within_fov did, keeping those closer than radius
+        from world import PREY  # world imports this module, so not at the top
+
+        n = len(predators)
+        visible, closest, closest_distance = [-1] * n, [-1] * n, [math.inf] * n
+        seen_distance = [math.inf] * n
+        positions = world.position[:world.count].tolist()
+        all_prey = [row for row, species in enumerate(world.species[:world.count].tolist()) if species == PREY]
+        for q, predator in enumerate(np.asarray(predators).tolist()):
+            px, py = positions[predator]
+            for prey in all_prey:
+                x, y = positions[prey]
+                d = math.hypot(x - px, y - py)
+                if d >= radius:
+                    continue
+                # On ties the lowest row wins, as in nearest_per_query
+                if (d, prey) < (closest_distance[q], closest[q]):
+                    closest[q], closest_distance[q] = prey, d
+                bearing = math.atan2(y - py, x - px)
+                in_view = (d <= world.fov_distance[predator]
+                           and _angle_diff(float(world.direction[predator]), bearing)
+                           <= math.radians(world.fov_angle[predator] / 2))
+                if in_view and (d, prey) < (seen_distance[q], visible[q]):
+                    visible[q], seen_distance[q] = prey, d
+        return np.array(visible, dtype=np.int64), np.array(closest, dtype=np.int64), np.array(closest_distance)
+
+    def decide(self, world, rows, inputs):
+        weights_input_to_hidden, weights_hidden_to_output = world.arena.weights(world.genome_slot[rows])
+        decisions = []
+        for x, w_ih, w_ho in zip(inputs.tolist(), weights_input_to_hidden.tolist(),
+                                 weights_hidden_to_output.tolist()):
+            hidden = [sigmoid(sum(x[i] * w_ih[i][h] for i in range(len(x)))) for h in range(len(w_ho))]
+            decisions.append([sigmoid(sum(hidden[h] * w_ho[h][o] for h in range(len(hidden))))
+                              for o in range(len(w_ho[0]))])
+        return np.array(decisions).reshape(len(rows), -1)
+
+    def feed(self, field, positions, amount):
+        amounts = np.broadcast_to(np.asarray(amount, dtype=float), (len(positions),)).tolist()
+        col_width, row_height = field.width / field.cols, field.height / field.rows
+        cells = [(min(max(int(x / col_width), 0), field.cols - 1), min(max(int(y / row_height), 0), field.rows - 1))
+                 for x, y in np.asarray(positions).tolist()]
+
+        # Everyone asks first; a cell that can't feed them all splits what it has in proportion
+        demand = {}
+        for cell, wanted in zip(cells, amounts):
+            demand[cell] = demand.get(cell, 0.0) + wanted
+        share = {cell: (min(1.0, field.energy[cell] / total) if total > 0 else 1.0) for cell, total in demand.items()}
+
+        eaten = [wanted * share[cell] for cell, wanted in zip(cells, amounts)]
+        taken = {}
+        for cell, got in zip(cells, eaten):
+            taken[cell] = taken.get(cell, 0.0) + got
+        for cell, total in taken.items():
+            field.energy[cell] = max(field.energy[cell] - total, 0)
+        return np.array(eaten)
+
+    def collide(self, world, context, radius):
+        # Every active predator against every agent, no grid
+        positions = world.position[:world.count].tolist()
+        bumped = []
+        for row in context.rows.tolist():
+            if not world.active[row]:
+                continue
+            x, y = positions[row]
+            if any(other != row and math.hypot(ox - x, oy - y) < radius
+                   for other, (ox, oy) in enumerate(positions)):
+                bumped.append(row)
+        return np.array(bumped, dtype=np.int64)
+
+    def regenerate(self, field):
+        for col in range(field.cols):
+            for row in range(field.rows):
+                field.energy[col, row] = min(field.energy[col, row] + field.regen_rate, field.max_energy)
+
+
+# Everything selectable by name (e.g. from the command line)
+BACKENDS = {backend.name: backend for backend in (NumpyBackend, ReferenceBackend)}
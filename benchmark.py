@@ -0,0 +1,200 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import time
+import tracemalloc
+
+import numpy as np
+import pygame
+
+from camera import Camera
+from Fish import GRID_COLS, GRID_ROWS, SCREEN_WIDTH, SCREEN_HEIGHT, WORLD_WIDTH, WORLD_HEIGHT, Prey, Predator
+from gui import draw_agents, visible_rows
+from profiler import TickProfiler, PHASES as PROFILER_PHASES
+from simulation import Simulation, START_PREY, START_PREDATORS
+from sweep import write_csv
+
+
+# SECTION 1: BENCHMARK SETUP
+# --------------------------
+SIZES = (100, 1000, 10000, 100000)
+
+# Phases of a tick, in the order they run (the profiler's, minus the display flip)
+PHASES = tuple(phase for phase in PROFILER_PHASES if phase != "flip")
+
+# Worlds keep the default game's prey:predator ratio and agents per pixel, so the
+# interesting number is how cost grows with agent count, not with crowding
+PREDATOR_SHARE = START_PREDATORS / (START_PREY + START_PREDATORS)
+DEFAULT_AGENTS = START_PREY + START_PREDATORS
+
+
+def build(n_agents, seed):
+    """A Simulation of n_agents on a world scaled up (never down) from the default one."""
+    scale = max(1.0, math.sqrt(n_agents / DEFAULT_AGENTS))
+    n_predators = max(1, round(n_agents * PREDATOR_SHARE))
+    return Simulation(n_prey=n_agents - n_predators, n_predators=n_predators,
+                      width=WORLD_WIDTH * scale, height=WORLD_HEIGHT * scale, seed=seed,
+                      energy_cols=max(1, round(GRID_COLS * scale)), energy_rows=max(1, round(GRID_ROWS * scale)))
+
+
+def make_canvas():
+    # Render offscreen into a window-sized surface; no display needed
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    pygame.display.init()
+    pygame.display.set_mode((1, 1))
+    return pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+
+
+# SECTION 2: TIMING
+# -----------------
+def bench_size(n_agents, ticks, warmup, seed, canvas=None):
+    """
+    Time `ticks` ticks (after `warmup` untimed ones) with the simulation's own profiler
+    hooks, drawing what the game window would show (1:1 on the middle of the world) to
+    canvas each tick when one is given, and return one result row of mean milliseconds
+    per phase.
+    """
+    sim = build(n_agents, seed)
+    camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, sim.width, sim.height)
+    profiler = sim.profiler = TickProfiler(history=ticks)
+    profiler.enabled = True
+    for tick in range(warmup + ticks):
+        if tick == warmup:
+            profiler.clear()
+        sim.step()
+        if canvas is not None:
+            with profiler.phase("draw"):
+                canvas.fill((255, 255, 255))
+                draw_agents(canvas, sim.world, camera, visible_rows(sim, camera))
+        profiler.end_frame()
+
+    prey_count, predator_count = sim.populations()
+    row = dict(agents=n_agents, ticks=ticks, prey=prey_count, predators=predator_count)
+    averages = profiler.averages()
+    for phase in PHASES:
+        row[f"{phase}_ms"] = round(averages[phase], 4)
+    if canvas is None:
+        row["draw_ms"] = None
+    total = sum(averages.values())
+    row["tick_ms"] = round(total, 4)
+    row["ticks_per_sec"] = round(1000 / total, 2) if total > 0 else None
+    return row
+
+
+# SECTION 3: MEMORY
+# -----------------
+def object_bytes_per_agent(n_agents, seed):
+    """Bytes per fish for n_agents Prey/Predator objects, brains included, as tracemalloc sees it."""
+    rng = random.Random(seed)
+    n_predators = max(1, round(n_agents * PREDATOR_SHARE))
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        agents = [Prey(rng=rng) for _ in range(n_agents - n_predators)]
+        agents += [Predator(rng=rng) for _ in range(n_predators)]
+        used = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    return used / len(agents)
+
+
+def world_bytes_per_agent(world):
+    # Every column, the genome arena and the registry's lookup tables, over the live agents
+    arrays = [getattr(world, name) for name in world._COLUMNS]
+    arrays += [world.arena.genomes, world.arena.free, world.registry.ids, world.registry.alive,
+               world.registry.row_of]
+    return sum(array.nbytes for array in arrays) / max(1, world.count)
+
+
+def bench_memory(n_agents, seed):
+    return dict(agents=n_agents, object_bytes_per_agent=round(object_bytes_per_agent(n_agents, seed), 1),
+                world_bytes_per_agent=round(world_bytes_per_agent(build(n_agents, seed).world), 1))
+
+
+def print_memory(rows):
+    header = ["agents", "object_bytes_per_agent", "world_bytes_per_agent"]
+    print("  ".join(f"{h:>22}" for h in header))
+    for row in rows:
+        print("  ".join(f"{row[h]:>22}" for h in header))
+
+
+# SECTION 4: RESULTS AND BASELINES
+# --------------------------------
+def environment():
+    return dict(python=platform.python_version(), numpy=np.__version__, machine=platform.machine(),
+                processor=platform.processor(), system=platform.system(),
+                time=time.strftime("%Y-%m-%dT%H:%M:%S"))
+
+
+def compare(rows, baseline_rows):
+    """
+    Add a <metric>_change column (current / baseline - 1, so -0.25 is 25% faster) for
+    every timing the baseline also has at the same agent count.
+    """
+    baseline = {row["agents"]: row for row in baseline_rows}
+    for row in rows:
+        old = baseline.get(row["agents"])
+        if old is None:
+            continue
+        for key in [k for k in row if k.endswith("_ms")]:
+            if row[key] is not None and old.get(key):
+                row[key.replace("_ms", "_change")] = round(row[key] / old[key] - 1, 4)
+    return rows
+
+
+def print_table(rows):
+    header = ["agents"] + [f"{p}_ms" for p in PHASES] + ["tick_ms", "ticks_per_sec"]
+    print("  ".join(f"{h:>14}" for h in header))
+    for row in rows:
+        print("  ".join(f"{'' if row.get(h) is None else row[h]:>14}" for h in header))
+        if "tick_change" in row:
+            changes = [row.get(h.replace("_ms", "_change")) for h in header[1:-1]]
+            print("  ".join(f"{c:>14}" for c in ["vs baseline"] + ["" if c is None else f"{100 * c:+.1f}%"
+                                                                   for c in changes]))
+
+
+# SECTION 5: COMMAND LINE
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time each phase of a simulation tick at several world sizes")
+    parser.add_argument("--sizes", default=",".join(str(s) for s in SIZES),
+                        help="comma-separated agent counts")
+    parser.add_argument("--ticks", type=int, default=50, help="timed ticks per size")
+    parser.add_argument("--warmup", type=int, default=5, help="untimed ticks before timing starts")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--no-render", action="store_true", help="skip timing the drawing code")
+    parser.add_argument("--json", default="benchmark_results.json")
+    parser.add_argument("--csv", default="benchmark_results.csv")
+    parser.add_argument("--baseline", default=None, help="JSON from an earlier run to compare against")
+    parser.add_argument("--memory", action="store_true",
+                        help="also report bytes per agent, for Prey/Predator objects and for the World")
+    args = parser.parse_args(argv)
+
+    canvas = None if args.no_render else make_canvas()
+    rows = []
+    for n_agents in (int(s) for s in args.sizes.split(",")):
+        print(f"{n_agents} agents...")
+        rows.append(bench_size(n_agents, args.ticks, args.warmup, args.seed, canvas))
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(rows, json.load(f)["results"])
+    print_table(rows)
+
+    report = dict(environment=environment(), seed=args.seed, warmup=args.warmup, results=rows)
+    if args.memory:
+        report["memory"] = [bench_memory(row["agents"], args.seed) for row in rows]
+        print()
+        print_memory(report["memory"])
+
+    with open(args.json, "w") as f:
+        json.dump(report, f, indent=2)
+    write_csv(rows, args.csv)
+    print(f"Wrote {args.json} and {args.csv}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import numpy as np
+
+
+# SECTION 1: SETTINGS
+# -------------------
+MAX_ZOOM = 16  # Screen pixels per world unit, fully zoomed in
+ZOOM_OUT_SLACK = 0.5  # How far past "whole world fits" zooming out may go
+
+
+# SECTION 2: CAMERA
+# -----------------
+class Camera:
+    """
+    Which part of the world the window shows, so the world can be any size: the world
+    point at the centre of the view and a zoom in screen pixels per world unit.
+
+    Drawing code maps world positions through to_screen() and lengths through scale();
+    visible_area() says which part of the world is worth drawing at all. The centre is
+    kept inside the world, so you can't pan off into nothing.
+    """
+
+    def __init__(self, view_width, view_height, world_width, world_height, zoom=1.0):
+        self.view_width = view_width
+        self.view_height = view_height
+        self.world_width = world_width
+        self.world_height = world_height
+        self.zoom = zoom
+        self.center = (world_width / 2, world_height / 2)
+        self._clamp()
+
+    @property
+    def fit_zoom(self):
+        # The zoom at which the whole world just fits in the view
+        return min(self.view_width / self.world_width, self.view_height / self.world_height)
+
+    def fit(self):
+        """Show the whole world."""
+        self.zoom = self.fit_zoom
+        self.center = (self.world_width / 2, self.world_height / 2)
+
+    def _clamp(self):
+        self.zoom = min(MAX_ZOOM, max(self.fit_zoom * ZOOM_OUT_SLACK, self.zoom))
+        x, y = self.center
+        self.center = (min(self.world_width, max(0, x)), min(self.world_height, max(0, y)))
+
+    # SECTION 2.1: COORDINATES
+    def to_screen(self, x, y):
+        return ((x - self.center[0]) * self.zoom + self.view_width / 2,
+                (y - self.center[1]) * self.zoom + self.view_height / 2)
+
+    def to_screen_array(self, points):
+        """to_screen() for an (N, 2) array of world positions."""
+        return (np.asarray(points) - self.center) * self.zoom + (self.view_width / 2, self.view_height / 2)
+
+    def to_world(self, x, y):
+        return ((x - self.view_width / 2) / self.zoom + self.center[0],
+                (y - self.view_height / 2) / self.zoom + self.center[1])
+
+    def scale(self, length):
+        return length * self.zoom
+
+    def visible_area(self, margin=0, clip=True):
+        """
+        (x0, y0, x1, y1) of the world in view, grown by margin world units and clipped to
+        the world unless clip is False (agents can stray a little past its edges).
+        """
+        x0, y0 = self.to_world(0, 0)
+        x1, y1 = self.to_world(self.view_width, self.view_height)
+        x0, y0, x1, y1 = x0 - margin, y0 - margin, x1 + margin, y1 + margin
+        if not clip:
+            return x0, y0, x1, y1
+        return max(0, x0), max(0, y0), min(self.world_width, x1), min(self.world_height, y1)
+
+    def shows_everything(self):
+        x0, y0, x1, y1 = self.visible_area()
+        return x0 <= 0 and y0 <= 0 and x1 >= self.world_width and y1 >= self.world_height
+
+    # SECTION 2.2: MOVING
+    def pan(self, dx, dy):
+        """Move the view by (dx, dy) screen pixels."""
+        self.center = (self.center[0] + dx / self.zoom, self.center[1] + dy / self.zoom)
+        self._clamp()
+
+    def zoom_at(self, factor, x, y):
+        """Zoom by factor, keeping the world point under screen position (x, y) where it is."""
+        anchor = self.to_world(x, y)
+        self.zoom *= factor
+        self._clamp()
+        # Put the anchor back under the cursor
+        moved = self.to_screen(*anchor)
+        self.pan(moved[0] - x, moved[1] - y)
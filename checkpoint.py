@@ -0,0 +1,150 @@
+import json
+import os
+import threading
+from dataclasses import asdict
+
+import numpy as np
+
+from params import SimParams
+from simulation import Simulation
+from world import World
+
+
+# SECTION 1: FORMAT
+# -----------------
+# A checkpoint is a single .npz: one array per World column (brains as an (N, 25)
+# "genome" array instead of arena slots), the registry's ids, the energy field, and a
+# small JSON header with the tick, settings, parameters and the world's RNG state. Bump
+# VERSION if the layout changes in a way old files can't be read with. Version 1 files
+# stored stacked weight tensors, which World.load still takes.
+VERSION = 2
+
+# Simulation attributes needed to rebuild one around a loaded world
+SETTINGS = ("n_prey", "n_predators", "width", "height", "seed", "cell_size", "energy_cols", "energy_rows")
+
+
+def snapshot(sim):
+    """
+    Copy everything a checkpoint needs out of sim, as {name: array}. Call it between
+    ticks. It's just array copies, so it's quick enough to take on the sim thread and
+    hand to a background writer.
+    """
+    world = sim.world
+    arrays = {f"column_{name}": column for name, column in world.columns(np.arange(world.count)).items()}
+    arrays["ids"] = world.ids.copy()
+    arrays["energy"] = sim.energy_grid.energy.copy()
+    header = dict(version=VERSION, tick=sim.tick, next_id=world.registry.next_id,
+                  totals=[world.total_births, world.total_deaths, world.total_kills],
+                  settings={name: getattr(sim, name) for name in SETTINGS},
+                  params=asdict(sim.params), rng=world.rng.bit_generator.state)
+    arrays["header"] = np.frombuffer(json.dumps(header).encode(), dtype=np.uint8)
+    return arrays
+
+
+def write(arrays, path, compress=False):
+    # Write next to the target and swap it in, so a crash mid-write never leaves a
+    # half-written checkpoint where the last good one was
+    temporary = f"{path}.partial"
+    with open(temporary, "wb") as f:
+        (np.savez_compressed if compress else np.savez)(f, **arrays)
+    os.replace(temporary, path)
+    return path
+
+
+def save(sim, path, compress=False):
+    """Checkpoint sim to path (a .npz). compress trades save speed for a smaller file."""
+    return write(snapshot(sim), path, compress)
+
+
+# SECTION 2: LOADING
+# ------------------
+def read(path):
+    with np.load(path) as data:
+        header = json.loads(data["header"].tobytes().decode())
+        if header["version"] > VERSION:
+            raise ValueError(f"{path} is a version {header['version']} checkpoint; this code reads up to {VERSION}")
+        columns = {key[len("column_"):]: data[key] for key in data.files if key.startswith("column_")}
+        return header, columns, data["ids"], data["energy"]
+
+
+def restore(sim, path):
+    """Replace sim's world, energy grid, RNG state and tick with the checkpoint's."""
+    header, columns, ids, energy = read(path)
+    rng = np.random.default_rng()
+    rng.bit_generator.state = header["rng"]
+
+    world = World(sim.width, sim.height, capacity=max(len(ids), 16), params=sim.params, rng=rng,
+                  backend=sim.backend)
+    world.load(columns)
+    world.commit()
+    world.registry.restore(ids, header["next_id"])
+    world.total_births, world.total_deaths, world.total_kills = header.get("totals", (0, 0, 0))
+
+    sim.world = world
+    sim.energy_grid.energy[:] = energy
+    sim.index.rebuild(world.position[:world.count])
+    sim.tick = header["tick"]
+    return sim
+
+
+def load(path, backend=None):
+    """A new Simulation, picking up exactly where the checkpoint at path left off."""
+    with np.load(path) as data:
+        header = json.loads(data["header"].tobytes().decode())
+    settings = dict(header["settings"], n_prey=0, n_predators=0)
+    sim = Simulation(**settings, params=SimParams(**header["params"]), backend=backend)
+    # reset() should start the same population as the original run did
+    sim.n_prey, sim.n_predators = header["settings"]["n_prey"], header["settings"]["n_predators"]
+    return restore(sim, path)
+
+
+# SECTION 3: AUTO-CHECKPOINTING
+# -----------------------------
+class AutoCheckpoint:
+    """
+    Saves sim to path every `every` ticks, from creation until close(); it registers
+    itself as one of sim's listeners. The sim thread only pays for the snapshot copy;
+    the file is written on a background thread. If the previous checkpoint is still
+    being written when the next one falls due, that one is skipped rather than queued,
+    so a slow disk can never hold the sim up.
+    """
+
+    def __init__(self, sim, path, every=5000, compress=False):
+        self.sim = sim
+        self.path = path
+        self.every = every
+        self.compress = compress
+        self.last_tick = sim.tick
+        self.thread = None
+        self.saved = 0
+        self.skipped = 0
+        sim.listeners.append(self.maybe_save)
+
+    def busy(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def maybe_save(self):
+        """Call between ticks, as often as you like. Returns True if a save started."""
+        if self.sim.tick < self.last_tick:  # The sim was reset
+            self.last_tick = self.sim.tick
+        if self.sim.tick - self.last_tick < self.every:
+            return False
+        self.last_tick = self.sim.tick
+        if self.busy():
+            self.skipped += 1
+            return False
+        self.thread = threading.Thread(target=write, args=(snapshot(self.sim), self.path, self.compress),
+                                       daemon=True)
+        self.thread.start()
+        self.saved += 1
+        return True
+
+    def close(self, final=True):
+        """Stop listening, wait for any write in flight, then (if final) save right away."""
+        if self.maybe_save in self.sim.listeners:
+            self.sim.listeners.remove(self.maybe_save)
+        if self.thread is not None:
+            self.thread.join()
+        if final:
+            save(self.sim, self.path, self.compress)
+            self.saved += 1
@@ -0,0 +1,360 @@
+import multiprocessing as mp
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from Fish import MAX_ENERGY
+from energy_field import EnergyField
+from simulation import Simulation
+from spatial import SpatialIndex, expand_ranges
+from world import CONTEXT_MARGIN, PREDATOR_SENSE_RADIUS, PREY, World
+
+
+# SECTION 1: SHARED MEMORY PLUMBING
+# ---------------------------------
+def _create_segment(nbytes):
+    return shared_memory.SharedMemory(create=True, size=max(1, nbytes))
+
+
+def _attach_segment(name):
+    # Workers only borrow segments; the coordinator owns (and unlinks) them. Before 3.13
+    # there's no track flag, but workers share the coordinator's resource tracker anyway
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+class SharedArrays:
+    """
+    A bundle of named numpy arrays, each backed by its own shared memory segment.
+    spec() describes them so another process can attach() to the same memory.
+    """
+
+    def __init__(self, segments, layout):
+        self.segments = segments
+        self.layout = layout
+        self.arrays = {name: np.ndarray(shape, dtype=dtype, buffer=segments[name].buf)
+                       for name, (shape, dtype) in layout.items()}
+
+    @classmethod
+    def create(cls, layout):
+        segments = {name: _create_segment(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+                    for name, (shape, dtype) in layout.items()}
+        shared = cls(segments, layout)
+        for array in shared.arrays.values():
+            array.fill(0)
+        return shared
+
+    @classmethod
+    def attach(cls, spec):
+        layout, names = spec
+        return cls({name: _attach_segment(names[name]) for name in layout}, layout)
+
+    def spec(self):
+        return self.layout, {name: segment.name for name, segment in self.segments.items()}
+
+    def __getitem__(self, name):
+        return self.arrays[name]
+
+    def close(self, unlink=False):
+        self.arrays = {}
+        for segment in self.segments.values():
+            segment.close()
+            if unlink:
+                segment.unlink()
+        self.segments = {}
+
+
+class SharedWorld(World):
+    """
+    A World whose columns (and genome arena) live in shared memory so worker processes
+    can read and write them in place. Capacity is fixed when it's created: shared
+    segments can't be grown under the workers' feet.
+    """
+
+    def __init__(self, width, height, capacity, params=None, rng=None, backend=None):
+        self.segments = {}
+        super().__init__(width, height, capacity=capacity, params=params, rng=rng, backend=backend)
+
+    def _allocate(self, name, shape, dtype):
+        if self.capacity:
+            raise RuntimeError(f"Tiled world is full ({self.capacity} agents); "
+                               "start it with a bigger capacity")
+        segment = _create_segment(int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.segments[name] = segment
+        column = np.ndarray(shape, dtype=dtype, buffer=segment.buf)
+        column.fill(0)
+        return column
+
+    def layout(self, genomes=True):
+        layout = {name: (getattr(self, name).shape, getattr(self, name).dtype.str) for name in self._COLUMNS}
+        if genomes:
+            layout["genomes"] = (self.arena.genomes.shape, self.arena.genomes.dtype.str)
+        return layout
+
+    def spec(self):
+        return self.layout(), {name: segment.name for name, segment in self.segments.items()}
+
+    def close(self):
+        for name in self._COLUMNS:
+            setattr(self, name, None)
+        self.arena.genomes = None
+        for segment in self.segments.values():
+            segment.close()
+            segment.unlink()
+        self.segments = {}
+
+
+# SECTION 2: TILES
+# ----------------
+def tile_edges(n_cells, n_tiles, cell_length):
+    """Pixel edges of n_tiles strips, each a contiguous run of whole grid cells."""
+    groups = np.array_split(np.arange(n_cells), n_tiles)
+    return np.array([group[0] for group in groups] + [n_cells]) * cell_length
+
+
+def tile_of(positions, x_edges, y_edges):
+    tx = np.searchsorted(x_edges[1:-1], positions[:, 0], side="right")
+    ty = np.searchsorted(y_edges[1:-1], positions[:, 1], side="right")
+    return ty * (len(x_edges) - 1) + tx
+
+
+def tile_bounds(tile, x_edges, y_edges):
+    tx, ty = tile % (len(x_edges) - 1), tile // (len(x_edges) - 1)
+    return x_edges[tx], x_edges[tx + 1], y_edges[ty], y_edges[ty + 1]
+
+
+class _TileBackend:
+    """
+    A tile's view of the run's backend: everything goes straight through except
+    grazing, which is only written down. The coordinator then feeds every tile's
+    requests to the one real energy grid at once, so a cell on a tile border is never
+    eaten twice. Until then a tile's prey see their energy as it was before grazing.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.cells = []
+        self.amounts = []
+
+    def __getattr__(self, name):
+        return getattr(self.backend, name)
+
+    def feed(self, field, positions, amount):
+        col, row = field.cells_for(positions)
+        self.cells.append(col * field.rows + row)
+        self.amounts.append(np.broadcast_to(np.asarray(amount, dtype=float), (len(positions),)))
+        return np.zeros(len(positions))
+
+
+def step_tile(tile, n, halos, state, snapshot, grid, settings, rng):
+    """
+    Advance the agents of one tile by a tick.
+
+    Reads this tile's agents from the start-of-tick snapshot, plus a read-only halo of
+    prey within halos[0] and predators within halos[1] of the tile (taken from the
+    tiles that close, not the whole world), builds a private World of them, steps it
+    and writes this tile's agents back into the shared state. grid only says which
+    energy cell a position is in. Returns (kills, births, eaten, grazing): the global
+    rows that died (including halo prey eaten from here), the columns of any offspring,
+    the global rows of the prey eaten and (rows, cells, amounts) for every graze asked
+    for, for the coordinator to apply.
+    """
+    width, height, cell_size, _, params, backend, x_edges, y_edges = settings
+    x0, x1, y0, y1 = tile_bounds(tile, x_edges, y_edges)
+    order, tile_start = snapshot["order"], snapshot["tile_start"]
+    own = order[tile_start[tile]:tile_start[tile + 1]]
+
+    # Only tiles the widest halo reaches can hold halo agents
+    reach = max(halos)
+    near_x = np.flatnonzero((x_edges[1:] > x0 - reach) & (x_edges[:-1] < x1 + reach))
+    near_y = np.flatnonzero((y_edges[1:] > y0 - reach) & (y_edges[:-1] < y1 + reach))
+    near_tiles = (near_y[:, None] * (len(x_edges) - 1) + near_x[None, :]).ravel()
+    near_tiles = near_tiles[near_tiles != tile]
+    candidates = order[expand_ranges(tile_start[near_tiles], tile_start[near_tiles + 1] - tile_start[near_tiles])]
+    position = snapshot["position"][candidates]
+    halo = np.where(snapshot["species"][candidates] == PREY, *halos)
+    near = ((position[:, 0] >= x0 - halo) & (position[:, 0] < x1 + halo)
+            & (position[:, 1] >= y0 - halo) & (position[:, 1] < y1 + halo))
+    rows = np.concatenate((own, candidates[near]))
+
+    # Genomes only change at commit, so they're read straight from the live arena
+    columns = {name: snapshot[name][rows] for name in World._COLUMNS if name != "genome_slot"}
+    columns["genome"] = state["genomes"][snapshot["genome_slot"][rows]]
+    grazing = _TileBackend(backend)
+    local = World(width, height, capacity=len(rows) + 64, params=params, rng=rng, backend=grazing)
+    local.load(columns)
+    local.commit()
+    local.active[len(own):local.count] = False
+    # World.move_prey grazes these same rows, in this order, each time it's called
+    grazers = own[local.updating(PREY)]
+
+    index = SpatialIndex(width, height, cell_size)
+    index.update(local.position[:local.count])
+
+    eaten = local.step(grid, index)
+
+    for name in World._COLUMNS:
+        if name != "genome_slot":  # Local slots mean nothing to the shared arena
+            state[name][own] = getattr(local, name)[:len(own)]
+
+    kills = rows[np.flatnonzero(~local.registry.alive[:local.count])]
+    births = local.columns(np.arange(local.count, local.registry.end))
+    grazes = (np.tile(grazers, len(grazing.cells)), np.concatenate(grazing.cells or [np.zeros(0, dtype=np.int64)]),
+              np.concatenate(grazing.amounts or [np.zeros(0)]))
+    return kills, births, rows[eaten], grazes
+
+
+def _worker(conn, tile, state_spec, snapshot_spec, settings, seed):
+    state = SharedArrays.attach(state_spec)
+    snapshot = SharedArrays.attach(snapshot_spec)
+    # Just for working out which energy cell a position is in; the real grid stays with the coordinator
+    width, height, _, (cols, rows), params = settings[:5]
+    grid = EnergyField(cols, rows, width, height, params.grid_max_energy, params.grid_regen_rate)
+    # Each tile gets its own random stream, derived from the run's seed
+    rng = np.random.default_rng(None if seed is None else [seed, tile + 1])
+    try:
+        while True:
+            message = conn.recv()
+            if message[0] == "stop":
+                break
+            _, n, halos = message
+            conn.send(step_tile(tile, n, halos, state, snapshot, grid, settings, rng))
+    finally:
+        state.close()
+        snapshot.close()
+        conn.close()
+
+
+# SECTION 3: TILED SIMULATION
+# ---------------------------
+class TiledSimulation(Simulation):
+    """
+    Optional multi-process mode for very large worlds. The world is cut into
+    tiles_x * tiles_y tiles along the energy grid's cell boundaries (the same cells
+    get_grid_cell uses) and each tile is stepped by its own worker process.
+
+    All agent state lives in shared memory. Every tick the coordinator snapshots it,
+    sorted by tile, workers step their own tiles in parallel (seeing neighbouring agents
+    through a halo, as of the start of the tick: predators as far as prey can see them,
+    prey as far as predators sense them) and write results back in place, then the
+    coordinator applies kills, births, grazing and respawns and commits as usual.
+    Grazing happens on the coordinator's energy grid, all tiles' requests at once, so
+    prey in a tile only get their food at the end of the tick.
+
+    Call close() (or use it as a context manager) to stop the workers and free the
+    shared memory.
+    """
+
+    def __init__(self, *args, tiles=(2, 2), capacity=None, **kwargs):
+        self.tiles = tiles
+        self.capacity = capacity
+        self.workers = []
+        self.world = None
+        self.snapshot = None
+        super().__init__(*args, **kwargs)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def reset(self):
+        self.close()
+        self.tick = 0
+        capacity = self.capacity or max(4096, 8 * (self.n_prey + self.n_predators))
+
+        self.world = SharedWorld(self.width, self.height, capacity, params=self.params,
+                                 rng=np.random.default_rng(self.seed), backend=self.backend)
+        self.index = None
+        tiles_x, tiles_y = self.tiles
+        # Rows sorted by tile: tile t's are order[tile_start[t]:tile_start[t + 1]]
+        self.snapshot = SharedArrays.create({**self.world.layout(genomes=False), "order": ((capacity,), "<i8"),
+                                             "tile_start": ((tiles_x * tiles_y + 1,), "<i8")})
+        self.energy_grid = EnergyField(self.energy_cols, self.energy_rows, self.width, self.height,
+                                       self.params.grid_max_energy, self.params.grid_regen_rate)
+
+        # All prey start with the default green color
+        self.world.spawn_prey(self.n_prey)
+        self.world.spawn_predators(self.n_predators)
+        self.world.commit()
+
+        # Tiles follow whole energy grid cells
+        self.x_edges = tile_edges(self.energy_cols, tiles_x, self.width / self.energy_cols)
+        self.y_edges = tile_edges(self.energy_rows, tiles_y, self.height / self.energy_rows)
+        settings = (self.width, self.height, self.cell_size, (self.energy_cols, self.energy_rows), self.params,
+                    self.backend, self.x_edges, self.y_edges)
+        context = mp.get_context()
+        for tile in range(tiles_x * tiles_y):
+            parent, child = context.Pipe()
+            process = context.Process(target=_worker, daemon=True,
+                                      args=(child, tile, self.world.spec(), self.snapshot.spec(), settings,
+                                            self.seed))
+            process.start()
+            child.close()
+            self.workers.append((process, parent))
+
+    def halos(self):
+        """
+        How far past its edges a tile needs to see (prey, predators): prey within a
+        predator's sensing radius plus a tick's moves (which covers collisions too), and
+        predators within that or the furthest-sighted prey's view, whichever is wider.
+        """
+        prey = self.world.rows_of(PREY)
+        sight = float(self.world.fov_distance[prey].max()) if len(prey) else 0.0
+        sense = PREDATOR_SENSE_RADIUS + CONTEXT_MARGIN + 1
+        return sense, max(sight + 1, sense)
+
+    def step(self):
+        world = self.world
+        n = world.count
+        for name in world._COLUMNS:
+            self.snapshot[name][:n] = getattr(world, name)[:n]
+        # Bucket rows by tile once here, so each worker only touches its own and its neighbours'
+        tiles = tile_of(world.position[:n], self.x_edges, self.y_edges)
+        self.snapshot["order"][:n] = np.argsort(tiles, kind="stable")
+        self.snapshot["tile_start"][1:] = np.cumsum(np.bincount(tiles, minlength=len(self.workers)))
+
+        halos = self.halos()
+        for _, conn in self.workers:
+            conn.send(("step", n, halos))
+        results = [conn.recv() for _, conn in self.workers]
+
+        # Every tile's grazing in one go, so prey from two tiles sharing a cell split it
+        # like they would in one World, then the usual end-of-tick bookkeeping
+        grazers, cells, amounts = (np.concatenate(parts) for parts in zip(*[grazes for *_, grazes in results]))
+        got = self.energy_grid.consume_cells(cells, amounts)
+        np.add.at(world.energy, grazers, got)
+        world.energy[grazers] = np.minimum(world.energy[grazers], MAX_ENERGY)
+        for kills, births, _, _ in results:
+            world.kill(kills)
+            if len(births["species"]):
+                world.load(births)
+                world.total_births += len(births["species"])
+        # A halo prey can be eaten from two tiles at once (feeding both predators, as two
+        # predators sharing a prey do in one World); it's still one kill
+        world.total_kills += len(np.unique(np.concatenate([eaten for _, _, eaten, _ in results])))
+
+        self.backend.regenerate(self.energy_grid)
+        self.respawn()
+        world.commit()
+        self.tick += 1
+        self.notify()
+
+    def close(self):
+        for process, conn in self.workers:
+            try:
+                conn.send(("stop",))
+            except (BrokenPipeError, OSError):
+                pass
+            process.join(timeout=5)
+            conn.close()
+        self.workers = []
+        if self.snapshot is not None:
+            self.snapshot.close(unlink=True)
+            self.snapshot = None
+        if self.world is not None:
+            self.world.close()
+            self.world = None
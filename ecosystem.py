@@ -1,210 +1,118 @@
-import pygame
-from Fish import ENERGY_TO_REPRODUCE, Prey, Predator, update_agent_grid_cells
-from gui_utils import draw_text, draw_button, is_button_clicked  # Make sure to create gui_utils.py as per previous instructions
-from Fish import ENERGY_TO_REPRODUCE, Prey, Predator, update_agent_grid_cells, GridSquare
+import argparse
 
+import checkpoint
+import replay
+import telemetry
+from backends import BACKENDS
+from Fish import GRID_COLS, GRID_ROWS, WORLD_WIDTH, WORLD_HEIGHT
+from domain import TiledSimulation
+from simulation import Simulation, INDEX_CELL_SIZE
 
-# Constants
-SCREEN_WIDTH = 800
-SCREEN_HEIGHT = 600
-GRID_COLS = 20
-GRID_ROWS = 15
 
-
-# Constants for GridSquare
-GRID_MAX_ENERGY = 10  # Maximum energy a grid square can hold
-GRID_REGEN_RATE = 1    # Rate at which energy regenerates in each square
-
-# Initialize the grid with GridSquares
-energy_grid = [[GridSquare(GRID_MAX_ENERGY, GRID_REGEN_RATE) for _ in range(GRID_ROWS)] for _ in range(GRID_COLS)]
-
-
-
-# SECTION 1: PYGAME INITIALIZATION
-# --------------------------------
-pygame.init()
-
-# SECTION 2: DISPLAY SETUP
+# SECTION 1: HEADLESS RUNS
 # ------------------------
-screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-pygame.display.set_caption("Predator-Prey Simulation")
-
-# Font setup for GUI
-font = pygame.font.SysFont(None, 36)  # For counters
-button_font = pygame.font.SysFont(None, 30)  # For buttons
-
-# Reset button properties
-reset_button_pos = (SCREEN_WIDTH - 220, 110)
-reset_button_size = (50, 20)
-button_color = (0, 128, 0)  # Green button
-text_color = (255, 255, 255)  # White text
-
-# FPS Clock
-clock = pygame.time.Clock()
-
-# SPAWN button properties
-spawn_pred_button_pos = (SCREEN_WIDTH - 220, 10)
-spawn_pred_button_size = (50, 20)
-spawn_prey_button_pos = (SCREEN_WIDTH - 220, 60)
-spawn_prey_button_size = (50, 20)
-
-
-# SECTION 3: AGENT INITIALIZATION
-# -------------------------------
-def reset_agents():
-    # All prey start with the default green color
-    return [Prey() for _ in range(100)] + [Predator() for _ in range(5)]
-
-agents = reset_agents()
-
-# FUZZY CIRCLES
-def draw_fuzzy_circle(surface, color, position, radius):
-    if color is None:
-       # print("Error: Attempted to draw fuzzy circle with None color.")
-        return  # Optionally, set a default color or skip drawing.
-
-    x, y = position
-    temp_surface = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
-    for i in range(radius, 0, -1):
-        # If color includes alpha (RGBA), use it directly; otherwise, append a dynamic alpha
-        if len(color) == 4:  # Color is RGBA
-            drawn_color = color  # Use the RGBA color directly
-        else:  # Color is RGB, append a dynamically calculated alpha
-            alpha = int(255 * (1 - i / radius))
-            drawn_color = color + (alpha,)  # Append alpha to the RGB color
-
-        pygame.draw.circle(temp_surface, drawn_color, (radius, radius), i)
-    surface.blit(temp_surface, (x - radius, y - radius))
-
-# Function to interpolate between two colors
-def lerp_color(color1, color2, factor):
-    return (
-        int(color1[0] + (color2[0] - color1[0]) * factor),
-        int(color1[1] + (color2[1] - color1[1]) * factor),
-        int(color1[2] + (color2[2] - color1[2]) * factor)
-    )
-
-# for fuzzy colors to work
-max_energy = ENERGY_TO_REPRODUCE 
-
-def spawn_prey(number, agent_list):
-    for _ in range(number):
-        new_prey = Prey()
-        agent_list.append(new_prey)
-
-def spawn_predators(number, agent_list):
-    for _ in range(number):
-        new_predator = Predator()
-        agent_list.append(new_predator)
-
-
-# SECTION 4: MAIN GAME LOOP
-# -------------------------
-running = True
-# Flags to track if the spawn buttons are currently pressed
-spawn_pred_pressed = False
-spawn_prey_pressed = False
-
-while running:
-    # Handle events
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            running = False
-        if event.type == pygame.MOUSEBUTTONDOWN:
-            if is_button_clicked(event.pos, reset_button_pos, reset_button_size) and not spawn_pred_pressed and not spawn_prey_pressed:
-                agents = reset_agents()  # Reset the simulation
-            elif is_button_clicked(event.pos, spawn_pred_button_pos, spawn_pred_button_size) and not spawn_pred_pressed:
-                spawn_predators(5, agents)
-                spawn_pred_pressed = True
-            elif is_button_clicked(event.pos, spawn_prey_button_pos, spawn_prey_button_size) and not spawn_prey_pressed:
-                spawn_prey(50, agents)
-                spawn_prey_pressed = True
-        elif event.type == pygame.MOUSEBUTTONUP:
-            spawn_pred_pressed = False
-            spawn_prey_pressed = False
-
-    # Update agent states
-    predators = [agent for agent in agents if isinstance(agent, Predator)]
-    prey = [agent for agent in agents if isinstance(agent, Prey)]
-
-    # Update the grid for the current frame
-    spatial_grid = update_agent_grid_cells(agents, GRID_COLS, GRID_ROWS, SCREEN_WIDTH, SCREEN_HEIGHT)
-
-    for agent in agents:
-        if isinstance(agent, Prey):
-            agent.update(agents, predators, spatial_grid, energy_grid, GRID_COLS, GRID_ROWS)
-        elif isinstance(agent, Predator):
-            # If Predator update method doesn't use energy_grid, don't pass it
-            agent.update(agents, prey, spatial_grid, GRID_COLS, GRID_ROWS)
-
-    # SECTION 5: DRAWING
-    screen.fill((255, 255, 255))  # Clear the screen with a white background
-
-    # Calculate and display FPS
-    fps = clock.get_fps()
-    draw_text(screen, f"FPS: {int(fps)}", (10, 70), font, (0, 0, 0))  # Position and color can be adjusted
-
-    # Draw grid lines
-    for x in range(0, SCREEN_WIDTH, SCREEN_WIDTH // GRID_COLS):
-        pygame.draw.line(screen, (200, 200, 200), (x, 0), (x, SCREEN_HEIGHT))
-    for y in range(0, SCREEN_HEIGHT, SCREEN_HEIGHT // GRID_ROWS):
-        pygame.draw.line(screen, (200, 200, 200), (0, y), (SCREEN_WIDTH, y))
-
-     # Regenerate energy in each grid square
-    for row in energy_grid:
-        for cell in row:
-            cell.regenerate_energy()
-   
-    # DRAW AGENTS - FUZZY CIRCLES AND EMOTIONS
-    for agent in agents:
-        if isinstance(agent, Prey):
-            # Draw Prey with its lineage color
-            draw_fuzzy_circle(screen, agent.color, agent.position, 5)
-        elif isinstance(agent, Predator):
-            #print(f"[Before Drawing] Predator color before drawing: {agent.color}")
-            # Use Predator's color for lineage
-            predator_color = agent.color  # This now directly reflects the predator's lineage
-            
-            # If the Predator is close to reproducing, draw a glow effect
-            if agent.is_close_to_reproducing(ENERGY_TO_REPRODUCE):
-                glow_color = (255, 255, 0, 128)  # Yellow glow with alpha
-                # Draw the glow effect around the Predator to indicate it's close to reproducing
-                draw_fuzzy_circle(screen, glow_color, agent.position, 10)  # Glow effect with larger radius
-            
-            # Draw the Predator with its lineage color
-            draw_fuzzy_circle(screen, predator_color, agent.position, 5)
-
-    # Draw counters for predators and prey
-    prey_count = len([agent for agent in agents if isinstance(agent, Prey)])
-    predator_count = len([agent for agent in agents if isinstance(agent, Predator)])
-    draw_text(screen, f"Prey: {prey_count}", (10, 10), font, (0, 0, 0))  # Black color for text
-    draw_text(screen, f"Predators: {predator_count}", (10, 40), font, (0, 0, 0))
-    
-    # Draw reset button
-    draw_button(screen, "Reset", reset_button_pos, reset_button_size, button_font, button_color, text_color)
-
-    # Draw spawn buttons and make sure they are redrawn every frame
-    draw_button(screen, "Spawn Preds", spawn_pred_button_pos, spawn_pred_button_size, button_font, button_color, text_color)
-    draw_button(screen, "Spawn Prey", spawn_prey_button_pos, spawn_prey_button_size, button_font, button_color, text_color)
-
-    #Clock?
-    pygame.display.flip()
-    clock.tick(60)  # You can adjust this value based on desired FPS
-
-    # SECTION 6: DISPLAY REFRESH
-    pygame.display.flip()
-
-    # SECTION 7 - SPAWN FRESH MEAT
-    prey_count = len([agent for agent in agents if isinstance(agent, Prey)])
-    predator_count = len([agent for agent in agents if isinstance(agent, Predator)])
-
-    if prey_count >= 100 and predator_count == 0:
-        # Spawn 5 basic predators
-        for _ in range(5):
-            agents.append(Predator())
-    elif predator_count == 3 and prey_count <= 10:
-        # Only spawn 100 basic prey if there are exactly 5 predators and 10 prey
-        for _ in range(100):
-            agents.append(Prey())
-
-pygame.quit()
+def close_outputs(outputs):
+    # Checkpoints and telemetry listening to the sim: flush and finish them
+    for output in outputs:
+        output.close()
+        print("Wrote", output.path)
+
+
+def run_headless(sim, ticks, report_every=0, profile=None, outputs=()):
+    def report(tick, prey_count, predator_count):
+        print(f"tick {tick}: prey={prey_count} predators={predator_count}")
+
+    if profile:
+        sim.profiler.enabled = True
+    ticks_per_sec = sim.run(ticks, report_every=report_every, report=report)
+    close_outputs(outputs)
+    prey_count, predator_count = sim.populations()
+    print(f"{ticks} ticks at {ticks_per_sec:.1f} ticks/sec")
+    print(f"Final populations: prey={prey_count} predators={predator_count}")
+    if profile:
+        averages = sim.profiler.averages()
+        print("ms/tick: " + ", ".join(f"{name}={ms:.3f}" for name, ms in averages.items() if ms))
+        print("Wrote", sim.profiler.dump_csv(profile))
+
+
+def open_outputs(sim, args):
+    # Everything that listens to the sim's ticks and needs closing at the end
+    outputs = []
+    if args.telemetry:
+        outputs.append(telemetry.TelemetryWriter(sim, args.telemetry))
+    if args.record:
+        outputs.append(replay.ReplayRecorder(sim, args.record))
+    if args.checkpoint:
+        outputs.append(checkpoint.AutoCheckpoint(sim, args.checkpoint, args.checkpoint_every))
+    return outputs
+
+
+# SECTION 2: COMMAND LINE
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Predator-prey ecosystem simulation")
+    parser.add_argument("--headless", action="store_true", help="run without a window, as fast as possible")
+    parser.add_argument("--ticks", type=int, default=10000, help="ticks to run in headless mode")
+    parser.add_argument("--seed", type=int, default=None, help="random seed")
+    parser.add_argument("--prey", type=int, default=100, help="starting prey")
+    parser.add_argument("--predators", type=int, default=5, help="starting predators")
+    parser.add_argument("--world-size", default=None, metavar="WxH",
+                        help=f"world size in world units, e.g. 8000x6000 (default {WORLD_WIDTH}x{WORLD_HEIGHT}); "
+                             "the window shows part of it through a camera")
+    parser.add_argument("--cell-size", type=float, default=None, help="spatial index cell size in world units")
+    parser.add_argument("--energy-grid", default=None, metavar="COLSxROWS",
+                        help="energy grid resolution, e.g. 1000x1000 (default: 20x15 cells' worth of "
+                             f"{WORLD_WIDTH}x{WORLD_HEIGHT}, scaled with the world)")
+    parser.add_argument("--report-every", type=int, default=0, help="print populations every N ticks")
+    parser.add_argument("--tiles", default=None, metavar="TXxTY",
+                        help="split a headless run into TXxTY tiles, one worker process each")
+    parser.add_argument("--checkpoint", default=None, metavar="NPZ",
+                        help="save the run here every --checkpoint-every ticks and when it ends")
+    parser.add_argument("--checkpoint-every", type=int, default=5000, help="ticks between checkpoints")
+    parser.add_argument("--resume", default=None, metavar="NPZ", help="carry on from a saved checkpoint")
+    parser.add_argument("--telemetry", default=None, metavar="FILE",
+                        help="stream per-tick population and trait stats to this file (see telemetry.py)")
+    parser.add_argument("--record", default=None, metavar="FILE",
+                        help="record every tick for playback with replay.py")
+    parser.add_argument("--profile", default=None, metavar="CSV",
+                        help="time each phase of the last ticks of a headless run and write them to CSV")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), default="numpy",
+                        help="compute backend: numpy (fast) or reference (plain Python, for checking); see parity.py")
+    args = parser.parse_args(argv)
+
+    width, height = WORLD_WIDTH, WORLD_HEIGHT
+    if args.world_size:
+        width, height = (float(n) for n in args.world_size.lower().split("x"))
+
+    # A bigger world keeps the default energy cell size unless told otherwise
+    energy_cols = max(1, round(GRID_COLS * width / WORLD_WIDTH))
+    energy_rows = max(1, round(GRID_ROWS * height / WORLD_HEIGHT))
+    if args.energy_grid:
+        energy_cols, energy_rows = (int(n) for n in args.energy_grid.lower().split("x"))
+
+    settings = dict(n_prey=args.prey, n_predators=args.predators, width=width,
+                    height=height, seed=args.seed, cell_size=args.cell_size or INDEX_CELL_SIZE,
+                    energy_cols=energy_cols, energy_rows=energy_rows, backend=BACKENDS[args.backend]())
+    if args.tiles:
+        if not args.headless or args.resume or args.checkpoint or args.profile:
+            parser.error("--tiles only works with --headless, and without checkpoints or --profile")
+        tiles = tuple(int(n) for n in args.tiles.lower().split("x"))
+        with TiledSimulation(tiles=tiles, **settings) as sim:
+            run_headless(sim, args.ticks, args.report_every, outputs=open_outputs(sim, args))
+        return
+
+    # A resumed run keeps the world size, grid and parameters it was saved with
+    sim = checkpoint.load(args.resume, settings["backend"]) if args.resume else Simulation(**settings)
+    outputs = open_outputs(sim, args)
+    if args.headless:
+        run_headless(sim, args.ticks, args.report_every, args.profile, outputs)
+    else:
+        # pygame is only needed once there's a window to open
+        from gui import run_gui
+        run_gui(sim)
+        # Closing the window doesn't lose the run
+        close_outputs(outputs)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+import numpy as np
+
+
+class EnergyField:
+    """
+    The food grid as one float array instead of a list of lists of GridSquares.
+    energy[col, row] matches the old energy_grid[col][row] layout.
+
+    Regeneration is a single clamped add and grazing is a scatter-add, so the grid can be
+    far finer than 20x15 (1000x1000 is fine) without any per-cell Python objects.
+    """
+
+    def __init__(self, cols, rows, width, height, max_energy, regen_rate):
+        self.cols = cols
+        self.rows = rows
+        self.width = width
+        self.height = height
+        self.max_energy = max_energy
+        self.regen_rate = regen_rate
+        self.energy = np.full((cols, rows), float(max_energy))
+
+    @property
+    def total(self):
+        return float(self.energy.sum())
+
+    def cells_for(self, positions):
+        col_width, row_height = self.width / self.cols, self.height / self.rows
+        col = np.clip((positions[:, 0] / col_width).astype(np.int64), 0, self.cols - 1)
+        row = np.clip((positions[:, 1] / row_height).astype(np.int64), 0, self.rows - 1)
+        return col, row
+
+    def regenerate(self):
+        np.minimum(self.energy + self.regen_rate, self.max_energy, out=self.energy)
+
+    def consume(self, positions, amount):
+        """
+        Every position tries to eat `amount` (a scalar or one value each) from its cell.
+        When a cell can't feed everyone in it, what it has is split in proportion to what
+        each grazer asked for. Returns the energy each grazer actually got.
+        """
+        col, row = self.cells_for(positions)
+        return self.consume_cells(col * self.rows + row, amount)
+
+    def consume_cells(self, cell, amount):
+        """consume() for flat cell numbers (col * rows + row) instead of positions."""
+        amount = np.broadcast_to(np.asarray(amount, dtype=float), (len(cell),))
+        flat = self.energy.reshape(-1)
+
+        # Work only over occupied cells, so cost tracks the number of grazers, not the grid size
+        cells, inverse = np.unique(cell, return_inverse=True)
+        demand = np.bincount(inverse, weights=amount)
+        share = np.ones(len(cells))
+        wanted = demand > 0
+        share[wanted] = np.minimum(1.0, flat[cells[wanted]] / demand[wanted])
+
+        eaten = amount * share[inverse]
+        flat[cells] = np.maximum(flat[cells] - np.bincount(inverse, weights=eaten), 0)
+        return eaten
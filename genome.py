@@ -0,0 +1,113 @@
+import numpy as np
+
+
+# SECTION 1: GENOME LAYOUT
+# ------------------------
+# Every agent carries the same 3 -> 5 -> 2 network; its genome is both weight matrices
+# flattened into one row, input->hidden first
+NN_INPUTS, NN_HIDDEN, NN_OUTPUTS = 3, 5, 2
+INPUT_TO_HIDDEN = NN_INPUTS * NN_HIDDEN
+GENOME_SIZE = INPUT_TO_HIDDEN + NN_HIDDEN * NN_OUTPUTS
+
+# Size of a mutation nudge, as in NeuralNetwork.mutate
+MUTATION_STEP = 0.1
+
+
+def split(genomes):
+    """(N, GENOME_SIZE) genomes -> (N, 3, 5) input->hidden and (N, 5, 2) hidden->output views."""
+    n = len(genomes)
+    return (genomes[:, :INPUT_TO_HIDDEN].reshape(n, NN_INPUTS, NN_HIDDEN),
+            genomes[:, INPUT_TO_HIDDEN:].reshape(n, NN_HIDDEN, NN_OUTPUTS))
+
+
+def join(weights_input_to_hidden, weights_hidden_to_output):
+    """The inverse of split(): stacked weight tensors -> (N, GENOME_SIZE) genomes."""
+    n = len(weights_input_to_hidden)
+    return np.concatenate((np.reshape(weights_input_to_hidden, (n, -1)),
+                           np.reshape(weights_hidden_to_output, (n, -1))), axis=1)
+
+
+# SECTION 2: ARENA
+# ----------------
+class GenomeArena:
+    """
+    Every genome in one contiguous float array, a row ("slot") per agent.
+
+    Slots are handed out by allocate() and given back by release(); released slots go
+    on a free list and are reused before the high-water mark moves, so a population that
+    churns but doesn't grow never allocates. When it does run out, the array doubles.
+
+    Breeding is a row copy (clone) plus a masked, vectorized nudge (mutate), the batched
+    equivalent of deepcopy-then-NeuralNetwork.mutate. A slot stays put for the agent's
+    whole life, so compacting agent rows only ever moves the slot number.
+
+    Storage comes from `allocate_storage(name, shape, dtype)`, which lets a World keep the
+    genomes wherever it keeps its columns (see World._allocate).
+    """
+
+    def __init__(self, capacity=0, size=GENOME_SIZE, allocate_storage=None):
+        self.size = size
+        self._allocate_storage = allocate_storage or (lambda name, shape, dtype: np.zeros(shape, dtype=dtype))
+        self.genomes = np.zeros((0, size))
+        self.free = np.zeros(0, dtype=np.int64)  # Stack of released slots
+        self.n_free = 0
+        self.used = 0  # High-water mark: slots at or past this have never been handed out
+        self.grow(capacity)
+
+    @property
+    def capacity(self):
+        return len(self.genomes)
+
+    @property
+    def live(self):
+        return self.used - self.n_free
+
+    def grow(self, needed):
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2, 16)
+        genomes = self._allocate_storage("genomes", (new_capacity, self.size), self.genomes.dtype)
+        genomes[:self.used] = self.genomes[:self.used]
+        free = np.zeros(new_capacity, dtype=np.int64)
+        free[:self.n_free] = self.free[:self.n_free]
+        self.genomes, self.free = genomes, free
+
+    def allocate(self, n):
+        """n slots, recycled ones first. Their contents are whatever was there before."""
+        reused = min(n, self.n_free)
+        fresh = n - reused
+        self.grow(self.used + fresh)
+        self.n_free -= reused
+        slots = np.concatenate((self.free[self.n_free:self.n_free + reused][::-1],
+                                np.arange(self.used, self.used + fresh)))
+        self.used += fresh
+        return slots
+
+    def release(self, slots):
+        slots = np.asarray(slots, dtype=np.int64)
+        self.free[self.n_free:self.n_free + len(slots)] = slots
+        self.n_free += len(slots)
+
+    # SECTION 2.1: BREEDING
+    def randomize(self, slots, rng):
+        # Fresh brains, weights uniform in [-1, 1) like NeuralNetwork.__init__
+        n = len(slots)
+        self.genomes[slots, :INPUT_TO_HIDDEN] = rng.uniform(-1, 1, (n, INPUT_TO_HIDDEN))
+        self.genomes[slots, INPUT_TO_HIDDEN:] = rng.uniform(-1, 1, (n, self.size - INPUT_TO_HIDDEN))
+
+    def clone(self, parents, slots=None):
+        """Copy the parents' genomes into slots (fresh ones by default) and return the slots."""
+        if slots is None:
+            slots = self.allocate(len(parents))
+        self.genomes[slots] = self.genomes[parents]
+        return slots
+
+    def mutate(self, slots, rate, rng, step=MUTATION_STEP):
+        # Each weight has a `rate` chance of a +-step nudge, all slots in one pass
+        shape = (len(slots), self.size)
+        hit = rng.random(shape) < rate
+        self.genomes[slots] += hit * rng.uniform(-step, step, shape)
+
+    def weights(self, slots):
+        """(input->hidden, hidden->output) weight tensors for the given slots (copies)."""
+        return split(self.genomes[slots])
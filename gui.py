@@ -0,0 +1,269 @@
+import time
+
+import numpy as np
+import pygame
+from gui_utils import is_button_clicked, SpriteCache  # Make sure to create gui_utils.py as per previous instructions
+from camera import Camera
+from Fish import ENERGY_TO_REPRODUCE, SCREEN_WIDTH, SCREEN_HEIGHT
+from renderer import Renderer
+from simulation import FixedStepScheduler, SPEEDS
+from world import PREY, PREDATOR, PreyView, PredatorView
+
+
+# Reset button properties
+reset_button_pos = (SCREEN_WIDTH - 220, 110)
+reset_button_size = (50, 20)
+button_color = (0, 128, 0)  # Green button
+text_color = (255, 255, 255)  # White text
+
+# SPAWN button properties
+spawn_pred_button_pos = (SCREEN_WIDTH - 220, 10)
+spawn_pred_button_size = (50, 20)
+spawn_prey_button_pos = (SCREEN_WIDTH - 220, 60)
+spawn_prey_button_size = (50, 20)
+
+# Fast-forward buttons, one per entry in SPEEDS (1x, 10x, Max)
+speed_button_size = (50, 20)
+speed_button_positions = [(SCREEN_WIDTH - 220 + 70 * i, 160) for i in range(len(SPEEDS))]
+
+# Profiler keys: P shows/hides the per-phase overlay (and turns timing on/off), O dumps it to CSV
+PROFILE_OVERLAY_KEY = pygame.K_p
+PROFILE_DUMP_KEY = pygame.K_o
+PROFILE_WINDOW = 60  # Frames the overlay averages over
+
+# Camera controls: arrows/WASD or right/middle-drag pan, wheel or +/- zoom, Home shows the whole world
+PAN_SPEED = 10  # Screen pixels per frame while a pan key is held
+ZOOM_STEP = 1.25  # Per wheel notch or key press
+PAN_KEYS = {pygame.K_LEFT: (-1, 0), pygame.K_a: (-1, 0), pygame.K_RIGHT: (1, 0), pygame.K_d: (1, 0),
+            pygame.K_UP: (0, -1), pygame.K_w: (0, -1), pygame.K_DOWN: (0, 1), pygame.K_s: (0, 1)}
+ZOOM_IN_KEYS = (pygame.K_EQUALS, pygame.K_PLUS, pygame.K_KP_PLUS)
+ZOOM_OUT_KEYS = (pygame.K_MINUS, pygame.K_KP_MINUS)
+FIT_KEY = pygame.K_HOME
+
+# Agents are drawn this big (world units) at zoom 1; the glow is the widest thing drawn
+AGENT_RADIUS = 5
+GLOW_RADIUS = 10
+MIN_DRAWN_RADIUS = 2  # Pixels; a fuzzy circle any smaller is fully transparent
+
+
+# FUZZY CIRCLES
+def render_fuzzy_circle(color, radius):
+    temp_surface = pygame.Surface((radius*2, radius*2), pygame.SRCALPHA)
+    for i in range(radius, 0, -1):
+        # If color includes alpha (RGBA), use it directly; otherwise, append a dynamic alpha
+        if len(color) == 4:  # Color is RGBA
+            drawn_color = color  # Use the RGBA color directly
+        else:  # Color is RGB, append a dynamically calculated alpha
+            alpha = int(255 * (1 - i / radius))
+            drawn_color = color + (alpha,)  # Append alpha to the RGB color
+
+        pygame.draw.circle(temp_surface, drawn_color, (radius, radius), i)
+    return temp_surface
+
+# Mutated lineage colors keep adding keys, so old ones get evicted
+fuzzy_circles = SpriteCache(render_fuzzy_circle, max_size=1024)
+
+def draw_fuzzy_circle(surface, color, position, radius):
+    if color is None:
+       # print("Error: Attempted to draw fuzzy circle with None color.")
+        return  # Optionally, set a default color or skip drawing.
+
+    x, y = position
+    # A cache hit is a single blit
+    return surface.blit(fuzzy_circles.get(tuple(color), radius), (x - radius, y - radius))
+
+# Function to interpolate between two colors
+def lerp_color(color1, color2, factor):
+    return (
+        int(color1[0] + (color2[0] - color1[0]) * factor),
+        int(color1[1] + (color2[1] - color1[1]) * factor),
+        int(color1[2] + (color2[2] - color1[2]) * factor)
+    )
+
+# for fuzzy colors to work
+max_energy = ENERGY_TO_REPRODUCE 
+
+# CULLING - which agents are worth drawing at all
+def visible_rows(sim, camera):
+    """
+    Rows of the agents inside the camera's view (plus a glow's width), sorted so they
+    draw in the same order as before. The sim's spatial index finds the candidates,
+    caught up once per tick rather than every frame, so drawing a zoomed-in view of a
+    huge world only touches the agents near it.
+    """
+    world = sim.world
+    positions = world.position[:world.count]
+    # Not clipped to the world, so agents just past its edge still get drawn
+    x0, y0, x1, y1 = camera.visible_area(GLOW_RADIUS, clip=False)
+    if camera.shows_everything() or getattr(sim, "index", None) is None:
+        rows = np.arange(world.count)
+    else:
+        # The index puts anything past the edge in the edge cells, which the rect reaches
+        rows = sim.current_index().rows_in_rect(x0, y0, x1, y1)
+    inside = ((positions[rows, 0] >= x0) & (positions[rows, 0] <= x1)
+              & (positions[rows, 1] >= y0) & (positions[rows, 1] <= y1))
+    return np.sort(rows[inside])
+
+
+# DRAW AGENTS - FUZZY CIRCLES AND EMOTIONS
+def draw_agents(surface, world, camera=None, rows=None):
+    """
+    Draw the world's agents (only `rows`, if given) and return the rects that were
+    touched. Positions go through camera when there is one; otherwise world units are
+    screen pixels.
+    """
+    if camera is None:
+        place, radius, glow_radius = (lambda position: position), AGENT_RADIUS, GLOW_RADIUS
+    else:
+        place = lambda position: camera.to_screen(*position)
+        radius = max(MIN_DRAWN_RADIUS, round(camera.scale(AGENT_RADIUS)))
+        glow_radius = max(MIN_DRAWN_RADIUS + 1, round(camera.scale(GLOW_RADIUS)))
+    rects = []
+    for agent in world.agents() if rows is None else world.agents(rows):
+        position = place(agent.position)
+        if isinstance(agent, PreyView):
+            # Draw Prey with its lineage color
+            rects.append(draw_fuzzy_circle(surface, agent.color, position, radius))
+        elif isinstance(agent, PredatorView):
+            # Use Predator's color for lineage
+            predator_color = agent.color  # This now directly reflects the predator's lineage
+
+            # If the Predator is close to reproducing, draw a glow effect
+            if agent.is_close_to_reproducing(ENERGY_TO_REPRODUCE):
+                glow_color = (255, 255, 0, 128)  # Yellow glow with alpha
+                # Draw the glow effect around the Predator to indicate it's close to reproducing
+                rects.append(draw_fuzzy_circle(surface, glow_color, position, glow_radius))  # Glow effect with larger radius
+
+            # Draw the Predator with its lineage color
+            rects.append(draw_fuzzy_circle(surface, predator_color, position, radius))
+    return rects
+
+# PROFILER OVERLAY - rolling ms per phase, bottom left
+def draw_profile(renderer, profiler, font):
+    averages = profiler.averages(PROFILE_WINDOW)
+    lines = [f"{name}: {ms:.2f} ms" for name, ms in averages.items()]
+    lines.append(f"frame: {sum(averages.values()):.2f} ms")
+    top = SCREEN_HEIGHT - 10 - 18 * len(lines)
+    for i, line in enumerate(lines):
+        # Keyed by row, so a line is only re-rendered when its number changes
+        renderer.text(("profile", i), line, (10, top + 18 * i), font, color=(80, 80, 80))
+
+# SECTION 4: MAIN GAME LOOP
+# -------------------------
+def run_gui(sim):
+    # SECTION 4.1: PYGAME INITIALIZATION AND DISPLAY SETUP
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption("Predator-Prey Simulation")
+
+    # Font setup for GUI
+    font = pygame.font.SysFont(None, 36)  # For counters
+    button_font = pygame.font.SysFont(None, 30)  # For buttons
+    overlay_font = pygame.font.SysFont(None, 22)  # For the profiler overlay
+
+    # FPS Clock
+    clock = pygame.time.Clock()
+
+    # The window shows the world through a camera, starting at 1:1 on the middle of it
+    camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, sim.width, sim.height)
+
+    # Static background, grid lines and buttons get drawn once here (and again when the camera moves)
+    renderer = Renderer(screen, sim.energy_cols, sim.energy_rows, camera=camera)
+    renderer.add_button("Spawn Preds", spawn_pred_button_pos, spawn_pred_button_size, button_font, button_color, text_color)
+    renderer.add_button("Spawn Prey", spawn_prey_button_pos, spawn_prey_button_size, button_font, button_color, text_color)
+    renderer.add_button("Reset", reset_button_pos, reset_button_size, button_font, button_color, text_color)
+    for speed, position in zip(SPEEDS, speed_button_positions):
+        label = "Max" if speed is None else f"{speed}x"
+        renderer.add_button(label, position, speed_button_size, button_font, button_color, text_color)
+
+    # Ticks run on a fixed timestep of their own; frames just show the latest state
+    scheduler = FixedStepScheduler(sim)
+    profiler = sim.profiler
+
+    running = True
+    # Flags to track if the spawn buttons are currently pressed
+    spawn_pred_pressed = False
+    spawn_prey_pressed = False
+
+    while running:
+        # Handle events
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
+                if is_button_clicked(event.pos, reset_button_pos, reset_button_size) and not spawn_pred_pressed and not spawn_prey_pressed:
+                    sim.reset()  # Reset the simulation
+                    renderer.invalidate()
+                elif is_button_clicked(event.pos, spawn_pred_button_pos, spawn_pred_button_size) and not spawn_pred_pressed:
+                    sim.world.spawn_predators(5)
+                    spawn_pred_pressed = True
+                elif is_button_clicked(event.pos, spawn_prey_button_pos, spawn_prey_button_size) and not spawn_prey_pressed:
+                    sim.world.spawn_prey(50)
+                    spawn_prey_pressed = True
+                for speed, position in zip(SPEEDS, speed_button_positions):
+                    if is_button_clicked(event.pos, position, speed_button_size):
+                        scheduler.set_speed(speed)
+            elif event.type == pygame.MOUSEBUTTONUP:
+                spawn_pred_pressed = False
+                spawn_prey_pressed = False
+            elif event.type == pygame.MOUSEMOTION and (event.buttons[1] or event.buttons[2]):
+                # Drag the world along with the mouse
+                camera.pan(-event.rel[0], -event.rel[1])
+                renderer.draw_background()
+            elif event.type == pygame.MOUSEWHEEL:
+                camera.zoom_at(ZOOM_STEP ** event.y, *pygame.mouse.get_pos())
+                renderer.draw_background()
+            elif event.type == pygame.KEYDOWN and event.key in ZOOM_IN_KEYS + ZOOM_OUT_KEYS + (FIT_KEY,):
+                if event.key == FIT_KEY:
+                    camera.fit()
+                else:
+                    factor = ZOOM_STEP if event.key in ZOOM_IN_KEYS else 1 / ZOOM_STEP
+                    camera.zoom_at(factor, SCREEN_WIDTH / 2, SCREEN_HEIGHT / 2)
+                renderer.draw_background()
+            elif event.type == pygame.KEYDOWN and pygame.K_1 <= event.key < pygame.K_1 + len(SPEEDS):
+                # Number keys pick a speed too: 1 = 1x, 2 = 10x, 3 = Max
+                scheduler.set_speed(SPEEDS[event.key - pygame.K_1])
+            elif event.type == pygame.KEYDOWN and event.key == PROFILE_OVERLAY_KEY:
+                profiler.toggle()
+            elif event.type == pygame.KEYDOWN and event.key == PROFILE_DUMP_KEY and profiler.filled:
+                print("Wrote", profiler.dump_csv(time.strftime("profile_%Y%m%d_%H%M%S.csv")))
+
+        # Held pan keys scroll smoothly rather than a step per press
+        pressed = pygame.key.get_pressed()
+        dx = sum(step[0] for key, step in PAN_KEYS.items() if pressed[key])
+        dy = sum(step[1] for key, step in PAN_KEYS.items() if pressed[key])
+        if dx or dy:
+            camera.pan(dx * PAN_SPEED, dy * PAN_SPEED)
+            renderer.draw_background()
+
+        # Update agent states, regenerate the grid and respawn if things died out -
+        # as many ticks as this frame is worth at the current speed
+        scheduler.advance()
+        world = sim.world
+
+        # SECTION 5: DRAWING
+        with profiler.phase("draw"):
+            # Paint over last frame's agents and text with the static background
+            renderer.begin_frame()
+            renderer.mark(draw_agents(screen, world, camera, visible_rows(sim, camera)))
+
+            # Draw counters for predators and prey, plus FPS; text is only re-rendered when it changes
+            fps = clock.get_fps()
+            renderer.text("prey", f"Prey: {world.count_species(PREY)}", (10, 10), font)  # Black color for text
+            renderer.text("predators", f"Predators: {world.count_species(PREDATOR)}", (10, 40), font)
+            renderer.text("fps", f"FPS: {int(fps)}", (10, 70), font)
+            renderer.text("speed", f"Speed: {scheduler.speed_label()} ({scheduler.ticks_last_frame} ticks/frame)",
+                          (10, 100), font)
+            if profiler.enabled:
+                draw_profile(renderer, profiler, overlay_font)
+
+            # Buttons were rendered once up front
+            renderer.draw_buttons()
+
+        # SECTION 6: DISPLAY REFRESH - only the rects that changed
+        with profiler.phase("flip"):
+            renderer.finish()
+        profiler.end_frame(scheduler.ticks_last_frame)
+        clock.tick(60)  # You can adjust this value based on desired FPS
+
+    pygame.quit()
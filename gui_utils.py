@@ -1,4 +1,5 @@
 import pygame
+from collections import OrderedDict
 
 def draw_text(screen, text, position, font, color=(255, 255, 255)):
     """
@@ -13,28 +14,42 @@ def draw_text(screen, text, position, font, color=(255, 255, 255)):
     text_surface = font.render(text, True, color)
     screen.blit(text_surface, position)
 
-def draw_button(screen, text, position, size, font, button_color, text_color, padding=10):
+def render_button(text, size, font, button_color, text_color, padding=10):
     """
-    Draws a button with text on the Pygame screen, with added padding.
+    Renders a button with text onto its own surface, so it can be drawn once and blitted.
 
     :param padding: Padding around the text within the button.
+    :return: Pygame surface for the button
     """
     # Calculate text surface with padding
     text_surface = font.render(text, True, text_color)
     text_width_with_padding = text_surface.get_width() + 2 * padding
     text_height_with_padding = text_surface.get_height() + 2 * padding
-    
+
     # Adjust button size if text is too wide
     if text_width_with_padding > size[0]:
         size = (text_width_with_padding, size[1])
-    
+
+    # Never clip the text vertically
+    size = (size[0], max(size[1], text_surface.get_height()))
+
     # Draw button rectangle
-    pygame.draw.rect(screen, button_color, (*position, *size))
-    
-    # Blit the text surface onto the screen at the centered position
-    text_x = position[0] + (size[0] - text_surface.get_width()) // 2
-    text_y = position[1] + (size[1] - text_surface.get_height()) // 2
-    screen.blit(text_surface, (text_x, text_y))
+    button_surface = pygame.Surface(size)
+    button_surface.fill(button_color)
+
+    # Blit the text surface onto the button at the centered position
+    text_x = (size[0] - text_surface.get_width()) // 2
+    text_y = (size[1] - text_surface.get_height()) // 2
+    button_surface.blit(text_surface, (text_x, text_y))
+    return button_surface
+
+def draw_button(screen, text, position, size, font, button_color, text_color, padding=10):
+    """
+    Draws a button with text on the Pygame screen, with added padding.
+
+    :param padding: Padding around the text within the button.
+    """
+    screen.blit(render_button(text, size, font, button_color, text_color, padding), position)
 
 
 def is_button_clicked(mouse_pos, button_pos, button_size):
@@ -49,3 +64,44 @@ def is_button_clicked(mouse_pos, button_pos, button_size):
     x, y = mouse_pos
     bx, by, bw, bh = button_pos[0], button_pos[1], button_size[0], button_size[1]
     return bx <= x <= bx + bw and by <= y <= by + bh
+
+
+class SpriteCache:
+    """
+    Least-recently-used cache of pre-rendered surfaces.
+
+    :param factory: Function that renders a surface from the key's parts, e.g. factory(color, radius)
+    :param max_size: Number of surfaces to keep before the least recently used is dropped
+    """
+    def __init__(self, factory, max_size=256):
+        self.factory = factory
+        self.max_size = max_size
+        self.sprites = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def get(self, *key):
+        """
+        Returns the surface for key, rendering and caching it on a miss.
+
+        :param key: Hashable arguments passed straight to the factory
+        :return: Pygame surface
+        """
+        sprite = self.sprites.get(key)
+        if sprite is not None:
+            self.sprites.move_to_end(key)
+            self.hits += 1
+            return sprite
+
+        self.misses += 1
+        sprite = self.factory(*key)
+        self.sprites[key] = sprite
+        if len(self.sprites) > self.max_size:
+            self.sprites.popitem(last=False)
+        return sprite
+
+    def clear(self):
+        self.sprites.clear()
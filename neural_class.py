@@ -1,41 +1,113 @@
 import random
 import math
+from array import array
+from itertools import chain
+
+import numpy as np
 
 def sigmoid(x):
     return 1 / (1 + math.exp(-x))
 
+def sigmoid_batch(x):
+    return 1 / (1 + np.exp(-x))
+
+def forward_batch(weights_input_to_hidden, weights_hidden_to_output, inputs):
+    """
+    Evaluate a whole population in one go.
+
+    :param weights_input_to_hidden: (N, input_size, hidden_size) array, one network per row
+    :param weights_hidden_to_output: (N, hidden_size, output_size) array
+    :param inputs: (N, input_size) array
+    :return: (N, output_size) array of decisions
+    """
+    hidden = sigmoid_batch(np.einsum('ni,nih->nh', inputs, weights_input_to_hidden))
+    return sigmoid_batch(np.einsum('nh,nho->no', hidden, weights_hidden_to_output))
+
+def stack_weights(networks):
+    """Stack a list of NeuralNetworks into the two weight tensors forward_batch takes."""
+    n = len(networks)
+    if n == 0:
+        return np.zeros((0, 0, 0)), np.zeros((0, 0, 0))
+    first = networks[0]
+    flat = np.array([nn.weights for nn in networks], dtype=float)
+    return first.split(flat.reshape(n, -1))
+
 class NeuralNetwork:
-    def __init__(self, input_size, hidden_size, output_size):
+    """
+    A small feed-forward network. All the weights live in one flat array('d'), the
+    input->hidden matrix row by row and then hidden->output (the genome layout in
+    genome.py), so a network is one buffer rather than a list of lists of float
+    objects. weights_input_to_hidden and weights_hidden_to_output still read and write
+    them as nested lists.
+    """
+    # One per fish, so no per-instance __dict__
+    __slots__ = ("input_size", "hidden_size", "output_size", "weights")
+
+    def __init__(self, input_size, hidden_size, output_size, rng=random):
         self.input_size = input_size
         self.hidden_size = hidden_size
         self.output_size = output_size
 
-        # Initialize weights
-        self.weights_input_to_hidden = [[random.uniform(-1, 1) for _ in range(hidden_size)] for _ in range(input_size)]
-        self.weights_hidden_to_output = [[random.uniform(-1, 1) for _ in range(output_size)] for _ in range(hidden_size)]
+        # Initialize weights, in the same order the nested lists used to draw them. rng is
+        # anything with random()/uniform() (the random module or a random.Random), so a
+        # seeded run doesn't depend on the global generator
+        self.weights = array("d", (rng.uniform(-1, 1) for _ in range(self.n_weights)))
+
+    @property
+    def n_weights(self):
+        return self.input_size * self.hidden_size + self.hidden_size * self.output_size
+
+    @classmethod
+    def from_weights(cls, weights_input_to_hidden, weights_hidden_to_output):
+        """Build a network around existing weight matrices without drawing any random numbers."""
+        nn = cls.__new__(cls)
+        nn.input_size = len(weights_input_to_hidden)
+        nn.hidden_size = len(weights_hidden_to_output)
+        nn.output_size = len(weights_hidden_to_output[0])
+        nn.weights = array("d", chain(*weights_input_to_hidden, *weights_hidden_to_output))
+        return nn
+
+    def split(self, flat):
+        # (N, n_weights) rows -> the (N, in, hidden) and (N, hidden, out) tensors forward_batch takes
+        n, cut = len(flat), self.input_size * self.hidden_size
+        return (flat[:, :cut].reshape(n, self.input_size, self.hidden_size),
+                flat[:, cut:].reshape(n, self.hidden_size, self.output_size))
+
+    @property
+    def weights_input_to_hidden(self):
+        h = self.hidden_size
+        return [self.weights[i * h:(i + 1) * h].tolist() for i in range(self.input_size)]
+
+    @weights_input_to_hidden.setter
+    def weights_input_to_hidden(self, rows):
+        self.weights[:self.input_size * self.hidden_size] = array("d", chain(*rows))
+
+    @property
+    def weights_hidden_to_output(self):
+        o, start = self.output_size, self.input_size * self.hidden_size
+        return [self.weights[start + i * o:start + (i + 1) * o].tolist() for i in range(self.hidden_size)]
+
+    @weights_hidden_to_output.setter
+    def weights_hidden_to_output(self, rows):
+        self.weights[self.input_size * self.hidden_size:] = array("d", chain(*rows))
+
+    def copy(self):
+        # What reproduce used deepcopy for, without deepcopy's per-object bookkeeping
+        nn = NeuralNetwork.__new__(NeuralNetwork)
+        nn.input_size, nn.hidden_size, nn.output_size = self.input_size, self.hidden_size, self.output_size
+        nn.weights = array("d", self.weights)
+        return nn
 
     def forward(self, inputs):
-        # Hidden layer
-        hidden = [0] * self.hidden_size
-        for i in range(self.hidden_size):
-            for j in range(self.input_size):
-                hidden[i] += inputs[j] * self.weights_input_to_hidden[j][i]
-            hidden[i] = sigmoid(hidden[i])
-
-        # Output layer
-        output = [0] * self.output_size
-        for i in range(self.output_size):
-            for j in range(self.hidden_size):
-                output[i] += hidden[j] * self.weights_hidden_to_output[j][i]
-            output[i] = sigmoid(output[i])
-
-        return output
-
-    def mutate(self, rate):
-        def mutate_value(value):
-            if random.random() < rate:
-                return value + random.uniform(-0.1, 0.1)
-            return value
-
-        self.weights_input_to_hidden = [[mutate_value(w) for w in layer] for layer in self.weights_input_to_hidden]
-        self.weights_hidden_to_output = [[mutate_value(w) for w in layer] for layer in self.weights_hidden_to_output]
+        # Thin wrapper over the batched path, a population of one (a view, not a copy, of the weights)
+        weights_input_to_hidden, weights_hidden_to_output = self.split(np.frombuffer(self.weights)[None, :])
+        decision = forward_batch(weights_input_to_hidden, weights_hidden_to_output,
+                                 np.asarray([inputs], dtype=float))
+        return decision[0].tolist()
+
+    def mutate(self, rate, rng=random):
+        # Same draws in the same order as mutating the nested lists layer by layer did
+        weights = self.weights
+        for i in range(len(weights)):
+            if rng.random() < rate:
+                weights[i] += rng.uniform(-0.1, 0.1)
@@ -0,0 +1,39 @@
+from dataclasses import dataclass, fields, replace
+
+from Fish import PREY_ENERGY_GAIN, PREDATOR_ENERGY_GAIN, ENERGY_TO_REPRODUCE, PREY_ENERGY_TO_REPRODUCE
+
+
+# Constants for the energy grid
+GRID_MAX_ENERGY = 10  # Maximum energy a grid square can hold
+GRID_REGEN_RATE = 1    # Rate at which energy regenerates in each square
+
+
+@dataclass(frozen=True)
+class SimParams:
+    """
+    The tunable knobs of a run. Defaults are the module constants the sim has always
+    used; a parameter sweep overrides some of them per run, e.g.
+    SimParams().with_overrides(grid_regen_rate=2).
+    """
+    prey_energy_gain: float = PREY_ENERGY_GAIN
+    predator_energy_gain: float = PREDATOR_ENERGY_GAIN
+    energy_to_reproduce: float = ENERGY_TO_REPRODUCE
+    prey_energy_to_reproduce: float = PREY_ENERGY_TO_REPRODUCE
+    grid_max_energy: float = GRID_MAX_ENERGY
+    grid_regen_rate: float = GRID_REGEN_RATE
+
+    # Chance an offspring mutates at all, and the per-weight rate when it does
+    prey_mutation_chance: float = 0.5
+    prey_mutation_rate: float = 0.1
+    predator_mutation_chance: float = 0.5
+    predator_mutation_rate: float = 0.2
+
+    @classmethod
+    def names(cls):
+        return [f.name for f in fields(cls)]
+
+    def with_overrides(self, **overrides):
+        unknown = set(overrides) - set(self.names())
+        if unknown:
+            raise ValueError(f"Unknown parameter(s): {', '.join(sorted(unknown))}")
+        return replace(self, **overrides)
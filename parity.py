@@ -0,0 +1,126 @@
+import argparse
+import sys
+
+import numpy as np
+
+from backends import BACKENDS
+from simulation import Simulation, START_PREY, START_PREDATORS
+from sweep import write_csv
+
+
+# SECTION 1: COMPARING TWO WORLDS
+# -------------------------------
+# Per-agent columns compared between backends, matched up by agent id
+COMPARED = ("position", "direction", "velocity", "energy", "reproduction_cooldown", "eating_cooldown",
+            "boost_cooldown", "fov_angle", "fov_distance", "color", "genome_slot")
+
+# Largest difference still counted as agreeing (float rounding, not a behaviour change)
+TOLERANCE = 1e-6
+
+
+def divergence(sim_a, sim_b):
+    """
+    One row describing how far apart two simulations are. If both hold the same agents
+    (by id), it's the largest absolute difference per column plus the energy grid;
+    otherwise the populations themselves have split and `same_agents` is False.
+    """
+    world_a, world_b = sim_a.world, sim_b.world
+    prey_a, predators_a = sim_a.populations()
+    prey_b, predators_b = sim_b.populations()
+    row = dict(tick=sim_a.tick, prey_a=prey_a, prey_b=prey_b, predators_a=predators_a, predators_b=predators_b)
+
+    ids_a, ids_b = world_a.ids, world_b.ids
+    row["same_agents"] = len(ids_a) == len(ids_b) and bool(np.array_equal(np.sort(ids_a), np.sort(ids_b)))
+    if row["same_agents"]:
+        rows_a, rows_b = np.argsort(ids_a), np.argsort(ids_b)
+        for name in COMPARED:
+            a, b = getattr(world_a, name)[rows_a], getattr(world_b, name)[rows_b]
+            # As floats, so unsigned columns (colours) can't wrap around
+            row[name] = float(np.abs(a.astype(float) - b).max()) if len(a) else 0.0
+    else:
+        row.update(dict.fromkeys(COMPARED))
+    row["energy_grid"] = float(np.abs(sim_a.energy_grid.energy - sim_b.energy_grid.energy).max())
+    return row
+
+
+def diverged(row, tolerance=TOLERANCE):
+    if not row["same_agents"]:
+        return True
+    return any(row[name] > tolerance for name in COMPARED + ("energy_grid",))
+
+
+# SECTION 2: LOCKSTEP RUN
+# -----------------------
+def run(backend_a, backend_b, ticks, seed, n_prey=START_PREY, n_predators=START_PREDATORS,
+        tolerance=TOLERANCE, report=None):
+    """
+    Step one Simulation per backend from the same seed, side by side, and return a
+    divergence row per tick (see divergence()). report(row) is called on each row that
+    goes past tolerance. Both runs share every random draw, so any difference comes
+    from the backends.
+    """
+    sims = [Simulation(n_prey=n_prey, n_predators=n_predators, seed=seed, backend=backend)
+            for backend in (backend_a, backend_b)]
+    rows = [divergence(*sims)]
+    for _ in range(ticks):
+        for sim in sims:
+            sim.step()
+        rows.append(divergence(*sims))
+        if report is not None and diverged(rows[-1], tolerance):
+            report(rows[-1])
+    return rows
+
+
+def summarize(rows, tolerance=TOLERANCE):
+    first = next((row["tick"] for row in rows if diverged(row, tolerance)), None)
+    split = next((row["tick"] for row in rows if not row["same_agents"]), None)
+    worst = {name: max((row[name] for row in rows if row[name] is not None), default=0.0)
+             for name in COMPARED + ("energy_grid",)}
+    return dict(ticks=rows[-1]["tick"], first_divergence=first, populations_split=split, worst=worst)
+
+
+# SECTION 3: COMMAND LINE
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run two compute backends in lockstep and report where they disagree")
+    parser.add_argument("--backends", default="reference,numpy", help="the two backends to compare")
+    parser.add_argument("--ticks", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--prey", type=int, default=START_PREY)
+    parser.add_argument("--predators", type=int, default=START_PREDATORS)
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE)
+    parser.add_argument("--csv", default=None, help="write the per-tick divergence here")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args(argv)
+
+    names = args.backends.split(",")
+    if len(names) != 2 or any(name not in BACKENDS for name in names):
+        parser.error(f"--backends takes two of: {', '.join(BACKENDS)}")
+
+    def report(row):
+        if not args.quiet:
+            values = ", ".join(f"{name}={row[name]:.3g}" for name in COMPARED + ("energy_grid",)
+                               if row[name] is not None)
+            print(f"tick {row['tick']}: prey {row['prey_a']}/{row['prey_b']}, "
+                  f"predators {row['predators_a']}/{row['predators_b']}"
+                  + (f", {values}" if row["same_agents"] else ", populations differ"))
+
+    rows = run(BACKENDS[names[0]](), BACKENDS[names[1]](), args.ticks, args.seed, args.prey, args.predators,
+               args.tolerance, report)
+    if args.csv:
+        write_csv(rows, args.csv)
+
+    summary = summarize(rows, args.tolerance)
+    worst = ", ".join(f"{name}={value:.3g}" for name, value in summary["worst"].items())
+    if summary["first_divergence"] is None:
+        print(f"{names[0]} and {names[1]} agree to within {args.tolerance} for {summary['ticks']} ticks "
+              f"(largest differences: {worst})")
+        return 0
+    print(f"{names[0]} and {names[1]} diverge from tick {summary['first_divergence']}"
+          + (f"; populations split at tick {summary['populations_split']}" if summary["populations_split"] is not None
+             else "") + f" (largest differences: {worst})")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
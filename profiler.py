@@ -0,0 +1,108 @@
+import csv
+import time
+from contextlib import nullcontext
+
+import numpy as np
+
+
+# SECTION 1: SETTINGS
+# -------------------
+# Everything a frame spends time on, in the order it happens
+PHASES = ("index", "prey", "predators", "collisions", "regenerate", "commit", "draw", "flip")
+
+# Frames kept in the ring buffer (10 seconds at 60 FPS)
+HISTORY = 600
+
+# What phase() hands out while profiling is off: entering and leaving it does nothing
+_OFF = nullcontext()
+
+
+# SECTION 2: PROFILER
+# -------------------
+class _PhaseTimer:
+    # One reusable timer per phase, so timing a phase allocates nothing
+    __slots__ = ("profiler", "column", "start")
+
+    def __init__(self, profiler, column):
+        self.profiler = profiler
+        self.column = column
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = self.profiler.clock()
+
+    def __exit__(self, *exc):
+        self.profiler.current[self.column] += self.profiler.clock() - self.start
+
+
+class TickProfiler:
+    """
+    Wall time per phase, one row per frame, in a fixed-size ring buffer.
+
+    Wrap each phase in `with profiler.phase("prey"):`. Phases can run several times a
+    frame (fast-forward runs several ticks); their times add up until end_frame() stores
+    the row. While disabled, phase() returns a shared do-nothing context and end_frame()
+    returns straight away, so the hooks can stay in place permanently. Times come from
+    clock (a stand-in makes it testable).
+    """
+
+    def __init__(self, phases=PHASES, history=HISTORY, clock=time.perf_counter):
+        self.phases = tuple(phases)
+        self.clock = clock
+        self.samples = np.zeros((history, len(self.phases)))
+        self.ticks = np.zeros(history, dtype=np.int64)
+        self.current = [0.0] * len(self.phases)
+        self.next = 0  # Row the next frame goes into
+        self.filled = 0
+        self.frame = 0  # Frames recorded since the last clear()
+        self.enabled = False
+        self._timers = {name: _PhaseTimer(self, column) for column, name in enumerate(self.phases)}
+
+    def phase(self, name):
+        return self._timers[name] if self.enabled else _OFF
+
+    def toggle(self):
+        self.enabled = not self.enabled
+        self.current = [0.0] * len(self.phases)
+        return self.enabled
+
+    def end_frame(self, ticks=1):
+        """Store this frame's phase times (and how many sim ticks it ran) and start a new row."""
+        if not self.enabled:
+            return
+        self.samples[self.next] = self.current
+        self.ticks[self.next] = ticks
+        self.current = [0.0] * len(self.phases)
+        self.next = (self.next + 1) % len(self.samples)
+        self.filled = min(self.filled + 1, len(self.samples))
+        self.frame += 1
+
+    def clear(self):
+        self.samples[:] = 0
+        self.ticks[:] = 0
+        self.current = [0.0] * len(self.phases)
+        self.next = self.filled = self.frame = 0
+
+    def recent(self, frames=None):
+        """The last `frames` rows (default: everything kept), oldest first, in seconds."""
+        frames = self.filled if frames is None else min(frames, self.filled)
+        rows = (self.next - frames + np.arange(frames)) % len(self.samples)
+        return self.samples[rows], self.ticks[rows]
+
+    def averages(self, frames=None):
+        """{phase: mean milliseconds per frame} over the last `frames` frames."""
+        samples, _ = self.recent(frames)
+        if len(samples) == 0:
+            return dict.fromkeys(self.phases, 0.0)
+        return dict(zip(self.phases, (1000 * samples.mean(axis=0)).tolist()))
+
+    def dump_csv(self, path):
+        """Write the buffer out, one row per frame with times in milliseconds. Returns path."""
+        samples, ticks = self.recent()
+        first = self.frame - len(samples)
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["frame", "ticks"] + [f"{name}_ms" for name in self.phases])
+            for i, (row, n) in enumerate(zip(samples, ticks)):
+                writer.writerow([first + i, int(n)] + [round(1000 * t, 4) for t in row])
+        return path
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+class EntityRegistry:
+    """
+    Bookkeeping for a dense block of agent rows with stable integer ids.
+
+    Rows 0..count-1 are live. Births are staged in rows count..count+pending-1 and
+    deaths only set a tombstone, so nothing moves while a tick is running. commit()
+    then makes the births live and fills each dead row with a survivor from the end
+    (swap-remove), which is O(deaths) and always produces the same row order for the
+    same sequence of births and deaths.
+    """
+
+    def __init__(self, capacity=0):
+        self.count = 0
+        self.pending = 0
+        self.next_id = 0
+        self.ids = np.zeros(0, dtype=np.int64)  # row -> id
+        self.alive = np.zeros(0, dtype=bool)  # row -> not tombstoned
+        self.row_of = np.zeros(0, dtype=np.int64)  # id -> row, -1 once dead
+        self.grow(capacity)
+
+    def __len__(self):
+        return self.count
+
+    @property
+    def end(self):
+        # One past the last staged row
+        return self.count + self.pending
+
+    def grow(self, capacity):
+        if capacity <= len(self.ids):
+            return
+        for name in ("ids", "alive"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _grow_ids(self, needed):
+        if needed <= len(self.row_of):
+            return
+        new = np.full(max(needed, 2 * len(self.row_of), 16), -1, dtype=np.int64)
+        new[:len(self.row_of)] = self.row_of
+        self.row_of = new
+
+    def reserve(self, n):
+        """Stage n births and return their rows. They go live at the next commit()."""
+        rows = np.arange(self.end, self.end + n)
+        self.grow(self.end + n)
+        new_ids = np.arange(self.next_id, self.next_id + n)
+        self._grow_ids(self.next_id + n)
+        self.ids[rows] = new_ids
+        self.alive[rows] = True
+        self.row_of[new_ids] = rows
+        self.next_id += n
+        self.pending += n
+        return rows
+
+    def restore(self, ids, next_id):
+        """
+        Reset to exactly len(ids) live rows carrying these ids, e.g. when loading a
+        checkpoint. Any staged births are dropped.
+        """
+        n = len(ids)
+        self.grow(n)
+        self.row_of = np.full(max(next_id, 16), -1, dtype=np.int64)
+        self.ids[:n] = ids
+        self.alive[:] = False
+        self.alive[:n] = True
+        self.row_of[self.ids[:n]] = np.arange(n)
+        self.count = n
+        self.pending = 0
+        self.next_id = next_id
+
+    def kill(self, rows):
+        """Tombstone rows. Killing the same row twice in a tick is harmless."""
+        self.alive[rows] = False
+
+    def is_alive(self, rows):
+        return self.alive[rows]
+
+    def rows_for(self, ids):
+        return self.row_of[ids]
+
+    def commit(self):
+        """
+        Apply this tick's births and deaths. Returns (holes, movers): the caller must copy
+        every per-agent column from row movers[i] to row holes[i].
+        """
+        end = self.end
+        dead = np.flatnonzero(~self.alive[:end])
+        live_count = end - len(dead)
+
+        # Dead rows inside the surviving block get filled by live rows from past its end,
+        # last survivor into the first hole
+        holes = dead[dead < live_count]
+        movers = (np.flatnonzero(self.alive[live_count:end]) + live_count)[::-1]
+
+        self.row_of[self.ids[dead]] = -1
+        self.ids[holes] = self.ids[movers]
+        self.row_of[self.ids[holes]] = holes
+        self.alive[holes] = True
+        self.alive[live_count:end] = False
+
+        self.count = live_count
+        self.pending = 0
+        return holes, movers
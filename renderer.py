@@ -0,0 +1,111 @@
+import pygame
+from gui_utils import render_button
+
+
+# Past this many dirty rectangles a single full-screen update is cheaper
+MAX_DIRTY_RECTS = 400
+
+# Grid lines closer together than this (zoomed out on a big world) are skipped
+MIN_GRID_SPACING = 8
+
+
+class Renderer:
+    """
+    Draws frames on top of a pre-rendered static background and only pushes the parts of
+    the screen that changed to the display.
+
+    The white background and grid lines are drawn once. Buttons are rendered once, and
+    text is only re-rendered when its value changes. Each frame, everything drawn last
+    frame is painted over with the background, the new frame is drawn with blit(), and
+    finish() updates just last frame's and this frame's rectangles.
+
+    With a camera the grid is the world's, drawn through the camera, and whatever lies
+    outside the world is shaded; call draw_background() after moving the camera.
+    """
+
+    def __init__(self, screen, grid_cols, grid_rows, background_color=(255, 255, 255),
+                 grid_color=(200, 200, 200), outside_color=(225, 225, 225), camera=None):
+        self.screen = screen
+        self.width, self.height = screen.get_size()
+        self.grid_cols, self.grid_rows = grid_cols, grid_rows
+        self.background_color, self.grid_color, self.outside_color = background_color, grid_color, outside_color
+        self.camera = camera
+        self.background = pygame.Surface((self.width, self.height))
+        self.draw_background()
+
+        self.buttons = []
+        self.texts = {}
+        self.drawn = []  # Rects drawn this frame
+        self.previous = []  # Rects drawn last frame, to be painted over
+        self.full_redraw = True
+
+    def draw_background(self):
+        if self.camera is None:
+            self.background.fill(self.background_color)
+            for x in range(0, self.width, self.width // self.grid_cols):
+                pygame.draw.line(self.background, self.grid_color, (x, 0), (x, self.height))
+            for y in range(0, self.height, self.height // self.grid_rows):
+                pygame.draw.line(self.background, self.grid_color, (0, y), (self.width, y))
+        else:
+            camera = self.camera
+            left, top = camera.to_screen(0, 0)
+            right, bottom = camera.to_screen(camera.world_width, camera.world_height)
+            self.background.fill(self.outside_color)
+            world = pygame.Rect(round(left), round(top), round(right - left), round(bottom - top))
+            self.background.fill(self.background_color, world)
+            # Only the lines on screen, and none at all once they'd blur into a solid fill
+            if (right - left) / self.grid_cols >= MIN_GRID_SPACING:
+                for col in range(self.grid_cols):
+                    x = round(left + (right - left) * col / self.grid_cols)
+                    if 0 <= x < self.width:
+                        pygame.draw.line(self.background, self.grid_color, (x, world.top), (x, world.bottom - 1))
+            if (bottom - top) / self.grid_rows >= MIN_GRID_SPACING:
+                for row in range(self.grid_rows):
+                    y = round(top + (bottom - top) * row / self.grid_rows)
+                    if 0 <= y < self.height:
+                        pygame.draw.line(self.background, self.grid_color, (world.left, y), (world.right - 1, y))
+        self.full_redraw = True
+
+    def add_button(self, text, position, size, font, button_color, text_color):
+        self.buttons.append((render_button(text, size, font, button_color, text_color), position))
+
+    def invalidate(self):
+        # Repaint and push the whole screen next frame (first frame, resets, ...)
+        self.full_redraw = True
+
+    def begin_frame(self):
+        self.drawn = []
+        if self.full_redraw or len(self.previous) > MAX_DIRTY_RECTS:
+            self.screen.blit(self.background, (0, 0))
+        else:
+            for rect in self.previous:
+                self.screen.blit(self.background, rect, rect)
+
+    def blit(self, surface, position):
+        rect = self.screen.blit(surface, position)
+        self.drawn.append(rect)
+        return rect
+
+    def mark(self, rects):
+        # For things drawn straight onto the screen without going through blit()
+        self.drawn.extend(rect for rect in rects if rect is not None)
+
+    def text(self, key, value, position, font, color=(0, 0, 0)):
+        """Draw text, re-rendering it only when value differs from last time for this key."""
+        cached = self.texts.get(key)
+        if cached is None or cached[0] != value:
+            cached = (value, font.render(value, True, color))
+            self.texts[key] = cached
+        return self.blit(cached[1], position)
+
+    def draw_buttons(self):
+        for surface, position in self.buttons:
+            self.blit(surface, position)
+
+    def finish(self):
+        if self.full_redraw or len(self.previous) + len(self.drawn) > MAX_DIRTY_RECTS:
+            pygame.display.flip()
+        else:
+            pygame.display.update(self.previous + self.drawn)
+        self.full_redraw = False
+        self.previous = self.drawn
@@ -0,0 +1,367 @@
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+import time
+import zlib
+
+import numpy as np
+
+from world import PREY, PREDATOR, _VIEW_TYPES
+
+
+# SECTION 1: FILE FORMAT
+# ----------------------
+# MAGIC, a uint32 length and a JSON header (world size, quantization), then chunks.
+# Each chunk holds a keyframe plus the delta frames after it, so any chunk decodes on
+# its own and seeking only ever means decoding one chunk:
+#
+#   CHUNK_HEADER (payload bytes, first tick, frame count), then zlib(payload)
+#
+# The payload is, back to back: a (frames, 3) int64 table of (tick, agents, new agents)
+# and, for all frames in order, int32 ids, int16 (x, y), uint16 energy, and the
+# species (uint8) and colors (uint8 x3) of agents that weren't in the previous frame.
+# Positions are quantized to int16, with the world spanning 0..QUANT_WORLD so offspring
+# placed a little past the edge still fit (anything further out is clipped); in delta
+# frames they're stored as the (wrapping) change since the same id's last position,
+# which is tiny and zlib squeezes it down to almost nothing.
+MAGIC = b"FISHRPL1"
+HEADER_LENGTH = struct.Struct("<I")
+CHUNK_HEADER = struct.Struct("<IqI")
+
+KEYFRAME_EVERY = 300  # Frames per chunk
+QUANT_RANGE = 32767  # int16 limit
+QUANT_WORLD = 30000
+
+
+def _match(ids, previous_ids):
+    # For each id, its row in previous_ids (anything, where found is False)
+    if len(previous_ids) == 0:
+        return np.zeros(len(ids), dtype=np.int64), np.zeros(len(ids), dtype=bool)
+    sorter = np.argsort(previous_ids)
+    slot = np.minimum(np.searchsorted(previous_ids, ids, sorter=sorter), len(previous_ids) - 1)
+    rows = sorter[slot]
+    return rows, previous_ids[rows] == ids
+
+
+# SECTION 2: RECORDING
+# --------------------
+class ReplayRecorder:
+    """
+    Records every `every`-th tick of sim (positions, colors, species and energy; enough
+    to draw a frame) to path. Registers itself as one of sim's listeners.
+
+    Frames are encoded on the sim thread, which is just a few array ops. Each finished
+    chunk is compressed and written by a background thread.
+    """
+
+    def __init__(self, sim, path, every=1, keyframe_every=KEYFRAME_EVERY):
+        self.sim = sim
+        self.path = path
+        self.every = every
+        self.keyframe_every = keyframe_every
+        self.scale = QUANT_WORLD / max(sim.width, sim.height)
+        self.frames = []
+        self.first_tick = None
+        self.previous_ids = np.zeros(0, dtype=np.int32)
+        self.previous_q = np.zeros((0, 2), dtype=np.int16)
+        self._world = None
+        self.recorded = 0
+
+        self.file = open(path, "wb")
+        header = json.dumps(dict(width=sim.width, height=sim.height, scale=self.scale, every=every,
+                                 energy_cols=sim.energy_cols, energy_rows=sim.energy_rows)).encode()
+        self.file.write(MAGIC + HEADER_LENGTH.pack(len(header)) + header)
+        self.queue = queue.Queue(maxsize=8)
+        self.thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self.thread.start()
+        sim.listeners.append(self.record)
+        self.record(force=True)
+
+    def record(self, force=False):
+        sim, world = self.sim, self.sim.world
+        if sim.tick % self.every and not force:
+            return
+        n = world.count
+        ids = world.ids.astype(np.int32)
+        q = np.round(np.clip(world.position[:n] * self.scale, -QUANT_RANGE, QUANT_RANGE)).astype(np.int16)
+        energy = np.clip(np.round(world.energy[:n]), 0, 65535).astype(np.uint16)
+
+        # A reset replaces the world and restarts ids, so start a fresh chunk
+        if world is not self._world:
+            self._world = world
+            self.finish_chunk()
+        if len(self.frames) == 0:
+            rows, found = np.zeros(n, dtype=np.int64), np.zeros(n, dtype=bool)
+            delta = q
+            self.first_tick = sim.tick
+        else:
+            rows, found = _match(ids, self.previous_ids)
+            delta = q.copy()
+            delta[found] = q[found] - self.previous_q[rows[found]]  # Wraps, and unwraps on decode
+        new = ~found
+        self.frames.append((sim.tick, ids, delta, energy, world.species[:n][new].astype(np.uint8),
+                            world.color[:n][new].astype(np.uint8)))
+        self.previous_ids, self.previous_q = ids, q
+        self.recorded += 1
+        if len(self.frames) == self.keyframe_every:
+            self.finish_chunk()
+
+    def finish_chunk(self):
+        if not self.frames:
+            return
+        table = np.array([(tick, len(ids), len(species)) for tick, ids, _, _, species, _ in self.frames],
+                         dtype=np.int64)
+        parts = [table] + [np.concatenate([frame[i] for frame in self.frames]) for i in range(1, 6)]
+        self.queue.put((self.first_tick, len(self.frames), parts))
+        self.frames = []
+
+    def _write_chunks(self):
+        while True:
+            item = self.queue.get()
+            if item is None:
+                break
+            first_tick, n_frames, parts = item
+            payload = zlib.compress(b"".join(part.tobytes() for part in parts), 6)
+            self.file.write(CHUNK_HEADER.pack(len(payload), first_tick, n_frames))
+            self.file.write(payload)
+            self.file.flush()
+
+    def close(self):
+        if self.record in self.sim.listeners:
+            self.sim.listeners.remove(self.record)
+        self.finish_chunk()
+        self.queue.put(None)
+        self.thread.join()
+        self.file.close()
+
+
+# SECTION 3: PLAYBACK
+# -------------------
+class Frame:
+    """
+    One recorded tick, with just enough of a World's interface (position, color,
+    energy, species, agents()) for gui.draw_agents to draw it.
+    """
+
+    def __init__(self, tick, ids, species, position, color, energy):
+        self.tick = tick
+        self.ids = ids
+        self.species = species
+        self.position = position
+        self.color = color
+        self.energy = energy
+
+    @property
+    def count(self):
+        return len(self.ids)
+
+    def agents(self):
+        return [_VIEW_TYPES[s](self, row) for row, s in enumerate(self.species.tolist())]
+
+    def count_species(self, species):
+        return int(np.count_nonzero(self.species == species))
+
+
+class ReplayReader:
+    """
+    Random access to a replay file. Opening it only reads chunk headers; a chunk is
+    decoded (into ready-to-draw Frames) the first time one of its frames is needed, and
+    the most recent chunks are kept around so playing and scrubbing nearby stays cheap.
+    """
+
+    def __init__(self, path, cached_chunks=4):
+        self.path = path
+        self.file = open(path, "rb")
+        if self.file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a replay file")
+        (length,) = HEADER_LENGTH.unpack(self.file.read(HEADER_LENGTH.size))
+        self.header = json.loads(self.file.read(length))
+        self.width, self.height = self.header["width"], self.header["height"]
+
+        # (offset, payload length, first frame number, frame count) per chunk
+        self.chunks = []
+        self.n_frames = 0
+        size = os.path.getsize(path)
+        offset = self.file.tell()
+        while offset + CHUNK_HEADER.size <= size:
+            self.file.seek(offset)
+            length, _, n_frames = CHUNK_HEADER.unpack(self.file.read(CHUNK_HEADER.size))
+            if offset + CHUNK_HEADER.size + length > size:  # Cut off mid-write
+                break
+            self.chunks.append((offset + CHUNK_HEADER.size, length, self.n_frames, n_frames))
+            self.n_frames += n_frames
+            offset += CHUNK_HEADER.size + length
+        self.chunk_starts = np.array([chunk[2] for chunk in self.chunks], dtype=np.int64)
+        self.cached_chunks = cached_chunks
+        self.cache = {}
+
+    def __len__(self):
+        return self.n_frames
+
+    def close(self):
+        self.file.close()
+
+    def frame(self, number):
+        """Frame number `number` (0-based, in recording order)."""
+        chunk = int(np.searchsorted(self.chunk_starts, number, side="right")) - 1
+        frames = self.cache.pop(chunk, None)
+        if frames is None:
+            frames = self._decode(chunk)
+        self.cache[chunk] = frames  # Most recently used last
+        if len(self.cache) > self.cached_chunks:
+            del self.cache[next(iter(self.cache))]
+        return frames[number - self.chunks[chunk][2]]
+
+    def _decode(self, chunk):
+        offset, length, _, n_frames = self.chunks[chunk]
+        self.file.seek(offset)
+        payload = zlib.decompress(self.file.read(length))
+
+        def take(dtype, count, width=1):
+            nonlocal payload
+            nbytes = count * width * np.dtype(dtype).itemsize
+            array = np.frombuffer(payload[:nbytes], dtype=dtype)
+            payload = payload[nbytes:]
+            return array.reshape(count, width) if width > 1 else array
+
+        table = take(np.int64, n_frames, 3)
+        total, total_new = int(table[:, 1].sum()), int(table[:, 2].sum())
+        ids, delta, energy = take(np.int32, total), take(np.int16, total, 2), take(np.uint16, total)
+        species, colors = take(np.uint8, total_new), take(np.uint8, total_new, 3)
+
+        frames = []
+        start = new_start = 0
+        previous = None
+        for tick, n, k in table.tolist():
+            frame_ids = ids[start:start + n]
+            q = delta[start:start + n].copy()
+            new = np.ones(n, dtype=bool)
+            frame_species = np.empty(n, dtype=np.uint8)
+            frame_colors = np.empty((n, 3), dtype=np.uint8)
+            if previous is not None:
+                rows, found = _match(frame_ids, previous[0])
+                q[found] += previous[1][rows[found]]
+                frame_species[found] = previous[2][rows[found]]
+                frame_colors[found] = previous[3][rows[found]]
+                new = ~found
+            frame_species[new] = species[new_start:new_start + k]
+            frame_colors[new] = colors[new_start:new_start + k]
+            previous = (frame_ids, q, frame_species, frame_colors)
+            frames.append(Frame(tick, frame_ids, frame_species, q / self.header["scale"], frame_colors,
+                                energy[start:start + n].astype(float)))
+            start += n
+            new_start += k
+        return frames
+
+
+# SECTION 4: VIEWER
+# -----------------
+# Playback speeds in recorded frames per displayed frame
+PLAYBACK_SPEEDS = (1, 2, 5, 10, 50)
+SCRUB_BAR_HEIGHT = 12
+
+
+def run_viewer(path, fps=60):
+    """
+    Play a replay in a window with the game's own drawing code; nothing gets simulated.
+    Space pauses, Left/Right step a frame (while paused), Up/Down change speed, Home/End
+    jump to the ends, and clicking or dragging the bar along the bottom scrubs.
+    fps=0 draws as fast as possible.
+    """
+    import pygame
+    from Fish import SCREEN_WIDTH, SCREEN_HEIGHT, GRID_COLS, GRID_ROWS
+    from camera import Camera
+    from gui import draw_agents
+    from renderer import Renderer
+
+    reader = ReplayReader(path)
+    if len(reader) == 0:
+        print(f"{path} has no frames")
+        return
+    pygame.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(f"Replay - {os.path.basename(path)}")
+    font = pygame.font.SysFont(None, 28)
+    # Recorded coordinates are world coordinates; show the recorded world, grid and all,
+    # fitted to the window (files from before the grid was recorded had the default one)
+    camera = Camera(SCREEN_WIDTH, SCREEN_HEIGHT, reader.width, reader.height)
+    camera.fit()
+    grid = reader.header.get("energy_cols", GRID_COLS), reader.header.get("energy_rows", GRID_ROWS)
+    renderer = Renderer(screen, *grid, camera=camera)
+    clock = pygame.time.Clock()
+    bar = pygame.Rect(0, SCREEN_HEIGHT - SCRUB_BAR_HEIGHT, SCREEN_WIDTH, SCRUB_BAR_HEIGHT)
+
+    current, playing, speed_index, scrubbing = 0, True, 0, False
+    running = True
+    while running:
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                running = False
+            elif event.type == pygame.KEYDOWN:
+                if event.key == pygame.K_SPACE:
+                    playing = not playing
+                elif event.key == pygame.K_RIGHT:
+                    current = min(current + 1, len(reader) - 1)
+                elif event.key == pygame.K_LEFT:
+                    current = max(current - 1, 0)
+                elif event.key == pygame.K_UP:
+                    speed_index = min(speed_index + 1, len(PLAYBACK_SPEEDS) - 1)
+                elif event.key == pygame.K_DOWN:
+                    speed_index = max(speed_index - 1, 0)
+                elif event.key == pygame.K_HOME:
+                    current = 0
+                elif event.key == pygame.K_END:
+                    current = len(reader) - 1
+            elif event.type == pygame.MOUSEBUTTONDOWN and bar.collidepoint(event.pos):
+                scrubbing = True
+            elif event.type == pygame.MOUSEBUTTONUP:
+                scrubbing = False
+            if scrubbing and event.type in (pygame.MOUSEBUTTONDOWN, pygame.MOUSEMOTION):
+                current = min(len(reader) - 1, max(0, int(event.pos[0] / bar.width * len(reader))))
+
+        frame = reader.frame(current)
+
+        renderer.begin_frame()
+        renderer.mark(draw_agents(screen, frame, camera))
+        renderer.text("tick", f"Tick: {frame.tick}", (10, 10), font)
+        renderer.text("prey", f"Prey: {frame.count_species(PREY)}", (10, 35), font)
+        renderer.text("predators", f"Predators: {frame.count_species(PREDATOR)}", (10, 60), font)
+        state = f"{PLAYBACK_SPEEDS[speed_index]}x" if playing else "Paused"
+        renderer.text("state", f"{state}  FPS: {int(clock.get_fps())}", (10, 85), font)
+        renderer.mark([screen.fill((200, 200, 200), bar),
+                       screen.fill((0, 128, 0), (0, bar.y, bar.width * (current + 1) // len(reader), bar.height))])
+        renderer.finish()
+
+        if playing and not scrubbing:
+            current = min(current + PLAYBACK_SPEEDS[speed_index], len(reader) - 1)
+        clock.tick(fps)
+
+    reader.close()
+    pygame.quit()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Play back a recorded run without simulating it")
+    parser.add_argument("path")
+    parser.add_argument("--fps", type=int, default=60, help="display frame cap, 0 for none")
+    parser.add_argument("--decode-benchmark", action="store_true",
+                        help="just decode every frame and report frames per second")
+    args = parser.parse_args(argv)
+
+    if args.decode_benchmark:
+        reader = ReplayReader(args.path)
+        start = time.perf_counter()
+        for number in range(len(reader)):
+            reader.frame(number)
+        elapsed = time.perf_counter() - start
+        print(f"{len(reader)} frames in {elapsed:.2f}s ({len(reader) / elapsed:.0f} frames/sec), "
+              f"{os.path.getsize(args.path) / max(1, len(reader)):.0f} bytes/frame")
+        return
+    run_viewer(args.path, args.fps)
+
+
+if __name__ == "__main__":
+    main()
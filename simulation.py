@@ -0,0 +1,196 @@
+import time
+
+import numpy as np
+
+from backends import NumpyBackend
+from Fish import GRID_COLS, GRID_ROWS, WORLD_WIDTH, WORLD_HEIGHT
+from energy_field import EnergyField
+from params import SimParams
+from profiler import TickProfiler
+from spatial import SpatialIndex
+from world import World, PREY, PREDATOR
+
+
+# SECTION 1: CONFIGURABLE PARAMETERS
+# -----------------------------------
+# Cell size for the agent spatial index. Defaults to one energy grid square, but the two
+# are independent
+INDEX_CELL_SIZE = WORLD_WIDTH / GRID_COLS
+
+START_PREY = 100
+START_PREDATORS = 5
+
+
+# SECTION 2: HEADLESS SIMULATION
+# ------------------------------
+class Simulation:
+    """
+    Everything needed to advance the ecosystem, with no pygame in sight: the World of
+    agents, its spatial index, the energy grid and the respawn rules. The GUI in
+    ecosystem.py drives one of these, and so does `python -m ecosystem --headless`.
+    """
+
+    def __init__(self, n_prey=START_PREY, n_predators=START_PREDATORS, width=WORLD_WIDTH,
+                 height=WORLD_HEIGHT, seed=None, cell_size=INDEX_CELL_SIZE,
+                 energy_cols=GRID_COLS, energy_rows=GRID_ROWS, params=None, profiler=None, backend=None):
+        self.n_prey = n_prey
+        self.n_predators = n_predators
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.cell_size = cell_size
+        self.energy_cols = energy_cols
+        self.energy_rows = energy_rows
+        self.params = params or SimParams()
+        # Off unless someone turns it on; the phase hooks cost next to nothing until then
+        self.profiler = profiler or TickProfiler()
+        # Who does the per-tick number crunching (see backends.py)
+        self.backend = backend or NumpyBackend()
+        # Called with no arguments after every tick (telemetry, auto-checkpoints, ...)
+        self.listeners = []
+        self.reset()
+
+    def reset(self):
+        # The world owns its generator, so a seeded run replays exactly no matter what else
+        # in the process draws random numbers (other Simulations included)
+        self.tick = 0
+        self.energy_grid = EnergyField(self.energy_cols, self.energy_rows, self.width, self.height,
+                                       self.params.grid_max_energy, self.params.grid_regen_rate)
+        self.world = World(self.width, self.height, params=self.params,
+                           rng=np.random.default_rng(self.seed), backend=self.backend)
+        self.index = SpatialIndex(self.width, self.height, self.cell_size)
+        self.index_tick = None  # The tick current_index() last caught the index up at
+        # All prey start with the default green color
+        self.world.spawn_prey(self.n_prey)
+        self.world.spawn_predators(self.n_predators)
+        self.world.commit()
+
+    def populations(self):
+        return self.world.count_species(PREY), self.world.count_species(PREDATOR)
+
+    def current_index(self):
+        """
+        The spatial index, caught up with the world as it is between ticks. step() updates
+        it before anyone moves and commit() renumbers rows after, so it's a tick behind;
+        this catches it up at most once per tick, however often it's asked (every frame,
+        say), and the next step() then finds nothing to do.
+        """
+        if self.index_tick != self.tick:
+            self.index.update(self.world.position[:self.world.count])
+            self.index_tick = self.tick
+        return self.index
+
+    def step(self):
+        # Same as World.step, a phase at a time so each can be profiled
+        world, phase = self.world, self.profiler.phase
+        with phase("index"):
+            # Only agents that changed cell since last tick get moved in the index, then
+            # every stage below shares one set of neighbour pairs
+            self.index.update(world.position[:world.count])
+            context = world.neighbours(self.index)
+        with phase("prey"):
+            world.update_prey(self.energy_grid, context)
+        with phase("predators"):
+            world.update_predators(context)
+        with phase("collisions"):
+            world.resolve_collisions(context)
+
+        with phase("regenerate"):
+            # Regenerate energy in each grid square
+            self.backend.regenerate(self.energy_grid)
+
+        with phase("commit"):
+            self.respawn()
+            # Births and deaths from this tick all land at once
+            world.commit()
+        self.tick += 1
+        self.notify()
+
+    def notify(self):
+        for listener in self.listeners:
+            listener()
+
+    def respawn(self):
+        # SPAWN FRESH MEAT
+        prey_count, predator_count = self.populations()
+        if prey_count >= 100 and predator_count == 0:
+            # Spawn 5 basic predators
+            self.world.spawn_predators(5)
+        elif predator_count == 3 and prey_count <= 10:
+            # Only spawn 100 basic prey if there are exactly 3 predators and 10 prey
+            self.world.spawn_prey(100)
+
+    def run(self, n_ticks, report_every=0, report=print):
+        """
+        Step n_ticks times as fast as the CPU allows and return the ticks per second.
+        If report_every is set, report(tick, prey, predators) is called that often.
+        """
+        start = time.perf_counter()
+        for _ in range(n_ticks):
+            self.step()
+            self.profiler.end_frame()
+            if report_every and self.tick % report_every == 0:
+                report(self.tick, *self.populations())
+        elapsed = time.perf_counter() - start
+        return n_ticks / elapsed if elapsed > 0 else float("inf")
+
+
+# SECTION 3: FIXED-TIMESTEP SCHEDULING
+# ------------------------------------
+TICK_RATE = 60  # Simulated ticks per real second at 1x
+FRAME_BUDGET = 1 / 40  # Seconds of simulation allowed per rendered frame
+MAX_BACKLOG = 5  # Ticks of debt kept when a frame can't catch up; the rest is dropped
+
+# Fast-forward settings the GUI cycles through; None means "as fast as the budget allows"
+SPEEDS = (1, 10, None)
+
+
+class FixedStepScheduler:
+    """
+    Decouples simulated time from the frame rate. Each call to advance() runs however
+    many fixed-size ticks the real time since the last call is worth at the current
+    speed, but never more than fit in frame_budget seconds, so the window stays
+    responsive and only the latest state gets drawn. clock is where the time comes from
+    (a stand-in makes it testable).
+    """
+
+    def __init__(self, sim, tick_rate=TICK_RATE, frame_budget=FRAME_BUDGET, clock=time.perf_counter):
+        self.sim = sim
+        self.tick_rate = tick_rate
+        self.frame_budget = frame_budget
+        self.clock = clock
+        self.speed = 1
+        self.backlog = 0.0
+        self.ticks_last_frame = 0
+        self.last_time = clock()
+
+    def set_speed(self, speed):
+        self.speed = speed
+        self.backlog = 0.0
+
+    def speed_label(self):
+        return "Max" if self.speed is None else f"{self.speed}x"
+
+    def advance(self):
+        """Run this frame's ticks and return how many ran."""
+        now = self.clock()
+        elapsed, self.last_time = now - self.last_time, now
+        deadline = now + self.frame_budget
+
+        ticks = 0
+        if self.speed is None:
+            # Flat out: fill the budget, but always make progress
+            while ticks == 0 or self.clock() < deadline:
+                self.sim.step()
+                ticks += 1
+        else:
+            self.backlog += elapsed * self.tick_rate * self.speed
+            while self.backlog >= 1 and self.clock() < deadline:
+                self.sim.step()
+                self.backlog -= 1
+                ticks += 1
+            # A slow frame shouldn't turn into a death spiral of catch-up ticks
+            self.backlog = min(self.backlog, MAX_BACKLOG)
+
+        self.ticks_last_frame = ticks
+        return ticks
@@ -0,0 +1,352 @@
+import math
+
+import numpy as np
+
+
+# SECTION 1: NEIGHBOURHOOD OFFSETS
+# --------------------------------
+def block_offsets(reach):
+    """(dx, dy) for every cell within `reach` cells (Chebyshev) of the centre, the centre included."""
+    span = range(-reach, reach + 1)
+    return np.array([(dx, dy) for dx in span for dy in span])
+
+
+# The 3x3 block of cells around (and including) a cell, worked out once
+NEIGHBOUR_OFFSETS = block_offsets(1)
+
+
+def ring_offsets(radius):
+    """(dx, dy) for every cell exactly `radius` cells away (Chebyshev) from the centre."""
+    if radius == 0:
+        return np.zeros((1, 2), dtype=np.int64)
+    span = np.arange(-radius, radius + 1)
+    edge = np.full(len(span), radius)
+    inner = span[1:-1]
+    return np.concatenate((np.column_stack((span, -edge)), np.column_stack((span, edge)),
+                           np.column_stack((-edge[1:-1], inner)), np.column_stack((edge[1:-1], inner))))
+
+
+# Above this fraction of agents changing cell, a full re-sort beats patching
+REBUILD_FRACTION = 0.25
+
+
+def expand_ranges(starts, counts):
+    """Concatenate arange(s, s + n) for every (s, n), without a Python loop."""
+    total = int(counts.sum())
+    if total == 0:
+        return np.zeros(0, dtype=np.int64)
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets
+
+
+def nearest_per_query(query, candidate, distance, n_queries):
+    """
+    Reduce (query, candidate, distance) pairs to the closest candidate per query, the
+    lowest candidate winning ties (so the answer doesn't depend on pair order).
+    Returns (nearest, best) arrays of length n_queries, with -1 / inf where a query had no pairs.
+    """
+    nearest = np.full(n_queries, -1)
+    best = np.full(n_queries, np.inf)
+    if len(query) == 0:
+        return nearest, best
+    np.minimum.at(best, query, distance)
+    winner = distance == best[query]
+    lowest = np.full(n_queries, np.iinfo(np.int64).max)
+    np.minimum.at(lowest, query[winner], candidate[winner])
+    found = lowest < np.iinfo(np.int64).max
+    nearest[found] = lowest[found]
+    return nearest, best
+
+
+# SECTION 1.1: FIELD OF VIEW
+# A few float roundings' worth of slack (relative to the squared distance) in the
+# squared comparisons, so a point exactly on the edge of the cone or of the reach is
+# in view, as the atan2 and hypot comparisons say, even when cos(half-angle) or
+# fov_distance ** 2 comes out a hair off (cos(pi / 2) isn't quite 0)
+FOV_SLACK = 1e-15
+
+
+def half_angle_cosines(fov_angle):
+    """
+    cos(fov_angle / 2) per observer, fov_angle in degrees, ready for in_fov(). A negative
+    angle sees nothing (inf) and anything from 360 degrees up sees all the way round (-1),
+    the same as comparing the bearing difference against the half-angle would.
+    """
+    half = np.radians(np.asarray(fov_angle, dtype=float)) / 2
+    return np.where(half < 0, np.inf, np.cos(np.minimum(half, math.pi)))
+
+
+def in_fov(delta, heading, cos_half, fov_distance):
+    """
+    Which (observer, candidate) pairs fall inside the observer's view cone, all at once.
+
+    delta is each candidate's offset from its observer, heading the observer's unit
+    heading vector (cos, sin), cos_half from half_angle_cosines() and fov_distance the
+    reach, all one row per pair. Compares dot(delta, heading) >= |delta| * cos_half and
+    |delta| <= fov_distance as signed squares, so there's no trig and no square root per
+    pair. A candidate sitting exactly on its observer counts as due east of it (+x), since
+    that's where atan2(0, 0) = 0 put it for the bearing comparison.
+    """
+    dist_sq = delta[:, 0] ** 2 + delta[:, 1] ** 2
+    dot = delta[:, 0] * heading[:, 0] + delta[:, 1] * heading[:, 1]
+    in_reach = dist_sq * (1 - FOV_SLACK) <= fov_distance * np.abs(fov_distance)
+    on_top = dist_sq == 0
+    dot = np.where(on_top, heading[:, 0], dot)
+    cone_sq = np.where(on_top, 1.0, dist_sq)
+    in_cone = dot * np.abs(dot) >= cone_sq * (cos_half * np.abs(cos_half) - FOV_SLACK)
+    return in_reach & in_cone
+
+
+# SECTION 2: SPATIAL INDEX
+# ------------------------
+class SpatialIndex:
+    """
+    A persistent uniform-grid index over agent rows, stored CSR-style: the rows in cell c
+    are order[cell_start[c]:cell_start[c + 1]].
+
+    update() only relocates rows whose cell changed since the last call, so a mostly
+    static population costs a comparison per agent rather than a full rebuild. The cell
+    size is independent of the energy grid's.
+    """
+
+    def __init__(self, width, height, cell_size):
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.cols = max(1, math.ceil(width / cell_size))
+        self.rows = max(1, math.ceil(height / cell_size))
+        self.n_cells = self.cols * self.rows
+
+        # neighbours[c] lists the (up to) 9 cells around c, -1 where that falls off the grid
+        col = np.arange(self.n_cells) % self.cols
+        row = np.arange(self.n_cells) // self.cols
+        ncol = col[:, None] + NEIGHBOUR_OFFSETS[None, :, 0]
+        nrow = row[:, None] + NEIGHBOUR_OFFSETS[None, :, 1]
+        inside = (ncol >= 0) & (ncol < self.cols) & (nrow >= 0) & (nrow < self.rows)
+        self.neighbours = np.where(inside, nrow * self.cols + ncol, -1)
+
+        # Whatever positions array the index was last built from (often a live view)
+        self.positions = np.zeros((0, 2))
+        self.cell_of = np.zeros(0, dtype=np.int64)
+        self.order = np.zeros(0, dtype=np.int64)
+        self.cell_start = np.zeros(self.n_cells + 1, dtype=np.int64)
+
+    def __len__(self):
+        return len(self.cell_of)
+
+    def cells_for(self, positions):
+        col = np.clip((positions[:, 0] / self.cell_size).astype(np.int64), 0, self.cols - 1)
+        row = np.clip((positions[:, 1] / self.cell_size).astype(np.int64), 0, self.rows - 1)
+        return row * self.cols + col
+
+    def rebuild(self, positions):
+        self.positions = positions
+        self.cell_of = self.cells_for(positions)
+        self.order = np.argsort(self.cell_of, kind="stable")
+        self._recount()
+
+    def _recount(self):
+        counts = np.bincount(self.cell_of, minlength=self.n_cells)
+        self.cell_start[0] = 0
+        np.cumsum(counts, out=self.cell_start[1:])
+
+    def update(self, positions):
+        """Bring the index up to date with positions[row] for rows 0..len(positions)-1."""
+        n = len(positions)
+        self.positions = positions
+        new_cells = self.cells_for(positions)
+        common = min(n, len(self.cell_of))
+
+        changed = np.ones(n, dtype=bool)
+        changed[:common] = new_cells[:common] != self.cell_of[:common]
+        moved = np.flatnonzero(changed)
+        if len(moved) == 0 and n == len(self.cell_of):
+            return
+        if len(moved) > REBUILD_FRACTION * n:
+            self.rebuild(positions)
+            return
+
+        # Pull out rows that moved (or no longer exist), then drop them back in at their new cells
+        still_here = self.order < n
+        still_here[still_here] = ~changed[self.order[still_here]]
+        kept = self.order[still_here]
+        moved = moved[np.argsort(new_cells[moved], kind="stable")]
+        slots = np.searchsorted(new_cells[kept], new_cells[moved], side="right")
+        self.order = np.insert(kept, slots, moved)
+        self.cell_of = new_cells
+        self._recount()
+
+    def rows_in(self, cell):
+        return self.order[self.cell_start[cell]:self.cell_start[cell + 1]]
+
+    def rows_in_rect(self, x0, y0, x1, y1):
+        """
+        Indexed rows in every cell the rectangle (x0, y0)-(x1, y1) touches, in no
+        particular order. Rows near the edges may lie just outside it; filter on
+        positions if that matters.
+        """
+        col0, col1 = (min(max(int(x / self.cell_size), 0), self.cols - 1) for x in (x0, x1))
+        row0, row1 = (min(max(int(y / self.cell_size), 0), self.rows - 1) for y in (y0, y1))
+        # A row of the grid is one contiguous run of cells, so each rectangle row is one range
+        first = np.arange(row0, row1 + 1) * self.cols + col0
+        starts = self.cell_start[first]
+        counts = self.cell_start[first + (col1 - col0) + 1] - starts
+        return self.order[expand_ranges(starts, counts)]
+
+    def block_cells(self, cells, reach=1):
+        """The cells within `reach` cells of each of cells, one row each, -1 where that falls off the grid."""
+        if reach == 1:
+            return self.neighbours[cells]
+        offsets = block_offsets(reach)
+        ncol = (cells % self.cols)[:, None] + offsets[None, :, 0]
+        nrow = (cells // self.cols)[:, None] + offsets[None, :, 1]
+        inside = (ncol >= 0) & (ncol < self.cols) & (nrow >= 0) & (nrow < self.rows)
+        return np.where(inside, nrow * self.cols + ncol, -1)
+
+    def reach_for(self, radius):
+        # Cells either side that cover everything within radius, whatever the cell size
+        return max(1, math.ceil(radius / self.cell_size))
+
+    def candidate_pairs(self, positions, reach=1):
+        """
+        Every (query, row) pair where row sits in the cells within `reach` cells of
+        positions[query] (the 3x3 block by default). Returns two flat arrays; query
+        indexes into positions, row is an indexed agent row.
+        """
+        neighbours = self.block_cells(self.cells_for(positions), reach)
+        valid = neighbours >= 0
+        query = np.broadcast_to(np.arange(len(positions))[:, None], neighbours.shape)[valid]
+        cells = neighbours[valid]
+        starts = self.cell_start[cells]
+        counts = self.cell_start[cells + 1] - starts
+        rows = self.order[expand_ranges(starts, counts)]
+        return np.repeat(query, counts), rows
+
+    def pairs_within(self, positions, radius):
+        """
+        (query, row, distance) for every indexed row closer than radius to
+        positions[query]. Searches as many cells out as radius needs, so the answer is
+        the same for any cell size.
+        """
+        query, rows = self.candidate_pairs(positions, self.reach_for(radius))
+        delta = self.positions[rows] - positions[query]
+        distance = np.hypot(delta[:, 0], delta[:, 1])
+        close = distance < radius
+        return query[close], rows[close], distance[close]
+
+    def nearest(self, positions, max_distance):
+        """
+        Nearest indexed row to each of positions, no further than max_distance (a scalar or
+        one value per position). Returns (nearest, distance), with -1 / inf where nothing
+        is in range; on ties the lowest row wins, as in nearest_per_query.
+
+        Searches outward one ring of cells at a time and drops a query as soon as nothing
+        in an unsearched ring could beat what it already has, or could be in range.
+        """
+        n = len(positions)
+        nearest = np.full(n, -1)
+        best = np.full(n, np.inf)
+        max_distance = np.broadcast_to(np.asarray(max_distance, dtype=float), (n,))
+        if n == 0 or len(self.cell_of) == 0:
+            return nearest, best
+
+        cells = self.cells_for(positions)
+        col, row = cells % self.cols, cells // self.cols
+        active = np.arange(n)
+        for radius in range(max(self.cols, self.rows)):
+            offsets = ring_offsets(radius)
+            ncol = col[active][:, None] + offsets[None, :, 0]
+            nrow = row[active][:, None] + offsets[None, :, 1]
+            inside = (ncol >= 0) & (ncol < self.cols) & (nrow >= 0) & (nrow < self.rows)
+            query = np.broadcast_to(np.arange(len(active))[:, None], inside.shape)[inside]
+            ring_cells = (nrow * self.cols + ncol)[inside]
+            starts = self.cell_start[ring_cells]
+            counts = self.cell_start[ring_cells + 1] - starts
+            candidate = self.order[expand_ranges(starts, counts)]
+            query = active[np.repeat(query, counts)]
+
+            delta = self.positions[candidate] - positions[query]
+            found, dist = nearest_per_query(query, candidate, np.hypot(delta[:, 0], delta[:, 1]), n)
+            better = (dist < best) | ((dist == best) & (found >= 0) & (found < nearest))
+            nearest[better] = found[better]
+            best[better] = dist[better]
+
+            # Everything past this ring is at least radius * cell_size away, so only a tie
+            # or better could still turn up
+            reach = radius * self.cell_size
+            active = active[(best[active] >= reach) & (max_distance[active] >= reach)]
+            if len(active) == 0:
+                break
+
+        out_of_range = best > max_distance
+        nearest[out_of_range] = -1
+        best[out_of_range] = np.inf
+        return nearest, best
+
+
+# SECTION 3: PER-TICK NEIGHBOUR CONTEXT
+# -------------------------------------
+class NeighbourContext:
+    """
+    Everything one tick needs to know about who is near a set of query rows (the
+    predators, in World), worked out once and handed to every stage that asks:
+
+    - pairs: every (query, other) pair closer than radius + margin when the context is
+      built, as flat arrays. query indexes into rows; other is an indexed agent row.
+      Stages that run after agents have moved call measure() to refresh the pairs'
+      offsets and distances instead of searching the grid again, then keep the pairs
+      inside their own radius (at most `radius`). That's exact for any cell size as long
+      as no pair has closed in by more than margin since the build, so margin has to
+      cover the most both agents of a pair can travel in between.
+    - nearest(): the nearest query row to arbitrary points, for long-range lookups in the
+      other direction (prey looking for predators), through an index over the query rows
+      built on first use.
+
+    Build it after the index is up to date for the tick. Positions are always passed in,
+    because a World's columns are reallocated when births make it grow.
+    """
+
+    def __init__(self, index, positions, rows, radius, margin, lookup_cell_size):
+        self.index = index
+        self.rows = rows
+        self.radius = radius
+        self.margin = margin
+        self.query, self.other, _ = index.pairs_within(positions[rows], radius + margin)
+        self.lookup_cell_size = lookup_cell_size
+        self._lookup = None
+        self.delta = self.distance = None
+
+    def measure(self, positions):
+        """Offsets (other minus query) and distances for every pair, from positions as they are now."""
+        self.delta = positions[self.other] - positions[self.rows[self.query]]
+        self.distance = np.hypot(self.delta[:, 0], self.delta[:, 1])
+        return self.delta, self.distance
+
+    def pairs(self, keep=None):
+        """(query, other, delta, distance) for the pairs where keep is True (all of them by default)."""
+        if keep is None:
+            return self.query, self.other, self.delta, self.distance
+        return self.query[keep], self.other[keep], self.delta[keep], self.distance[keep]
+
+    def within(self, radius):
+        """(query, other) pairs closer than radius, leaving out each row paired with itself."""
+        if radius > self.radius:
+            # Pairs further apart than this weren't collected when the context was built
+            raise ValueError(f"radius {radius} is past the context's radius {self.radius}")
+        close = (self.distance < radius) & (self.other != self.rows[self.query])
+        return self.query[close], self.other[close]
+
+    def nearest(self, positions, points, max_distance):
+        """
+        Nearest query row to each point, no further than max_distance, as (row or -1,
+        distance). The index over the query rows is built from positions on the first
+        call and reused for the rest of the tick.
+        """
+        if len(self.rows) == 0:
+            # Nothing to find (e.g. the predators have died out)
+            return np.full(len(points), -1), np.full(len(points), np.inf)
+        if self._lookup is None:
+            self._lookup = SpatialIndex(self.index.width, self.index.height, self.lookup_cell_size)
+            self._lookup.rebuild(positions[self.rows])
+        found, dist = self._lookup.nearest(points, max_distance)
+        return np.where(found >= 0, self.rows[found], -1), dist
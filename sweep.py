@@ -0,0 +1,133 @@
+import argparse
+import csv
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from params import SimParams
+from simulation import Simulation
+
+
+# SECTION 1: BUILDING THE RUN LIST
+# --------------------------------
+def expand_grid(grid):
+    """
+    Turn {"name": [values, ...], ...} into one dict per combination.
+    An empty grid gives a single run with the defaults.
+    """
+    names = sorted(grid)
+    return [dict(zip(names, values)) for values in itertools.product(*(grid[name] for name in names))]
+
+
+def parse_value(text):
+    try:
+        return int(text)
+    except ValueError:
+        return float(text)
+
+
+def parse_param(text):
+    # "grid_regen_rate=1,2,4" -> ("grid_regen_rate", [1, 2, 4])
+    name, _, values = text.partition("=")
+    if not values:
+        raise argparse.ArgumentTypeError(f"expected NAME=v1,v2,... but got {text!r}")
+    if name not in SimParams.names():
+        raise argparse.ArgumentTypeError(f"unknown parameter {name!r}; choose from {', '.join(SimParams.names())}")
+    return name, [parse_value(v) for v in values.split(",")]
+
+
+# SECTION 2: RUNNING
+# ------------------
+def run_one(run_id, overrides, seed, ticks, sample_every, n_prey, n_predators):
+    """
+    One headless run in a worker process. Returns its population time series as a list
+    of rows, sampled every sample_every ticks (and at tick 0).
+    """
+    params = SimParams().with_overrides(**overrides)
+    sim = Simulation(n_prey=n_prey, n_predators=n_predators, seed=seed, params=params)
+
+    def row():
+        prey_count, predator_count = sim.populations()
+        return dict(run=run_id, seed=seed, **overrides, tick=sim.tick, prey=prey_count, predators=predator_count)
+
+    rows = [row()]
+    start = time.perf_counter()
+    for _ in range(ticks):
+        sim.step()
+        if sim.tick % sample_every == 0:
+            rows.append(row())
+    elapsed = time.perf_counter() - start
+    for r in rows:
+        r["ticks_per_sec"] = round(ticks / elapsed, 1) if elapsed > 0 else ""
+    return rows
+
+
+def sweep(grid, seeds, ticks, sample_every=100, workers=None, n_prey=100, n_predators=5, progress=None):
+    """
+    Run every combination in grid once per seed across a process pool and return all
+    the time series as one table (a list of row dicts), ordered by run then tick.
+
+    A run that raises doesn't take the others down with it: it gets a single row with
+    its seed, overrides and the error, and the rest of the sweep carries on.
+    """
+    jobs = [(overrides, seed) for overrides in expand_grid(grid) for seed in seeds]
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {pool.submit(run_one, run_id, overrides, seed, ticks, sample_every, n_prey, n_predators): run_id
+                   for run_id, (overrides, seed) in enumerate(jobs)}
+        for done, future in enumerate(as_completed(futures), 1):
+            run_id = futures[future]
+            try:
+                results[run_id] = future.result()
+            except Exception as error:
+                overrides, seed = jobs[run_id]
+                results[run_id] = [dict(run=run_id, seed=seed, **overrides, error=f"{type(error).__name__}: {error}")]
+            if progress:
+                progress(done, len(jobs))
+    return [row for run_id in sorted(results) for row in results[run_id]]
+
+
+def write_csv(rows, path):
+    fieldnames = []
+    for row in rows:
+        fieldnames.extend(k for k in row if k not in fieldnames)
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fieldnames)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+# SECTION 3: COMMAND LINE
+# -----------------------
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run a grid of headless simulations across CPU cores")
+    parser.add_argument("--param", type=parse_param, action="append", default=[], metavar="NAME=v1,v2,...",
+                        help="parameter values to sweep; repeat for more parameters")
+    parser.add_argument("--seeds", default="1", help="comma-separated seeds, each config runs once per seed")
+    parser.add_argument("--ticks", type=int, default=10000)
+    parser.add_argument("--sample-every", type=int, default=100, help="record populations every N ticks")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--prey", type=int, default=100)
+    parser.add_argument("--predators", type=int, default=5)
+    parser.add_argument("--out", default="sweep_results.csv")
+    args = parser.parse_args(argv)
+
+    grid = dict(args.param)
+    seeds = [int(s) for s in args.seeds.split(",")]
+    n_runs = len(expand_grid(grid)) * len(seeds)
+    print(f"{n_runs} runs on {args.workers or os.cpu_count()} workers")
+
+    def progress(done, total):
+        print(f"  {done}/{total} runs finished")
+
+    rows = sweep(grid, seeds, args.ticks, args.sample_every, args.workers, args.prey, args.predators, progress)
+    write_csv(rows, args.out)
+    print(f"Wrote {len(rows)} rows to {args.out}")
+    for row in rows:
+        if row.get("error"):
+            print(f"  run {row['run']} (seed {row['seed']}) failed: {row['error']}")
+
+
+if __name__ == "__main__":
+    main()
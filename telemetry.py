@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import queue
+import struct
+import threading
+import warnings
+
+import numpy as np
+
+from world import PREY, PREDATOR
+
+
+# SECTION 1: RECORD LAYOUT
+# ------------------------
+# One record per tick. Counts of births/deaths/kills are for that tick alone; means
+# are over the living agents of a species (NaN when there are none)
+FIELDS = (
+    ("tick", "<i8"),
+    ("prey", "<i8"),
+    ("predators", "<i8"),
+    ("births", "<i8"),
+    ("deaths", "<i8"),
+    ("kills", "<i8"),
+    ("prey_energy", "<f8"),
+    ("predator_energy", "<f8"),
+    ("prey_fov_angle", "<f8"),
+    ("predator_fov_angle", "<f8"),
+    ("prey_fov_distance", "<f8"),
+    ("predator_fov_distance", "<f8"),
+    ("grid_energy", "<f8"),
+)
+RECORD = np.dtype(list(FIELDS))
+
+# File layout: MAGIC, a uint32 length and a JSON header naming the fields, then any
+# number of chunks, each a uint32 byte count followed by that many bytes of records.
+# Files are only ever appended to, so a crash can at worst cut off the last chunk.
+MAGIC = b"FISHTLM1"
+CHUNK_HEADER = struct.Struct("<I")
+
+CHUNK_SIZE = 1024  # Records per chunk
+MAX_QUEUED_CHUNKS = 64  # Chunks waiting for the disk before new ones get dropped
+
+
+def species_means(species, values, counts):
+    # Mean of values per species (PREY, PREDATOR), NaN for an empty species
+    sums = np.bincount(species, weights=values, minlength=2)[:2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return sums / counts
+
+
+# SECTION 2: WRITER
+# -----------------
+class TelemetryWriter:
+    """
+    Streams one RECORD per tick of sim to an append-only file at path.
+
+    Records are computed with a few vectorized passes on the sim thread and collected
+    into fixed-size chunks. Full chunks go through a bounded queue to a background
+    thread that does all the disk I/O. A tick never waits on the disk: if the queue is
+    full, the chunk is dropped and counted in `dropped`. Memory use stays fixed however
+    long the run.
+
+    It registers itself as one of sim's listeners; call close() at the end to flush
+    what's left (it warns if anything was dropped). An existing file with the same fields is appended to, so a resumed run
+    carries on in the same file.
+    """
+
+    def __init__(self, sim, path, chunk_size=CHUNK_SIZE, max_queued=MAX_QUEUED_CHUNKS):
+        self.sim = sim
+        self.path = path
+        self.chunk = np.zeros(chunk_size, dtype=RECORD)
+        self.filled = 0
+        self.written = 0
+        self.dropped = 0
+        self.queue = queue.Queue(maxsize=max_queued)
+        self._world = sim.world
+        self._totals = self._current_totals()
+
+        self.file = open_for_append(path)
+        self.thread = threading.Thread(target=self._write_chunks, daemon=True)
+        self.thread.start()
+        sim.listeners.append(self.record)
+
+    def _current_totals(self):
+        world = self.sim.world
+        return world.total_births, world.total_deaths, world.total_kills
+
+    def record(self):
+        sim, world = self.sim, self.sim.world
+        n = world.count
+        species = world.species[:n]
+        counts = np.bincount(species, minlength=2)[:2]
+
+        # Resetting the sim replaces the world, whose totals start again from zero
+        if world is not self._world:
+            self._world, self._totals = world, (0, 0, 0)
+        totals = self._current_totals()
+        births, deaths, kills = (now - before for now, before in zip(totals, self._totals))
+        self._totals = totals
+
+        row = self.chunk[self.filled]
+        row["tick"] = sim.tick
+        row["prey"], row["predators"] = counts[PREY], counts[PREDATOR]
+        row["births"], row["deaths"], row["kills"] = births, deaths, kills
+        row["prey_energy"], row["predator_energy"] = species_means(species, world.energy[:n], counts)
+        row["prey_fov_angle"], row["predator_fov_angle"] = species_means(species, world.fov_angle[:n], counts)
+        row["prey_fov_distance"], row["predator_fov_distance"] = species_means(
+            species, world.fov_distance[:n], counts)
+        row["grid_energy"] = sim.energy_grid.total
+
+        self.filled += 1
+        if self.filled == len(self.chunk):
+            self.flush()
+
+    def flush(self):
+        """Hand the records collected so far to the writer thread."""
+        if self.filled == 0:
+            return
+        try:
+            self.queue.put_nowait(self.chunk[:self.filled].copy())
+        except queue.Full:
+            self.dropped += self.filled
+        self.filled = 0
+
+    def _write_chunks(self):
+        while True:
+            chunk = self.queue.get()
+            if chunk is None:
+                break
+            data = chunk.tobytes()
+            self.file.write(CHUNK_HEADER.pack(len(data)))
+            self.file.write(data)
+            self.file.flush()
+            self.written += len(chunk)
+
+    def close(self):
+        if self.record in self.sim.listeners:
+            self.sim.listeners.remove(self.record)
+        self.flush()
+        self.queue.put(None)  # The one put that waits: let the writer drain before closing
+        self.thread.join()
+        self.file.close()
+        if self.dropped:
+            warnings.warn(f"{self.path}: {self.dropped} telemetry records dropped because the disk couldn't keep up",
+                          RuntimeWarning, stacklevel=2)
+
+
+def open_for_append(path):
+    header = json.dumps({"fields": FIELDS}).encode()
+    if os.path.exists(path) and os.path.getsize(path) > 0:
+        existing = read_header(path)[0]
+        if existing != RECORD:
+            raise ValueError(f"{path} holds different telemetry fields; write to a new file")
+        # Drop a chunk cut off by a crash, so new chunks line up
+        f = open(path, "r+b")
+        f.truncate(complete_length(path))
+        f.seek(0, os.SEEK_END)
+        return f
+    f = open(path, "wb")
+    f.write(MAGIC + CHUNK_HEADER.pack(len(header)) + header)
+    f.flush()
+    return f
+
+
+# SECTION 3: READING
+# ------------------
+def read_header(path):
+    """(record dtype, offset of the first chunk)."""
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a telemetry file")
+        (length,) = CHUNK_HEADER.unpack(f.read(CHUNK_HEADER.size))
+        fields = json.loads(f.read(length))["fields"]
+        return np.dtype([tuple(field) for field in fields]), f.tell()
+
+
+def iter_chunks(path):
+    """Yield the file's records a chunk at a time, so huge runs never have to fit in memory."""
+    dtype, offset = read_header(path)
+    with open(path, "rb") as f:
+        f.seek(offset)
+        while True:
+            size = f.read(CHUNK_HEADER.size)
+            if len(size) < CHUNK_HEADER.size:
+                return
+            (length,) = CHUNK_HEADER.unpack(size)
+            data = f.read(length)
+            if len(data) < length:  # Cut off mid-write
+                return
+            yield np.frombuffer(data, dtype=dtype)
+
+
+def complete_length(path):
+    """Bytes of the file up to the end of its last complete chunk."""
+    _, end = read_header(path)
+    total = os.path.getsize(path)
+    with open(path, "rb") as f:
+        f.seek(end)
+        while True:
+            size = f.read(CHUNK_HEADER.size)
+            if len(size) < CHUNK_HEADER.size:
+                return end
+            (length,) = CHUNK_HEADER.unpack(size)
+            if end + CHUNK_HEADER.size + length > total:
+                return end
+            end += CHUNK_HEADER.size + length
+            f.seek(end)
+
+
+def read(path):
+    """Every record in the file as one structured array."""
+    dtype, _ = read_header(path)
+    chunks = list(iter_chunks(path))
+    return np.concatenate(chunks) if chunks else np.zeros(0, dtype=dtype)
+
+
+def to_csv(path, out):
+    dtype, _ = read_header(path)
+    with open(out, "w") as f:
+        f.write(",".join(dtype.names) + "\n")
+        for chunk in iter_chunks(path):
+            for row in chunk.tolist():
+                f.write(",".join(str(value) for value in row) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise or convert a telemetry file")
+    parser.add_argument("path")
+    parser.add_argument("--csv", default=None, help="write every record to this CSV file")
+    args = parser.parse_args(argv)
+
+    if args.csv:
+        to_csv(args.path, args.csv)
+        print(f"Wrote {args.csv}")
+        return
+    records = 0
+    last = None
+    for chunk in iter_chunks(args.path):
+        records += len(chunk)
+        last = chunk[-1]
+    print(f"{records} records")
+    if last is not None:
+        print(", ".join(f"{name}={last[name]}" for name in last.dtype.names))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+import numpy as np
+
+import checkpoint
+import telemetry
+from simulation import Simulation
+
+
+def run(sim, ticks):
+    for _ in range(ticks):
+        sim.step()
+    return sim
+
+
+def assert_same_run(a, b):
+    world_a, world_b = a.world, b.world
+    assert a.tick == b.tick
+    assert np.array_equal(world_a.ids, world_b.ids)
+    columns_a = world_a.columns(np.arange(world_a.count))
+    columns_b = world_b.columns(np.arange(world_b.count))
+    assert columns_a.keys() == columns_b.keys()
+    for name in columns_a:
+        assert np.array_equal(columns_a[name], columns_b[name]), name
+    assert world_a.rng.bit_generator.state == world_b.rng.bit_generator.state
+    assert (world_a.total_births, world_a.total_deaths, world_a.total_kills) == \
+        (world_b.total_births, world_b.total_deaths, world_b.total_kills)
+    assert np.array_equal(a.energy_grid.energy, b.energy_grid.energy)
+
+
+def test_resumed_run_matches_an_uninterrupted_one(tmp_path):
+    path = tmp_path / "run.npz"
+    sim = run(Simulation(n_prey=200, n_predators=20, seed=7), 40)
+    checkpoint.save(sim, path)
+    resumed = checkpoint.load(path)
+    assert_same_run(sim, resumed)
+
+    # Same state isn't enough: it has to carry on the same way too
+    assert_same_run(run(sim, 60), run(resumed, 60))
+
+
+def test_resumed_telemetry_appends_to_the_same_file(tmp_path):
+    whole, split = tmp_path / "whole.tlm", tmp_path / "split.tlm"
+    sim = Simulation(n_prey=200, n_predators=20, seed=3)
+    writer = telemetry.TelemetryWriter(sim, whole, chunk_size=16)
+    run(sim, 50)
+    writer.close()
+
+    sim = Simulation(n_prey=200, n_predators=20, seed=3)
+    writer = telemetry.TelemetryWriter(sim, split, chunk_size=16)
+    run(sim, 20)
+    checkpoint.save(sim, tmp_path / "run.npz")
+    writer.close()
+    sim = checkpoint.load(tmp_path / "run.npz")
+    writer = telemetry.TelemetryWriter(sim, split, chunk_size=16)
+    run(sim, 30)
+    writer.close()
+
+    expected, got = telemetry.read(whole), telemetry.read(split)
+    assert got["tick"].tolist() == list(range(1, 51))
+    for name in expected.dtype.names:
+        assert np.array_equal(got[name], expected[name], equal_nan=True), name
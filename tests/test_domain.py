@@ -0,0 +1,41 @@
+from domain import TiledSimulation
+from simulation import Simulation
+from world import PREY, PREDATOR
+
+
+def test_prey_eaten_from_two_tiles_is_one_kill():
+    # Tiles split at x = 400; the prey sits on the edge with a predator on either side,
+    # so both tiles (one through its halo) see it eaten
+    with TiledSimulation(n_prey=0, n_predators=0, tiles=(2, 1), seed=1) as sim:
+        world = sim.world
+        world.spawn(PREY, 1, positions=[(400, 300)])
+        world.spawn(PREDATOR, 2, positions=[(392, 300), (408, 300)])
+        world.commit()
+        sim.step()
+        assert world.total_kills == 1
+        assert world.count_species(PREY) == 0
+
+
+def graze_contested_cell(sim):
+    # Two prey either side of the tile edge at x = 400, both heading into energy cell
+    # (10, 7), the only food left on the grid. Returns (energy taken from the grid, energy the prey gained)
+    world = sim.world
+    world.spawn(PREY, 2, positions=[(399.5, 300), (405, 300)])
+    world.commit()
+    world.direction[:2] = 0
+    world.velocity[:2] = 1
+    sim.energy_grid.energy[:] = 0
+    sim.energy_grid.energy[10, 7] = 10
+    before = world.energy[:2].sum()
+    sim.step()
+    # Every cell regrows the same afterwards, whichever way it was stepped
+    taken = 10 + sim.params.grid_regen_rate * sim.energy_grid.energy.size - sim.energy_grid.total
+    return taken, world.energy[:2].sum() - before
+
+
+def test_tiles_graze_a_border_cell_like_one_world():
+    with TiledSimulation(n_prey=0, n_predators=0, tiles=(2, 1), seed=1) as tiled:
+        tiled_taken, tiled_gained = graze_contested_cell(tiled)
+    taken, gained = graze_contested_cell(Simulation(n_prey=0, n_predators=0, seed=1))
+    assert taken == tiled_taken == 10
+    assert gained == tiled_gained == 10
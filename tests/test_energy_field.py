@@ -0,0 +1,31 @@
+import numpy as np
+
+from energy_field import EnergyField
+
+
+def test_consume_splits_a_short_cell_in_proportion():
+    field = EnergyField(4, 3, 400, 300, max_energy=10, regen_rate=1)
+    field.energy[0, 0] = 6
+    # Three grazers in cell (0, 0) asking for 2, 4 and 6; one alone in cell (3, 2) with plenty
+    positions = np.array([(10, 10), (50, 60), (99, 99), (350, 250)], dtype=float)
+    eaten = field.consume(positions, np.array([2, 4, 6, 3], dtype=float))
+
+    assert np.allclose(eaten, [1, 2, 3, 3])
+    assert field.energy[0, 0] == 0
+    assert field.energy[3, 2] == 7
+    assert field.total == 10 * 10 + 7  # The other ten cells are untouched
+
+
+def test_consume_never_creates_or_loses_energy():
+    rng = np.random.default_rng(0)
+    field = EnergyField(20, 15, 800, 600, max_energy=5, regen_rate=0.5)
+    field.energy[:] = rng.uniform(0, 5, field.energy.shape)
+    for _ in range(10):
+        before = field.total
+        positions = rng.uniform(0, (800, 600), (300, 2))
+        eaten = field.consume(positions, rng.uniform(0, 3, 300))
+        assert (eaten >= 0).all()
+        assert (field.energy >= 0).all()
+        assert np.isclose(before - field.total, eaten.sum())
+        field.regenerate()
+        assert (field.energy <= 5).all()
@@ -0,0 +1,47 @@
+import numpy as np
+
+from genome import GENOME_SIZE, GenomeArena, join, split
+from simulation import Simulation
+
+
+def test_allocate_and_release_recycle_slots():
+    rng = np.random.default_rng(0)
+    arena = GenomeArena(capacity=4)
+    held = set()
+    peak = 0
+    for _ in range(200):
+        slots = arena.allocate(int(rng.integers(0, 6)))
+        assert not held & set(slots.tolist())  # Never hands out a slot that's in use
+        held.update(slots.tolist())
+        peak = max(peak, len(held))
+        freed = rng.permutation(sorted(held))[:int(rng.integers(0, len(held) + 1))]
+        arena.release(freed)
+        held.difference_update(freed.tolist())
+        assert arena.live == len(held)
+    # Freed slots are always used up first, so nothing leaks past the peak population
+    assert arena.used == peak
+    assert arena.used <= arena.capacity
+
+
+def test_world_releases_slots_of_the_dead():
+    sim = Simulation(n_prey=100, n_predators=5, seed=1)
+    for _ in range(500):
+        sim.step()
+        world = sim.world
+        slots = world.genome_slot[:world.count]
+        assert world.arena.live == world.count
+        assert len(np.unique(slots)) == world.count
+
+
+def test_clone_and_mutate():
+    rng = np.random.default_rng(1)
+    arena = GenomeArena()
+    parents = arena.allocate(10)
+    arena.randomize(parents, rng)
+    children = arena.clone(parents)
+    assert np.array_equal(arena.genomes[children], arena.genomes[parents])
+    arena.mutate(children, rate=1.0, rng=rng)
+    change = np.abs(arena.genomes[children] - arena.genomes[parents])
+    assert (change > 0).all() and (change <= 0.1).all()
+    assert np.array_equal(join(*split(arena.genomes[children])), arena.genomes[children])
+    assert arena.genomes.shape[1] == GENOME_SIZE
@@ -0,0 +1,44 @@
+import random
+
+import numpy as np
+
+from neural_class import NeuralNetwork, forward_batch, sigmoid, stack_weights
+
+
+def loop_forward(nn, inputs):
+    # NeuralNetwork.forward as it was written before the batched path: one weight at a time
+    hidden = [sigmoid(sum(inputs[j] * nn.weights_input_to_hidden[j][i] for j in range(nn.input_size)))
+              for i in range(nn.hidden_size)]
+    return [sigmoid(sum(hidden[j] * nn.weights_hidden_to_output[j][i] for j in range(nn.hidden_size)))
+            for i in range(nn.output_size)]
+
+
+def test_batched_forward_matches_the_loop():
+    rng = random.Random(4)
+    networks = [NeuralNetwork(3, 5, 2, rng=rng) for _ in range(50)]
+    inputs = np.random.default_rng(4).uniform(-2, 2, (50, 3))
+    expected = np.array([loop_forward(nn, x) for nn, x in zip(networks, inputs.tolist())])
+
+    assert np.allclose([nn.forward(x) for nn, x in zip(networks, inputs.tolist())], expected, rtol=0, atol=1e-12)
+    assert np.allclose(forward_batch(*stack_weights(networks), inputs), expected, rtol=0, atol=1e-12)
+
+    # A network rebuilt from its own weights decides the same, and draws no random numbers doing it
+    state = random.getstate()
+    rebuilt = [NeuralNetwork.from_weights(nn.weights_input_to_hidden, nn.weights_hidden_to_output) for nn in networks]
+    assert random.getstate() == state
+    assert np.allclose(forward_batch(*stack_weights(rebuilt), inputs), expected, rtol=0, atol=1e-12)
+
+
+def test_weights_are_one_flat_buffer_behind_the_list_api():
+    nn = NeuralNetwork(3, 5, 2, rng=random.Random(9))
+    assert len(nn.weights) == 25
+    assert nn.weights.tolist() == sum(nn.weights_input_to_hidden, []) + sum(nn.weights_hidden_to_output, [])
+
+    rows = [[float(3 * i + j) for j in range(2)] for i in range(5)]
+    nn.weights_hidden_to_output = rows
+    assert nn.weights_hidden_to_output == rows
+    assert nn.weights[15:].tolist() == sum(rows, [])
+
+    child = nn.copy()
+    child.mutate(1.0, random.Random(1))
+    assert child.weights_hidden_to_output != rows and nn.weights_hidden_to_output == rows
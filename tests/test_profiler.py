@@ -0,0 +1,48 @@
+from profiler import TickProfiler
+
+
+class FakeClock:
+    # Counts its reads, so a disabled profiler can be shown never to look at it
+    def __init__(self):
+        self.now = 0.0
+        self.reads = 0
+
+    def __call__(self):
+        self.reads += 1
+        return self.now
+
+
+def test_phase_times_add_up_per_frame():
+    clock = FakeClock()
+    profiler = TickProfiler(phases=("prey", "draw"), history=4, clock=clock)
+    profiler.enabled = True
+    for prey_ms, draw_ms in [(2, 1), (4, 3), (6, 5)]:
+        # Two ticks a frame, so prey runs twice and its times add up
+        for _ in range(2):
+            with profiler.phase("prey"):
+                clock.now += prey_ms / 2000
+        with profiler.phase("draw"):
+            clock.now += draw_ms / 1000
+        profiler.end_frame(ticks=2)
+
+    samples, ticks = profiler.recent()
+    assert ticks.tolist() == [2, 2, 2]
+    assert [[round(1000 * t, 9) for t in row] for row in samples.tolist()] == [[2, 1], [4, 3], [6, 5]]
+    assert {name: round(ms, 9) for name, ms in profiler.averages(2).items()} == {"prey": 5, "draw": 4}
+
+    # The ring buffer keeps only the last `history` frames
+    for _ in range(3):
+        profiler.end_frame()
+    assert profiler.filled == 4 and profiler.frame == 6
+
+
+def test_disabled_profiler_does_nothing():
+    clock = FakeClock()
+    profiler = TickProfiler(phases=("prey",), clock=clock)
+    for _ in range(3):
+        with profiler.phase("prey"):
+            clock.now += 1
+        profiler.end_frame()
+    assert clock.reads == 0
+    assert profiler.filled == 0 and profiler.frame == 0
+    assert profiler.averages() == {"prey": 0.0}
@@ -0,0 +1,36 @@
+import numpy as np
+
+from registry import EntityRegistry
+
+
+def test_commit_keeps_ids_and_rows_in_step():
+    rng = np.random.default_rng(0)
+    registry = EntityRegistry()
+    registry.reserve(50)
+    registry.commit()
+    # A payload column that moves with its row, the way World's columns do
+    payload = np.full(1000, -1)
+    payload[:50] = registry.ids[:50]
+    alive = set(range(50))
+
+    for _ in range(30):
+        born = registry.reserve(int(rng.integers(0, 10)))
+        payload[born] = registry.ids[born]
+        alive.update(registry.ids[born].tolist())
+        # Deaths can hit staged births too, and the same row twice
+        dying = rng.choice(registry.end, size=min(registry.end, int(rng.integers(0, 12))))
+        registry.kill(dying)
+        registry.kill(dying)
+        alive.difference_update(registry.ids[dying].tolist())
+
+        holes, movers = registry.commit()
+        payload[holes] = payload[movers]
+
+        live_ids = registry.ids[:registry.count]
+        assert sorted(live_ids.tolist()) == sorted(alive)
+        assert np.array_equal(payload[:registry.count], live_ids)
+        assert registry.alive[:registry.count].all()
+        assert np.array_equal(registry.rows_for(live_ids), np.arange(registry.count))
+
+    dead = np.setdiff1d(np.arange(registry.next_id), list(alive))
+    assert (registry.rows_for(dead) == -1).all()
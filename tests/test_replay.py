@@ -0,0 +1,35 @@
+import numpy as np
+
+from replay import ReplayReader, ReplayRecorder
+from simulation import Simulation
+
+
+def test_recording_round_trips(tmp_path):
+    sim = Simulation(n_prey=200, n_predators=10, seed=1)
+    path = tmp_path / "run.rpl"
+    recorder = ReplayRecorder(sim, path, keyframe_every=7)
+    expected = [(sim.world.ids.copy(), sim.world.position[:sim.world.count].copy())]
+    sim.listeners.append(lambda: expected.append((sim.world.ids.copy(), sim.world.position[:sim.world.count].copy())))
+    for _ in range(20):
+        sim.step()
+
+    # Offspring land up to 20 units past the edge; push a few agents further still
+    world = sim.world
+    world.position[:4] = [(-15, 300), (815, 300), (400, -20), (1e6, -1e6)]
+    recorder.record(force=True)
+    expected.append((world.ids.copy(), world.position[:world.count].copy()))
+    world.position[:4] = [(10, 10), (-20, 620), (820, -5), (400, 300)]
+    recorder.record(force=True)
+    expected.append((world.ids.copy(), world.position[:world.count].copy()))
+    recorder.close()
+
+    reader = ReplayReader(path)
+    assert len(reader) == len(expected)
+    # Anything the int16 range can hold comes back to within a quantization step
+    step = 1 / reader.header["scale"]
+    limit = 32767 * step
+    for number, (ids, position) in enumerate(expected):
+        frame = reader.frame(number)
+        assert np.array_equal(frame.ids, ids)
+        assert np.abs(frame.position - np.clip(position, -limit, limit)).max() <= step
+    reader.close()
@@ -0,0 +1,59 @@
+from simulation import MAX_BACKLOG, FixedStepScheduler
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeSim:
+    # Counts ticks, each costing step_cost seconds of the fake clock
+    def __init__(self, clock, step_cost=0.0):
+        self.clock = clock
+        self.step_cost = step_cost
+        self.ticks = 0
+
+    def step(self):
+        self.ticks += 1
+        self.clock.now += self.step_cost
+
+
+def scheduler(step_cost=0.0, frame_budget=1.0):
+    clock = FakeClock()
+    sim = FakeSim(clock, step_cost)
+    # 4 ticks a second, so every elapsed time below is an exact number of ticks
+    return FixedStepScheduler(sim, tick_rate=4, frame_budget=frame_budget, clock=clock), sim, clock
+
+
+def test_ticks_follow_real_time_and_the_speed():
+    fixed, sim, clock = scheduler()
+    clock.now += 0.75
+    assert fixed.advance() == 3
+    clock.now += 0.1  # Not a whole tick yet; it's carried over
+    assert fixed.advance() == 0
+    clock.now += 0.15
+    assert fixed.advance() == 1
+
+    fixed.set_speed(10)
+    clock.now += 0.5
+    assert fixed.advance() == 20
+    assert fixed.ticks_last_frame == 20 and sim.ticks == 24
+
+
+def test_catch_up_stops_at_the_budget_and_drops_old_debt():
+    fixed, sim, clock = scheduler(step_cost=0.3, frame_budget=1.0)
+    clock.now += 10  # 40 ticks owed, but only 4 fit in a frame
+    assert fixed.advance() == 4
+    assert fixed.backlog == MAX_BACKLOG
+
+
+def test_max_speed_fills_the_budget_and_always_moves():
+    fixed, sim, clock = scheduler(step_cost=0.25, frame_budget=1.0)
+    fixed.set_speed(None)
+    assert fixed.advance() == 4
+    fixed, sim, clock = scheduler(step_cost=5.0, frame_budget=1.0)
+    fixed.set_speed(None)
+    assert fixed.advance() == 1
@@ -0,0 +1,212 @@
+import math
+from types import SimpleNamespace
+
+import numpy as np
+
+from Fish import Predator
+from simulation import Simulation
+from spatial import NeighbourContext, SpatialIndex, half_angle_cosines, in_fov, nearest_per_query
+
+
+WIDTH, HEIGHT = 400, 300
+
+
+def random_positions(rng, n):
+    return rng.uniform(0, (WIDTH, HEIGHT), (n, 2))
+
+
+def cells_as_sets(index):
+    return [set(index.rows_in(cell).tolist()) for cell in range(index.n_cells)]
+
+
+def test_update_matches_rebuild():
+    rng = np.random.default_rng(0)
+    index = SpatialIndex(WIDTH, HEIGHT, 25)
+    positions = random_positions(rng, 500)
+    index.rebuild(positions)
+
+    # Small drifts (patched in place), births, deaths, no movement at all, and a big shuffle (rebuild)
+    steps = [lambda p: p + rng.normal(0, 3, p.shape),
+             lambda p: np.concatenate((p, random_positions(rng, 20))),
+             lambda p: p[:470],
+             lambda p: p.copy(),
+             lambda p: random_positions(rng, 300)]
+    for step in steps:
+        positions = np.clip(step(positions), 0, (WIDTH, HEIGHT))
+        index.update(positions)
+        fresh = SpatialIndex(WIDTH, HEIGHT, 25)
+        fresh.rebuild(positions)
+        assert len(index) == len(positions)
+        assert np.array_equal(index.cell_start, fresh.cell_start)
+        assert cells_as_sets(index) == cells_as_sets(fresh)
+
+
+def test_pairs_within_matches_brute_force():
+    rng = np.random.default_rng(3)
+    index = SpatialIndex(WIDTH, HEIGHT, 20)
+    agents = random_positions(rng, 400)
+    index.rebuild(agents)
+    points = random_positions(rng, 100)
+
+    all_distance = np.hypot(*(agents[None, :, :] - points[:, None, :]).transpose(2, 0, 1))
+    # Radii both inside one cell and reaching several cells out
+    for radius in (15, 55):
+        query, rows, distance = index.pairs_within(points, radius)
+        expected = set(zip(*np.nonzero(all_distance < radius)))
+        assert set(zip(query.tolist(), rows.tolist())) == {(int(q), int(r)) for q, r in expected}
+        assert np.allclose(distance, all_distance[query, rows])
+
+
+def brute_nearest(targets, points, max_distance):
+    # Nearest target to each point if within range, the lowest index winning ties, as (index or -1, distance)
+    if len(targets) == 0:
+        return np.full(len(points), -1), np.full(len(points), np.inf)
+    distance = np.hypot(*(targets[None, :, :] - points[:, None, :]).transpose(2, 0, 1))
+    nearest = distance.argmin(axis=1)
+    best = distance[np.arange(len(points)), nearest]
+    in_range = best <= max_distance
+    return np.where(in_range, nearest, -1), np.where(in_range, best, np.inf)
+
+
+def test_nearest_matches_brute_force():
+    rng = np.random.default_rng(1)
+    # Whole-number positions, like spawns, so equally near targets are common
+    for targets in (random_positions(rng, 40), rng.integers(0, 60, (80, 2)).astype(float)):
+        index = SpatialIndex(WIDTH, HEIGHT, 20)
+        index.rebuild(targets)
+        points = rng.integers(0, 60, (300, 2)).astype(float)
+        max_distance = rng.uniform(0, 200, len(points))
+
+        found, distance = index.nearest(points, max_distance)
+        expected_found, expected_distance = brute_nearest(targets, points, max_distance)
+        assert np.array_equal(found, expected_found)
+        assert np.allclose(distance, expected_distance)
+
+
+def test_context_nearest_with_and_without_predators():
+    rng = np.random.default_rng(2)
+    positions = random_positions(rng, 200)
+    index = SpatialIndex(WIDTH, HEIGHT, 25)
+    index.rebuild(positions)
+    points = random_positions(rng, 50)
+    for rows in (np.arange(0, 200, 13), np.zeros(0, dtype=np.int64)):
+        context = NeighbourContext(index, positions, rows, 20, 0, 100)
+        found, distance = context.nearest(positions, points, 150)
+        expected_found, expected_distance = brute_nearest(positions[rows], points, 150)
+        hit = expected_found >= 0
+        assert np.array_equal(found >= 0, hit)
+        assert np.array_equal(found[hit], rows[expected_found[hit]])
+        assert np.allclose(distance, expected_distance)
+
+
+def test_world_without_predators_keeps_running():
+    sim = Simulation(n_prey=50, n_predators=0, seed=1)
+    for _ in range(20):
+        sim.step()
+    assert sim.populations()[1] == 0
+
+
+def test_context_pairs_survive_a_tick_of_movement():
+    rng = np.random.default_rng(4)
+    positions = random_positions(rng, 300)
+    index = SpatialIndex(WIDTH, HEIGHT, 25)
+    index.rebuild(positions)
+    rows = np.arange(0, 300, 7)
+    # Pairs can close in by up to 2 * sqrt(8) before within() is asked
+    context = NeighbourContext(index, positions, rows, 15, 6, 100)
+
+    # Everyone moves a little after the context is built; measure() must see where they are now
+    moved = np.clip(positions + rng.uniform(-2, 2, positions.shape), 0, (WIDTH, HEIGHT))
+    context.measure(moved)
+    query, other = context.within(15)
+
+    distance = np.hypot(*(moved[None, :, :] - moved[rows][:, None, :]).transpose(2, 0, 1))
+    distance[np.arange(len(rows)), rows] = np.inf  # Nobody collides with themselves
+    expected = {(int(q), int(o)) for q, o in zip(*np.nonzero(distance < 15))}
+    assert set(zip(query.tolist(), other.tolist())) == expected
+    assert np.allclose(context.pairs()[3], np.hypot(*(moved[context.other] - moved[rows[context.query]]).T))
+
+
+def test_nearest_per_query_breaks_ties_on_the_lowest_candidate():
+    query = np.array([0, 0, 0, 1, 1, 2])
+    candidate = np.array([9, 4, 7, 3, 5, 8])
+    distance = np.array([1.0, 1.0, 2.0, 5.0, 4.0, 3.0])
+    nearest, best = nearest_per_query(query, candidate, distance, 4)
+    assert nearest.tolist() == [4, 5, 8, -1]
+    assert best.tolist() == [1.0, 4.0, 3.0, np.inf]
+
+
+def atan2_in_view(delta, heading, fov_angle, fov_distance):
+    # The original rule: in reach, and the bearing no further off the heading than half the view angle
+    dx, dy = delta
+    if math.hypot(dx, dy) > fov_distance:
+        return False
+    diff = abs(heading - math.atan2(dy, dx)) % (2 * math.pi)
+    return min(diff, 2 * math.pi - diff) <= math.radians(fov_angle) / 2
+
+
+def check_fov(delta, heading, fov_angle, fov_distance):
+    # in_fov and Predator.is_within_fov, both against the atan2 rule
+    fov_distance = np.broadcast_to(np.asarray(fov_distance, dtype=float), (len(delta),))
+    seen = in_fov(delta, np.column_stack((np.cos(heading), np.sin(heading))),
+                  half_angle_cosines(fov_angle), fov_distance)
+    expected = [atan2_in_view(*args) for args in zip(delta.tolist(), heading.tolist(), fov_angle.tolist(),
+                                                     fov_distance.tolist())]
+    assert seen.tolist() == expected
+
+    predator = Predator()
+    for (dx, dy), h, angle, reach, want in zip(delta.tolist(), heading.tolist(), fov_angle.tolist(),
+                                              fov_distance.tolist(), expected):
+        predator.position, predator.direction = [100.0, 100.0], h
+        predator.fov_angle, predator.fov_distance = angle, reach
+        assert predator.is_within_fov(SimpleNamespace(position=[100.0 + dx, 100.0 + dy])) == want
+
+
+def test_fov_matches_atan2_on_random_points():
+    rng = np.random.default_rng(6)
+    n = 2000
+    check_fov(rng.uniform(-60, 60, (n, 2)), rng.uniform(-2 * math.pi, 4 * math.pi, n),
+              rng.choice([0.0, 45.0, 120.0, 200.0, 360.0, 400.0], n), rng.uniform(0, 80, n))
+
+
+def test_fov_counts_points_exactly_on_the_edge():
+    # Headings and offsets on the compass points and diagonals, so the bearing and
+    # the cone's edge are the very same float and the atan2 rule says "in view"
+    offsets = np.array([(1, 0), (1, 1), (0, 1), (-1, 1), (-1, 0), (-1, -1), (0, -1), (1, -1)], dtype=float) * 3
+    delta, heading, fov_angle = [], [], []
+    for h in range(0, 360, 45):
+        for angle in (0, 90, 180, 270, 360):
+            for offset in offsets:
+                delta.append(offset)
+                heading.append(math.radians(h))
+                fov_angle.append(float(angle))
+    delta = np.array(delta)
+    # And right at the edge of reach
+    check_fov(delta, np.array(heading), np.array(fov_angle), np.hypot(delta[:, 0], delta[:, 1]))
+
+
+def test_fov_at_zero_distance_and_all_the_way_round():
+    # Sitting on the observer counts as being due east of it, as atan2(0, 0) = 0 has it; 360 sees everything
+    heading = np.array([0.0, 1.0, 2.0, 3.0])
+    check_fov(np.zeros((4, 2)), heading, np.array([0.0, 45.0, 360.0, -10.0]), 10)
+    behind = -np.column_stack((np.cos(heading), np.sin(heading))) * 5
+    check_fov(behind, heading, np.full(4, 360.0), 10)
+
+
+def test_rows_in_rect_finds_everyone_inside_even_past_the_edge():
+    rng = np.random.default_rng(8)
+    # Some agents a little outside the world, as offspring can be
+    positions = rng.uniform((-20, -20), (WIDTH + 20, HEIGHT + 20), (600, 2))
+    index = SpatialIndex(WIDTH, HEIGHT, 25)
+    index.rebuild(positions)
+    for x0, y0, x1, y1 in [(50, 60, 130, 90), (-30, -30, 40, 40), (350, 250, 430, 330),
+                           (-30, -30, WIDTH + 30, HEIGHT + 30), (100, 100, 100, 100)]:
+        rows = index.rows_in_rect(x0, y0, x1, y1)
+        assert len(np.unique(rows)) == len(rows)
+        inside = np.flatnonzero((positions[:, 0] >= x0) & (positions[:, 0] <= x1)
+                                & (positions[:, 1] >= y0) & (positions[:, 1] <= y1))
+        assert set(inside.tolist()) <= set(rows.tolist())
+        # Nothing from cells the rect doesn't touch
+        (row0, row1), (col0, col1) = divmod(index.cells_for(np.array([[x0, y0], [x1, y1]])), index.cols)
+        row, col = divmod(index.cells_for(positions[rows]), index.cols)
+        assert np.all((col >= col0) & (col <= col1) & (row >= row0) & (row <= row1))
@@ -0,0 +1,12 @@
+from sweep import sweep, write_csv
+
+
+def test_a_failing_run_does_not_lose_the_others(tmp_path):
+    # numpy refuses negative seeds, so the seed -1 runs raise inside their workers
+    rows = sweep({"grid_regen_rate": [1, 2]}, seeds=[1, -1], ticks=20, sample_every=10, workers=2)
+    failed = [row for row in rows if row.get("error")]
+    assert sorted(row["run"] for row in failed) == [1, 3]
+    assert all(row["seed"] == -1 and "ValueError" in row["error"] for row in failed)
+    # The good runs kept their whole time series: ticks 0, 10 and 20
+    assert sorted(row["run"] for row in rows if not row.get("error")) == [0, 0, 0, 2, 2, 2]
+    write_csv(rows, tmp_path / "sweep.csv")
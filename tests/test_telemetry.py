@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+import telemetry
+from simulation import Simulation
+from world import PREY
+
+
+def test_records_round_trip_and_append(tmp_path):
+    path = tmp_path / "run.tlm"
+    sim = Simulation(n_prey=150, n_predators=15, seed=2)
+    expected = []
+
+    def note():
+        world = sim.world
+        prey = world.species[:world.count] == PREY
+        expected.append((sim.tick, int(prey.sum()), float(world.energy[:world.count][prey].mean()),
+                         sim.energy_grid.total))
+
+    # Chunks smaller than the run, so there are full ones and a partly filled last one
+    writer = telemetry.TelemetryWriter(sim, path, chunk_size=8)
+    sim.listeners.append(note)
+    for _ in range(20):
+        sim.step()
+    writer.close()
+
+    # A second writer on the same file carries on after the first one's records
+    writer = telemetry.TelemetryWriter(sim, path, chunk_size=8)
+    for _ in range(5):
+        sim.step()
+    writer.close()
+
+    records = telemetry.read(path)
+    assert writer.dropped == 0
+    assert records["tick"].tolist() == list(range(1, 26))
+    assert records["prey"].tolist() == [prey for _, prey, _, _ in expected]
+    assert np.allclose(records["prey_energy"], [energy for _, _, energy, _ in expected])
+    assert np.allclose(records["grid_energy"], [grid for *_, grid in expected])
+
+
+def test_a_chunk_cut_off_mid_write_is_dropped_on_append(tmp_path):
+    path = tmp_path / "run.tlm"
+    sim = Simulation(n_prey=50, n_predators=5, seed=1)
+    writer = telemetry.TelemetryWriter(sim, path, chunk_size=4)
+    for _ in range(8):
+        sim.step()
+    writer.close()
+    with open(path, "ab") as f:
+        f.write(telemetry.CHUNK_HEADER.pack(1000) + b"\0" * 10)
+
+    writer = telemetry.TelemetryWriter(sim, path, chunk_size=4)
+    sim.step()
+    writer.close()
+    assert telemetry.read(path)["tick"].tolist() == list(range(1, 10))
+
+
+def test_dropped_records_warn_instead_of_printing(tmp_path, capsys):
+    sim = Simulation(n_prey=10, n_predators=1, seed=1)
+    writer = telemetry.TelemetryWriter(sim, tmp_path / "run.tlm")
+    writer.dropped = 3
+    with pytest.warns(RuntimeWarning, match="3 telemetry records dropped"):
+        writer.close()
+    assert capsys.readouterr().out == ""
@@ -0,0 +1,106 @@
+import random
+
+import numpy as np
+import pytest
+
+from backends import NumpyBackend, ReferenceBackend
+from simulation import Simulation
+from world import COLLISION_DISTANCE, PREDATOR_SENSE_RADIUS, PREY
+
+
+def crowded_sim(seed):
+    # Lots of agents on a small world, so plenty of them overlap
+    sim = Simulation(n_prey=400, n_predators=60, width=200, height=150, seed=seed)
+    for _ in range(5):
+        sim.step()
+    sim.index.update(sim.world.position[:sim.world.count])
+    return sim
+
+
+def test_collisions_match_brute_force():
+    sim = crowded_sim(3)
+    world = sim.world
+    context = world.neighbours(sim.index)
+    fast = NumpyBackend().collide(world, context, COLLISION_DISTANCE)
+    slow = ReferenceBackend().collide(world, context, COLLISION_DISTANCE)
+    assert len(fast) > 0
+    assert np.array_equal(fast, slow)
+
+
+def test_index_cell_size_does_not_change_the_run():
+    # The index only decides where to look, never who counts as a neighbour
+    runs = []
+    for cell_size in (10, 40, 100):
+        sim = Simulation(n_prey=300, n_predators=30, width=400, height=300, seed=5, cell_size=cell_size)
+        for _ in range(60):
+            sim.step()
+        runs.append(sim.world.columns(np.arange(sim.world.count)))
+    for other in runs[1:]:
+        for name, column in runs[0].items():
+            assert np.array_equal(column, other[name]), name
+
+
+class CheckedBackend(NumpyBackend):
+    # Holds the reused context pairs, after this tick's moves, to brute-force answers
+    checked = 0
+
+    def perceive_predators(self, world, predators, query, candidate, delta, distance, radius):
+        prey = np.flatnonzero(world.species[:world.count] == PREY)
+        offsets = world.position[prey][None, :, :] - world.position[predators][:, None, :]
+        close = np.hypot(offsets[..., 0], offsets[..., 1]) < PREDATOR_SENSE_RADIUS
+        expected = {(int(q), int(prey[p])) for q, p in zip(*np.nonzero(close))}
+        assert set(zip(query.tolist(), candidate.tolist())) == expected
+        self.checked += len(expected)
+        return super().perceive_predators(world, predators, query, candidate, delta, distance, radius)
+
+    def collide(self, world, context, radius):
+        fast = super().collide(world, context, radius)
+        assert np.array_equal(fast, ReferenceBackend().collide(world, context, radius))
+        self.checked += len(fast)
+        return fast
+
+
+def test_reused_context_pairs_stay_exact_with_small_cells():
+    # Cells narrower than a tick's travel, so pairs can start a cell or more apart and still collide
+    backend = CheckedBackend()
+    sim = Simulation(n_prey=400, n_predators=60, width=200, height=150, seed=2, cell_size=2,
+                     backend=backend)
+    for _ in range(30):
+        sim.step()
+    assert backend.checked > 0
+
+
+def test_context_refuses_a_radius_it_did_not_collect():
+    sim = crowded_sim(1)
+    context = sim.world.neighbours(sim.index)
+    context.measure(sim.world.position)
+    with pytest.raises(ValueError):
+        context.within(context.radius + 1)
+
+
+def test_same_seed_same_run_even_when_interleaved():
+    # Each world owns its generator, so neither a twin nor the global RNGs can nudge it
+    def snapshot(sim):
+        world = sim.world
+        return world.ids.copy(), world.columns(np.arange(world.count)), sim.energy_grid.energy.copy()
+
+    alone = Simulation(n_prey=200, n_predators=20, seed=11)
+    for _ in range(40):
+        alone.step()
+
+    a, b = Simulation(n_prey=200, n_predators=20, seed=11), Simulation(n_prey=200, n_predators=20, seed=11)
+    for tick in range(40):
+        a.step()
+        np.random.random(), random.random()
+        if tick % 3:
+            b.step()
+    for _ in range(40 - b.tick):
+        b.step()
+
+    expected = snapshot(alone)
+    for sim in (a, b):
+        ids, columns, energy = snapshot(sim)
+        assert np.array_equal(ids, expected[0])
+        for name, column in columns.items():
+            assert np.array_equal(column, expected[1][name]), name
+        assert np.array_equal(energy, expected[2])
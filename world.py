@@ -0,0 +1,591 @@
+import math
+
+import numpy as np
+
+from Fish import MAX_SPEED, TURN_ANGLE, WORLD_WIDTH, WORLD_HEIGHT, MAX_ENERGY, MAX_DISTANCE, Prey, Predator
+from backends import NumpyBackend
+from genome import GenomeArena, join
+from neural_class import NeuralNetwork, stack_weights
+from params import SimParams
+from registry import EntityRegistry
+from spatial import NeighbourContext
+
+
+# SECTION 0: SPECIES TAGS AND PER-SPECIES CONSTANTS
+# -------------------------------------------------
+PREY = 0
+PREDATOR = 1
+
+# These mirror the defaults in Prey.__init__ / Predator.__init__; the species-wide ones
+# come straight from the class attributes
+PREY_START_ENERGY = 50
+PREY_REPRODUCTION_COOLDOWN = 100
+PREY_SPEED_BOOST_MULTIPLIER = Prey.speed_boost_multiplier
+PREY_BOOST_ENERGY_COST = Prey.boost_energy_cost
+PREY_AFTER_BOOST_SLOWDOWN = Prey.after_boost_slowdown
+PREY_BOOST_COOLDOWN_TIMER = Prey.boost_cooldown_timer
+PREY_BOOST_ENERGY_THRESHOLD = Prey.boost_energy_threshold
+
+PREDATOR_START_ENERGY = 100
+PREDATOR_MAX_VELOCITY = Predator.max_velocity
+PREDATOR_ENERGY_CONSUMPTION_RATE = Predator.energy_consumption_rate
+PREDATOR_EATING_DISTANCE = 20
+PREDATOR_EATING_COOLDOWN = 30
+PREDATOR_REPRODUCTION_COOLDOWN = 100
+
+COLLISION_DISTANCE = 5
+
+DEFAULT_COLOR = {PREY: (0, 255, 0), PREDATOR: (255, 0, 0)}
+DEFAULT_FOV_ANGLE = {PREY: 120, PREDATOR: 45}
+DEFAULT_FOV_DISTANCE = {PREY: 400, PREDATOR: 1000}
+
+# Predators are sparse, so the per-tick index prey use to find them has coarse cells
+PREDATOR_INDEX_CELL_SIZE = 100
+
+# How far a predator senses prey to chase (and eat) them: the old 3x3 block of energy
+# grid squares around it, as a radius in world units so the index's cell size can't change it
+PREDATOR_SENSE_RADIUS = MAX_DISTANCE
+
+# The furthest an agent moves in one go: a boosted prey step, or a predator stepping at
+# its decided velocity (the faster clamped velocity only applies from the next tick)
+PREY_MAX_STEP = max(MAX_SPEED * PREY_SPEED_BOOST_MULTIPLIER, MAX_SPEED + 0.1)
+PREDATOR_MAX_STEP = MAX_SPEED
+
+# How much closer a pair in the tick's NeighbourContext can get before its last use
+# (collisions): prey move twice, then predators once
+CONTEXT_MARGIN = 2 * PREY_MAX_STEP + PREDATOR_MAX_STEP
+
+
+
+def angle_diff(angle1, angle2):
+    # Vectorized Agent.angle_diff
+    diff = np.abs(angle1 - angle2) % (2 * math.pi)
+    return np.minimum(diff, 2 * math.pi - diff)
+
+
+# SECTION 1: WORLD STATE
+# ----------------------
+class World:
+    """
+    Structure-of-arrays world state. Every agent is a row index into a set of
+    contiguous NumPy arrays, and each tick runs as a handful of vectorized passes
+    instead of one Python method call per agent.
+
+    Births and deaths are deferred: spawn() stages new rows and kill() tombstones old
+    ones, and neither takes effect until commit(), which the Simulation calls once at
+    the end of each tick. Rows are only valid until the next commit; every agent also
+    has a stable id (see ids / row_of) that survives compaction. Use
+    agents()/prey()/predators() to get wrapper objects for drawing code that wants
+    Prey/Predator-like objects.
+
+    Brains live in a GenomeArena (self.arena); each row only holds its genome_slot, so
+    births copy a genome row and compaction never has to move weights around.
+
+    All randomness comes from self.rng, a numpy Generator owned by this world, so two
+    worlds never disturb each other and a seeded world replays exactly.
+
+    The number crunching (moving, perceiving, deciding, feeding, colliding) is done by
+    self.backend (see backends.py); the world does the bookkeeping around it.
+    """
+
+    def __init__(self, width=WORLD_WIDTH, height=WORLD_HEIGHT, capacity=1024, params=None, rng=None,
+                 backend=None):
+        self.width = width
+        self.height = height
+        self.params = params or SimParams()
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.backend = backend or NumpyBackend()
+        self.capacity = 0
+        self.registry = EntityRegistry()
+
+        self.position = np.zeros((0, 2))
+        self.direction = np.zeros(0)
+        self.velocity = np.zeros(0)
+        self.energy = np.zeros(0)
+        self.reproduction_cooldown = np.zeros(0, dtype=np.int32)
+        self.eating_cooldown = np.zeros(0, dtype=np.int32)
+        self.boost_cooldown = np.zeros(0, dtype=np.int32)
+        self.species = np.zeros(0, dtype=np.int8)
+        self.color = np.zeros((0, 3), dtype=np.uint8)
+        self.fov_angle = np.zeros(0)
+        self.fov_distance = np.zeros(0)
+        self.predator_nearby = np.zeros(0, dtype=bool)
+        self.active = np.zeros(0, dtype=bool)  # False for read-only context rows (see domain.py)
+        self.genome_slot = np.zeros(0, dtype=np.int64)
+        self.arena = GenomeArena(allocate_storage=self._allocate)
+
+        # Running totals for telemetry: offspring born, agents removed at commit, prey eaten
+        self.total_births = 0
+        self.total_deaths = 0
+        self.total_kills = 0
+
+        self._grow(capacity)
+
+    # Every per-agent array, so growing and compacting can't forget one
+    _COLUMNS = ("position", "direction", "velocity", "energy", "reproduction_cooldown",
+                "eating_cooldown", "boost_cooldown", "species", "color", "fov_angle",
+                "fov_distance", "predator_nearby", "active", "genome_slot")
+
+    def _allocate(self, name, shape, dtype):
+        # Storage for one column; subclasses can put it somewhere else (e.g. shared memory)
+        return np.zeros(shape, dtype=dtype)
+
+    def _grow(self, needed):
+        if needed <= self.capacity:
+            return
+        new_capacity = max(needed, self.capacity * 2, 16)
+        used = self.registry.end
+        for name in self._COLUMNS:
+            old = getattr(self, name)
+            new = self._allocate(name, (new_capacity,) + old.shape[1:], old.dtype)
+            new[:used] = old[:used]
+            setattr(self, name, new)
+        # Never more genomes in use than rows, so the arena grows in step with the columns
+        self.arena.grow(new_capacity)
+        self.registry.grow(new_capacity)
+        self.capacity = new_capacity
+
+    @property
+    def count(self):
+        # Live (committed) agents; staged births sit just past this
+        return self.registry.count
+
+    @property
+    def ids(self):
+        return self.registry.ids[:self.count]
+
+    def row_of(self, agent_id):
+        return int(self.registry.rows_for(agent_id))
+
+    def __len__(self):
+        return self.count
+
+    # SECTION 1.1: SPAWNING AND REMOVAL
+    def spawn(self, species, n, positions=None, colors=None, fov_angles=None, fov_distances=None,
+              weights=None, genome_slots=None):
+        """
+        Stage n agents of one species and return their rows. They go live at commit().
+        Brains are random unless weights ((N, 3, 5), (N, 5, 2)) or already filled arena
+        genome_slots are given.
+        """
+        self._grow(self.registry.end + n)
+        rows = self.registry.reserve(n)
+
+        if positions is None:
+            positions = np.column_stack((self.rng.integers(0, self.width, n),
+                                         self.rng.integers(0, self.height, n)))
+        self.position[rows] = positions
+        self.direction[rows] = self.rng.uniform(0, 2 * math.pi, n)
+        self.velocity[rows] = self.rng.uniform(0, MAX_SPEED, n)
+        self.species[rows] = species
+        self.color[rows] = DEFAULT_COLOR[species] if colors is None else colors
+        self.fov_angle[rows] = DEFAULT_FOV_ANGLE[species] if fov_angles is None else fov_angles
+        self.fov_distance[rows] = DEFAULT_FOV_DISTANCE[species] if fov_distances is None else fov_distances
+        self.eating_cooldown[rows] = 0
+        self.boost_cooldown[rows] = 0
+        self.predator_nearby[rows] = False
+        self.active[rows] = True
+        if species == PREY:
+            self.energy[rows] = PREY_START_ENERGY
+            self.reproduction_cooldown[rows] = PREY_REPRODUCTION_COOLDOWN
+        else:
+            self.energy[rows] = PREDATOR_START_ENERGY
+            self.reproduction_cooldown[rows] = 0
+
+        if genome_slots is None:
+            genome_slots = self.arena.allocate(n)
+            if weights is None:
+                self.arena.randomize(genome_slots, self.rng)
+            else:
+                self.arena.genomes[genome_slots] = join(*weights)
+        self.genome_slot[rows] = genome_slots
+        return rows
+
+    def spawn_prey(self, n):
+        return self.spawn(PREY, n)
+
+    def spawn_predators(self, n):
+        return self.spawn(PREDATOR, n)
+
+    def add_agents(self, agents):
+        """Copy existing Prey/Predator objects (or views) into the world."""
+        for agent in agents:
+            species = PREDATOR if isinstance(agent, (Predator, PredatorView)) else PREY
+            row = self.spawn(species, 1, positions=[agent.position], colors=[agent.color],
+                             fov_angles=[agent.fov_angle], fov_distances=[agent.fov_distance],
+                             weights=stack_weights([agent.nn]))[0]
+            self.direction[row] = agent.direction
+            self.velocity[row] = agent.velocity
+            self.energy[row] = agent.energy
+            self.reproduction_cooldown[row] = agent.reproduction_cooldown
+
+    def load(self, columns):
+        """
+        Stage rows straight from column arrays ({name: values}, as taken from another
+        World's columns) and return them. Missing columns are left zeroed. Brains come
+        from "genome" ((N, GENOME_SIZE)) or the two stacked weight tensors.
+        """
+        n = len(columns["species"])
+        self._grow(self.registry.end + n)
+        rows = self.registry.reserve(n)
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            column[rows] = columns[name] if name in columns else 0
+
+        slots = self.arena.allocate(n)
+        if "genome" in columns:
+            self.arena.genomes[slots] = columns["genome"]
+        elif "weights_input_to_hidden" in columns:
+            self.arena.genomes[slots] = join(columns["weights_input_to_hidden"],
+                                             columns["weights_hidden_to_output"])
+        else:
+            self.arena.genomes[slots] = 0
+        self.genome_slot[rows] = slots
+        return rows
+
+    def columns(self, rows):
+        """Copy rows out as {name: values}, the inverse of load(). Slots become genomes."""
+        columns = {name: getattr(self, name)[rows].copy() for name in self._COLUMNS if name != "genome_slot"}
+        columns["genome"] = self.arena.genomes[self.genome_slot[rows]]
+        return columns
+
+    def kill(self, rows):
+        """Tombstone rows. They keep their data until the next commit()."""
+        self.registry.kill(rows)
+
+    def commit(self):
+        """Make staged births live and swap-remove the dead, in one bulk pass."""
+        end = self.registry.end
+        dead = np.flatnonzero(~self.registry.alive[:end])
+        self.total_deaths += len(dead)
+        self.arena.release(self.genome_slot[dead])
+        holes, movers = self.registry.commit()
+        if len(holes):
+            for name in self._COLUMNS:
+                column = getattr(self, name)
+                column[holes] = column[movers]
+
+    def rows_of(self, species):
+        return np.flatnonzero(self.species[:self.count] == species)
+
+    def updating(self, species):
+        # Rows of a species that this world is responsible for moving this tick
+        return np.flatnonzero((self.species[:self.count] == species) & self.active[:self.count])
+
+    def count_species(self, species):
+        return int(np.count_nonzero(self.species[:self.count] == species))
+
+    # SECTION 1.2: WRAPPER OBJECTS
+    def agents(self, rows=None):
+        # Every agent, or just the given rows (e.g. the ones on screen)
+        if rows is None:
+            return [_VIEW_TYPES[s](self, row) for row, s in enumerate(self.species[:self.count].tolist())]
+        return [_VIEW_TYPES[s](self, row) for row, s in zip(rows.tolist(), self.species[rows].tolist())]
+
+    def prey(self):
+        return [PreyView(self, row) for row in self.rows_of(PREY)]
+
+    def predators(self):
+        return [PredatorView(self, row) for row in self.rows_of(PREDATOR)]
+
+    # SECTION 2: MOVEMENT
+    # -------------------
+    def move_prey(self, rows, energy_grid):
+        """Vectorized Prey.move: boost/slowdown, Agent.move, then graze the energy grid."""
+        energy = self.energy[rows]
+        cooldown = self.boost_cooldown[rows]
+        speed = self.velocity[rows].copy()
+
+        boosting = (energy > PREY_BOOST_ENERGY_THRESHOLD) & self.predator_nearby[rows] & (cooldown == 0)
+        slowed = ~boosting & (cooldown > 0)
+        speed[boosting] *= PREY_SPEED_BOOST_MULTIPLIER
+        speed[slowed] *= PREY_AFTER_BOOST_SLOWDOWN
+        energy[boosting] -= PREY_BOOST_ENERGY_COST
+        cooldown[boosting] = PREY_BOOST_COOLDOWN_TIMER
+
+        # Agent.move's gradual acceleration only lasts for this step; Prey.move restores
+        # the original velocity afterwards
+        speed = np.where(speed < MAX_SPEED, speed + 0.1, speed)
+        self.backend.move(self, rows, speed, reflect=True)
+
+        # Graze the EnergyField; prey sharing a cell split what's there
+        energy += self.backend.feed(energy_grid, self.position[rows], self.params.prey_energy_gain)
+
+        self.energy[rows] = np.minimum(energy, MAX_ENERGY)
+        self.boost_cooldown[rows] = cooldown
+
+    def move_predators(self, rows):
+        """Vectorized Predator.move: no border bounce, velocity clamped, energy burned."""
+        self.backend.move(self, rows, self.velocity[rows], reflect=False)
+        velocity = np.clip(self.velocity[rows], 1, PREDATOR_MAX_VELOCITY)
+        self.velocity[rows] = velocity
+        cost = np.where(velocity == PREDATOR_MAX_VELOCITY, 2 * PREDATOR_ENERGY_CONSUMPTION_RATE,
+                        PREDATOR_ENERGY_CONSUMPTION_RATE)
+        self.energy[rows] = np.maximum(self.energy[rows] - cost, 0)
+
+    # SECTION 3: PERCEPTION AND DECISIONS
+    # -----------------------------------
+    def neighbours(self, index):
+        """
+        This tick's NeighbourContext: everything within PREDATOR_SENSE_RADIUS of each
+        predator in index (which must be up to date with this world's rows), plus room for
+        this tick's moves, shared by prey perception, predator perception and feeding, and
+        collisions.
+        """
+        return NeighbourContext(index, self.position, self.rows_of(PREDATOR), PREDATOR_SENSE_RADIUS,
+                                CONTEXT_MARGIN, PREDATOR_INDEX_CELL_SIZE)
+
+    def nearest_predators(self, prey, context):
+        """
+        Nearest predator row (or -1) and its distance for every prey row at once, looking no
+        further than each prey's fov_distance.
+        """
+        return self.backend.perceive_prey(self, prey, context)
+
+    def _target_info(self, rows, targets):
+        # (distance, angle) pairs as get_nearest_*_info returns them, (1, 0) when there's no target
+        distance = np.ones(len(rows))
+        angle = np.zeros(len(rows))
+        has = targets >= 0
+        if has.any():
+            delta = self.position[targets[has]] - self.position[rows[has]]
+            distance[has] = np.hypot(delta[:, 0], delta[:, 1]) / MAX_DISTANCE
+            bearing = np.arctan2(delta[:, 1], delta[:, 0])
+            angle[has] = angle_diff(self.direction[rows[has]], bearing) / math.pi
+        return distance, angle
+
+    def _decide(self, rows, distance, angle):
+        # Same (double) normalization as Prey.update / Predator.update
+        inputs = np.column_stack((distance / MAX_DISTANCE, angle / math.pi,
+                                  self.energy[rows] / MAX_ENERGY))
+        decision = self.backend.decide(self, rows, inputs)
+        self.direction[rows] += decision[:, 0] * TURN_ANGLE - TURN_ANGLE / 2
+        self.velocity[rows] = decision[:, 1] * MAX_SPEED
+
+    # SECTION 4: PER-TICK UPDATE
+    # --------------------------
+    def step(self, energy_grid, index):
+        """One tick for every active agent. Returns the rows of the prey eaten in it."""
+        context = self.neighbours(index)
+        self.update_prey(energy_grid, context)
+        eaten = self.update_predators(context)
+        self.resolve_collisions(context)
+        return eaten
+
+    def update_prey(self, energy_grid, context):
+        prey = self.updating(PREY)
+        if len(prey) == 0:
+            return
+
+        # One nearest-predator pass per tick, used both for the boost check and the NN inputs
+        nearest, _ = self.nearest_predators(prey, context)
+        self.predator_nearby[prey] = nearest >= 0
+        self.move_prey(prey, energy_grid)
+
+        distance, angle = self._target_info(prey, nearest)
+        self._decide(prey, distance, angle)
+        self.move_prey(prey, energy_grid)
+
+        cooling = self.boost_cooldown[prey] > 0
+        self.boost_cooldown[prey[cooling]] -= 1
+
+        waiting = self.reproduction_cooldown[prey] > 0
+        self.reproduction_cooldown[prey[waiting]] -= 1
+        ready = prey[~waiting & (self.energy[prey] >= self.params.prey_energy_to_reproduce)]
+        self.reproduce_prey(ready)
+
+    def update_predators(self, context):
+        """
+        Predator phase, over the pairs in this tick's NeighbourContext (see neighbours()).
+        Returns the rows of the prey eaten.
+        """
+        active = self.active[context.rows]
+        predators = context.rows[active]
+        if len(predators) == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        # Prey within sensing range of each predator; prey have moved since the context
+        # was built, so measure from where they are now
+        context.measure(self.position)
+        # Context queries count every predator; renumber them over just the active ones
+        renumber = np.cumsum(active) - 1
+        keep = (active[context.query] & (self.species[context.other] == PREY)
+                & (context.distance < PREDATOR_SENSE_RADIUS))
+        query, candidate, delta, dist = context.pairs(keep)
+        query = renumber[query]
+
+        # The nearest prey in view feeds the NN; the nearest at all gets chased (and eaten
+        # if close enough), seen or not
+        visible, closest, closest_dist = self.backend.perceive_predators(self, predators, query, candidate,
+                                                                         delta, dist, PREDATOR_SENSE_RADIUS)
+        distance, angle = self._target_info(predators, visible)
+        self._decide(predators, distance, angle)
+
+        chasing = closest >= 0
+        delta = self.position[closest[chasing]] - self.position[predators[chasing]]
+        self.direction[predators[chasing]] = np.arctan2(delta[:, 1], delta[:, 0])
+
+        eating = chasing & (closest_dist < PREDATOR_EATING_DISTANCE)
+        self.energy[predators[eating]] += self.params.predator_energy_gain
+        self.eating_cooldown[predators[eating]] = PREDATOR_EATING_COOLDOWN
+        # Two predators can eat the same prey in one tick (both get fed); it only dies once
+        eaten = np.unique(closest[eating])
+        self.total_kills += len(eaten)
+
+        self.move_predators(predators)
+
+        ready = predators[(self.energy[predators] >= self.params.energy_to_reproduce)
+                          & (self.reproduction_cooldown[predators] <= 0)]
+        self.reproduce_predators(ready)
+        waiting = self.reproduction_cooldown[predators] > 0
+        self.reproduction_cooldown[predators[waiting]] -= 1
+
+        starved = predators[self.energy[predators] <= 0]
+
+        # Collisions run as their own phase after this (see step()); deaths are only
+        # tombstones, so the eaten and starved still get bumped like before
+        self.kill(eaten)
+        self.kill(starved)
+        return eaten
+
+    # SECTION 4.1: COLLISIONS
+    def resolve_collisions(self, context, collision_distance=COLLISION_DISTANCE):
+        """
+        Find every active predator that overlaps anything else and give each of them a
+        single turn-around-and-step. The numpy backend reuses the context's candidate
+        pairs with distances remeasured after this tick's moves, so there's no second grid
+        search.
+        """
+        if not self.active[context.rows].any():
+            return
+        bumped = self.backend.collide(self, context, collision_distance)
+        self.direction[bumped] += math.pi
+        self.move_predators(bumped)
+
+    # SECTION 5: REPRODUCTION
+    # -----------------------
+    def reproduce_prey(self, parents):
+        if len(parents) == 0:
+            return
+        n = len(parents)
+        self.total_births += n
+        self.energy[parents] /= 2
+        self.reproduction_cooldown[parents] = PREY_REPRODUCTION_COOLDOWN
+
+        colors = self.color[parents].astype(np.int64)
+        fov_angles = self.fov_angle[parents].copy()
+        fov_distances = self.fov_distance[parents].copy()
+
+        # Unmutated offspring get a fresh random brain, just like Prey.reproduce; mutated
+        # ones get a nudged copy of their parent's
+        mutated = self.rng.random(n) < self.params.prey_mutation_chance
+        slots = self.arena.allocate(n)
+        self.arena.randomize(slots[~mutated], self.rng)
+        self.arena.clone(self.genome_slot[parents[mutated]], slots[mutated])
+        self.arena.mutate(slots[mutated], self.params.prey_mutation_rate, self.rng)
+        k = int(mutated.sum())
+        colors[mutated] = np.clip(colors[mutated] + self.rng.integers(-50, 51, (k, 3)), 0, 255)
+        fov_angles[mutated] = np.clip(fov_angles[mutated] + self.rng.integers(-15, 16, k), 60, 180)
+        fov_distances[mutated] = np.maximum(fov_distances[mutated] + self.rng.integers(-10, 11, k), 50)
+
+        offset = self.rng.integers(-20, 21, n)[:, None]
+        self.spawn(PREY, n, positions=self.position[parents] + offset, colors=colors,
+                   fov_angles=fov_angles, fov_distances=fov_distances, genome_slots=slots)
+
+    def reproduce_predators(self, parents):
+        if len(parents) == 0:
+            return
+        n = len(parents)
+        self.total_births += n
+        self.energy[parents] /= 2
+        self.reproduction_cooldown[parents] = PREDATOR_REPRODUCTION_COOLDOWN
+
+        colors = self.color[parents].astype(np.int64)
+        fov_angles = self.fov_angle[parents].copy()
+        fov_distances = self.fov_distance[parents].copy()
+        slots = self.arena.clone(self.genome_slot[parents])
+
+        mutated = self.rng.random(n) < self.params.predator_mutation_chance
+        self.arena.mutate(slots[mutated], self.params.predator_mutation_rate, self.rng)
+        k = int(mutated.sum())
+        colors[mutated] = np.clip(colors[mutated] + self.rng.integers(-50, 51, (k, 3)), 0, 255)
+        change = self.rng.integers(-30, 31, k)
+        fov_distances[mutated] += change
+        fov_angles[mutated] -= change
+
+        offset = self.rng.integers(-10, 11, n)[:, None]
+        self.spawn(PREDATOR, n, positions=self.position[parents] + offset, colors=colors,
+                   fov_angles=fov_angles, fov_distances=fov_distances, genome_slots=slots)
+
+
+# SECTION 6: WRAPPER OBJECTS
+# --------------------------
+class AgentView:
+    """
+    A Prey/Predator-shaped handle onto one row of a World. Views are cheap to make and
+    are meant to be thrown away each frame, since rows move when agents die.
+    """
+    __slots__ = ("world", "row")
+
+    def __init__(self, world, row):
+        self.world = world
+        self.row = row
+
+    @property
+    def id(self):
+        return int(self.world.registry.ids[self.row])
+
+    @property
+    def position(self):
+        x, y = self.world.position[self.row]
+        return (float(x), float(y))
+
+    @property
+    def direction(self):
+        return float(self.world.direction[self.row])
+
+    @property
+    def velocity(self):
+        return float(self.world.velocity[self.row])
+
+    @property
+    def energy(self):
+        return float(self.world.energy[self.row])
+
+    @property
+    def color(self):
+        return tuple(int(c) for c in self.world.color[self.row])
+
+    @property
+    def fov_angle(self):
+        return float(self.world.fov_angle[self.row])
+
+    @property
+    def fov_distance(self):
+        return float(self.world.fov_distance[self.row])
+
+    @property
+    def reproduction_cooldown(self):
+        return int(self.world.reproduction_cooldown[self.row])
+
+    @property
+    def nn(self):
+        # A detached copy, handy for poking at a single fish's brain
+        slot = self.world.genome_slot[self.row]
+        weights_input_to_hidden, weights_hidden_to_output = self.world.arena.weights([slot])
+        return NeuralNetwork.from_weights(weights_input_to_hidden[0].tolist(), weights_hidden_to_output[0].tolist())
+
+
+class PreyView(AgentView):
+    __slots__ = ()
+
+
+class PredatorView(AgentView):
+    __slots__ = ()
+
+    def is_close_to_reproducing(self, energy_to_reproduce):
+        glow_threshold = energy_to_reproduce * 0.5
+        return self.energy >= glow_threshold
+
+
+_VIEW_TYPES = {PREY: PreyView, PREDATOR: PredatorView}